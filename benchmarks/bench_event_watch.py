@@ -0,0 +1,112 @@
+"""
+Compares events/second of the EventWatch model path (kubernetes client CoreV1Event deserialization)
+against the raw JSON path, from stream bytes through to a formatted K8Event.
+
+Run with: uv run python benchmarks/bench_event_watch.py [event_count]
+"""
+
+import json
+import sys
+import time
+from queue import Queue
+from unittest.mock import patch
+
+from kubernetes import client
+
+from sibyl.event_watch import event_watch as event_watch_module
+from sibyl.event_watch.event_watch import EventWatch
+from sibyl.event_watch.event_watch_thread import EventWatchThread
+
+
+def build_event_lines(event_count: int) -> bytes:
+    lines = []
+    for i in range(event_count):
+        lines.append(json.dumps({
+            "type": "ADDED",
+            "object": {
+                "kind": "Event",
+                "apiVersion": "v1",
+                "metadata": {
+                    "name": f"api-7d9f8-{i}.17a3c1b2",
+                    "namespace": "production",
+                    "uid": f"6f1c2a8e-0000-0000-0000-{i:012d}",
+                    "resourceVersion": str(1000 + i),
+                    "creationTimestamp": "2025-11-30T12:00:00Z",
+                    "managedFields": [{"manager": "kubelet", "operation": "Update", "apiVersion": "v1", "time": "2025-11-30T12:00:00Z"}],
+                },
+                "involvedObject": {
+                    "kind": "Pod",
+                    "namespace": "production",
+                    "name": f"api-7d9f8-{i}",
+                    "uid": f"0b7e4b1a-0000-0000-0000-{i:012d}",
+                    "apiVersion": "v1",
+                    "resourceVersion": "123456",
+                    "fieldPath": "spec.containers{api}",
+                },
+                "reason": "BackOff",
+                "message": "Back-off restarting failed container api in pod api-7d9f8",
+                "source": {"component": "kubelet", "host": "node-1"},
+                "firstTimestamp": "2025-11-30T11:00:00Z",
+                "lastTimestamp": "2025-11-30T12:00:00Z",
+                "count": 12,
+                "type": "Warning",
+                "eventTime": None,
+                "reportingComponent": "kubelet",
+                "reportingInstance": "node-1",
+            },
+        }))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class BenchResponse:
+    """Stands in for the urllib3 response returned with _preload_content=False."""
+
+    def __init__(self, payload: bytes, chunk_size: int = 64 * 1024):
+        self.payload = payload
+        self.chunk_size = chunk_size
+
+    def stream(self, amt=None, decode_content=False):
+        for i in range(0, len(self.payload), self.chunk_size):
+            yield self.payload[i:i + self.chunk_size]
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+
+def run(raw_json: bool, payload: bytes, event_count: int) -> float:
+    core_v1_client = client.CoreV1Api(api_client=client.ApiClient())
+    with patch.object(core_v1_client.api_client, "call_api", side_effect=lambda *args, **kwargs: BenchResponse(payload)), \
+         patch("sibyl.k8_client_factory.config.load_incluster_config"):
+        event_watch_thread = EventWatchThread(Queue(), raw_json=raw_json)
+        format_event = event_watch_thread._format_raw_event if raw_json else event_watch_thread._format_event
+
+        event_watch = EventWatch(core_v1_client, timeout_seconds=300, raw_json=raw_json)
+        event_watch.resource_version = "1"
+
+        formatted = []
+        start = time.perf_counter()
+        event_watch.poll_for_event(callback=lambda k8s_event: formatted.append(format_event(k8s_event)))
+        elapsed = time.perf_counter() - start
+
+    assert len(formatted) == event_count
+    return event_count / elapsed
+
+
+def main() -> None:
+    event_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    payload = build_event_lines(event_count)
+    decoder = "orjson" if event_watch_module.json_loads is not json.loads else "json"
+
+    model_rate = run(raw_json=False, payload=payload, event_count=event_count)
+    raw_rate = run(raw_json=True, payload=payload, event_count=event_count)
+
+    print(f"Events: {event_count} ({len(payload) / 1024 / 1024:.1f} MiB of stream)")
+    print(f"CoreV1Event model path : {model_rate:>10,.0f} events/s")
+    print(f"Raw JSON path ({decoder:<6}) : {raw_rate:>10,.0f} events/s ({raw_rate / model_rate:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Compares the two health check servers, the Flask app on the Werkzeug development server and the
+standard library threaded server, by startup time (import through to the first /health answered),
+resident memory once serving, and /health probe latency.
+
+Each server runs in its own Python process, so neither pays for the other's imports.
+
+Run with: uv run python benchmarks/bench_health_server.py [probe_count]
+"""
+
+import http.client
+import json
+import logging
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+
+def get_free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def probe(port: int) -> int:
+    # A new connection per probe, the way the kubelet probes
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    try:
+        connection.request("GET", "/health")
+        response = connection.getresponse()
+        response.read()
+        return response.status
+    finally:
+        connection.close()
+
+
+def serve(server: str, port: int, probe_count: int) -> dict:
+    """Run in the child process. Starts the server, probes it and reports what it measured."""
+    start = time.perf_counter()
+    from sibyl.health_check.health_status_thread import HealthStatusThread
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    health_status_thread = HealthStatusThread(server=server)
+    health_status_thread.start(host="127.0.0.1", port=port)
+    while True:
+        try:
+            if probe(port) == 200:
+                break
+        except OSError:
+            time.sleep(0.001)
+    startup_seconds = time.perf_counter() - start
+
+    latencies = []
+    for _ in range(probe_count):
+        probe_start = time.perf_counter()
+        assert probe(port) == 200
+        latencies.append(time.perf_counter() - probe_start)
+
+    return {
+        "startup_seconds": startup_seconds,
+        # Peak resident set size, KiB on Linux
+        "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "flask_loaded": "flask" in sys.modules,
+        "latency_p50_ms": statistics.median(latencies) * 1000,
+        "latency_p99_ms": statistics.quantiles(latencies, n=100)[98] * 1000,
+    }
+
+
+def run(server: str, probe_count: int) -> dict:
+    output = subprocess.run(
+        [sys.executable, __file__, "--serve", server, str(get_free_port()), str(probe_count)],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    if len(sys.argv) > 1 and sys.argv[1] == "--serve":
+        print(json.dumps(serve(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))))
+        return
+
+    probe_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    print(f"Probes: {probe_count}")
+    for server in ["flask", "stdlib"]:
+        result = run(server, probe_count)
+        print(
+            f"{server:<6} : startup {result['startup_seconds'] * 1000:>7.1f} ms, "
+            f"max RSS {result['max_rss_kib'] / 1024:>5.1f} MiB, "
+            f"probe p50 {result['latency_p50_ms']:.3f} ms, p99 {result['latency_p99_ms']:.3f} ms "
+            f"(flask loaded: {result['flask_loaded']})"
+        )
+
+
+if __name__ == "__main__":
+    main()
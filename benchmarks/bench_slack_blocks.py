@@ -0,0 +1,108 @@
+"""
+Compares rendering Slack notification blocks from SlackBlockTemplates against building every block
+from scratch per notification (how SlackNotifier rendered them before), in renders/second and in
+memory blocks retained per rendered notification.
+
+Run with: uv run python benchmarks/bench_slack_blocks.py [render_count]
+"""
+
+import sys
+import time
+from typing import Callable, List, Optional
+
+from sibyl.models.events.k8_event import K8Event
+from sibyl.models.events.k8_event_involved_object import K8EventInvolvedObject
+from sibyl.models.events.k8_event_metadata import K8EventMetadata
+from sibyl.models.events.k8_event_source import K8EventSource
+from sibyl.notifications.slack_block_templates import SlackBlockTemplates
+
+
+CLUSTER_NAME = "production"
+
+
+def build_events(event_count: int) -> List[K8Event]:
+    return [
+        K8Event(
+            kind="Event",
+            source=K8EventSource(component="kubelet", host=f"node-{i % 8}"),
+            action="",
+            type="Warning",
+            namespace="production",
+            name=f"api-7d9f8-{i}.17a3c1b2",
+            reason="BackOff",
+            message="Back-off restarting failed container api in pod api-7d9f8",
+            metadata=K8EventMetadata(name=f"api-7d9f8-{i}.17a3c1b2", namespace="production", creation_timestamp="2025-11-30T12:00:00Z", deletion_timestamp=None),
+            involved_object=K8EventInvolvedObject(kind="Pod", name=f"api-7d9f8-{i}", namespace="production"),
+            timestamp="2025-11-30T12:00:00Z",
+        )
+        for i in range(event_count)
+    ]
+
+
+def create_cell(text: str, bold: bool = False) -> dict:
+    element = {"type": "text", "text": text}
+    if bold:
+        element["style"] = {"bold": True}
+    return {"type": "rich_text", "elements": [{"type": "rich_text_section", "elements": [element]}]}
+
+
+def render_uncached(event_data: K8Event, occurrences: Optional[int] = None, last_seen: Optional[str] = None) -> list:
+    """Every block built per notification, as SlackNotifier did before SlackBlockTemplates."""
+    header_prefix = f"[{CLUSTER_NAME}] "
+    fields = [
+        {"type": "mrkdwn", "text": f"*Namespace:*\n{event_data.involved_object.namespace}"},
+        {"type": "mrkdwn", "text": f"*Involved Object:*\n{event_data.involved_object.kind} / `{event_data.involved_object.name}`"},
+        {"type": "mrkdwn", "text": f"*Alert Type:*\n{event_data.type}"},
+        {"type": "mrkdwn", "text": f"*Reason:*\n{event_data.reason}"},
+    ]
+    if occurrences is not None:
+        fields.append({"type": "mrkdwn", "text": f"*Occurrences:*\n{occurrences}, last seen {last_seen}"})
+    elif event_data.count > 1:
+        fields.append({"type": "mrkdwn", "text": f"*Occurrences:*\n{event_data.count} since last alert"})
+    fields.insert(0, {"type": "mrkdwn", "text": f"*Cluster:*\n{CLUSTER_NAME}"})
+
+    return [
+        {"type": "section", "text": {"type": "mrkdwn", "text": f"*{header_prefix}{event_data.type}:* {event_data.involved_object.kind} `{event_data.involved_object.namespace}/{event_data.involved_object.name}` -> {event_data.reason} "}},
+        {"type": "section", "fields": fields},
+        {"type": "divider"},
+        {"type": "rich_text", "elements": [{"type": "rich_text_preformatted", "elements": [{"type": "text", "text": event_data.message}]}]},
+        {"type": "table", "rows": [
+            [create_cell("Type", bold=True), create_cell("Timestamp", bold=True)],
+            [create_cell("Event Timestamp"), create_cell(event_data.timestamp)],
+            [create_cell("Involved Object Creation Timestamp"), create_cell(event_data.metadata.creation_timestamp or "N/A")],
+            [create_cell("Involved Object Deletion Timestamp"), create_cell(event_data.metadata.deletion_timestamp or "N/A")],
+        ]},
+    ]
+
+
+def run(render: Callable[[K8Event], list], events: List[K8Event]) -> tuple[float, float]:
+    # Rendered messages are kept, like the notifications waiting on a busy Slack, so what each one
+    # holds on to shows up in the allocated blocks
+    rendered = []
+    blocks_before = sys.getallocatedblocks()
+    start = time.perf_counter()
+    for event in events:
+        rendered.append(render(event))
+    elapsed = time.perf_counter() - start
+    blocks_per_render = (sys.getallocatedblocks() - blocks_before) / len(events)
+
+    assert len(rendered) == len(events)
+    return len(events) / elapsed, blocks_per_render
+
+
+def main() -> None:
+    render_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    events = build_events(render_count)
+    templates = SlackBlockTemplates(cluster_name=CLUSTER_NAME)
+    assert render_uncached(events[0]) == templates.render_blocks(events[0])
+
+    uncached_rate, uncached_blocks = run(render_uncached, events)
+    templates_rate, templates_blocks = run(templates.render_blocks, events)
+
+    print(f"Renders: {render_count}")
+    print(f"Uncached blocks     : {uncached_rate:>10,.0f} renders/s, {uncached_blocks:>5.1f} allocated blocks/render")
+    print(f"SlackBlockTemplates : {templates_rate:>10,.0f} renders/s, {templates_blocks:>5.1f} allocated blocks/render ({templates_rate / uncached_rate:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+import time
+from typing import Optional
+
+from sibyl.models.events.k8_event import K8Event
+
+
+@dataclass
+class _DedupEntry:
+    window_start: float
+    suppressed: int = 0
+
+
+class EventDedupCache():
+    """
+    TTL bounded cache of recently alerted events, keyed on (namespace, involved object, field path, reason).
+
+    The first occurrence of an event is let through straight away. Repeats inside the window are
+    suppressed and counted, and the first occurrence after the window expires is let through
+    carrying the number of occurrences since the last alert. Entries are evicted least recently
+    used first once max_size is reached, so memory stays bounded during event storms.
+    """
+
+    def __init__(self, window_seconds: int = 300, max_size: int = 1024):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._lock = Lock()
+        self._entries: OrderedDict[tuple[str, str, str, Optional[str], str], _DedupEntry] = OrderedDict()
+        self.window_seconds = window_seconds
+        self.max_size = max_size
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def should_notify(self, event: K8Event) -> bool:
+        """
+        Record an occurrence of the event, returning whether it should be alerted on. When it should,
+        the event's count is set to the number of occurrences since the last alert.
+        """
+        key = event.get_alert_key()
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry.window_start < self.window_seconds:
+                entry.suppressed += 1
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return False
+
+            self._misses += 1
+            event.count = 1 + (entry.suppressed if entry is not None else 0)
+            self._entries[key] = _DedupEntry(window_start=now)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                evicted_key, _ = self._entries.popitem(last=False)
+                self._evictions += 1
+                self._logger.debug(f"Evicted Dedup Entry: {evicted_key}")
+
+            return True
+
+    def get_stats(self) -> dict[str, int]:
+        """Get the hit, miss and eviction counters along with the current cache size."""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "size": len(self._entries),
+            }
@@ -0,0 +1,33 @@
+
+import logging
+from typing import Optional
+
+from sibyl.models.events.k8_event import K8Event
+
+
+class EventPriority():
+    """
+    Scores events for the EventQueue from a configurable table. An event's priority is the sum of
+    the weights matching its reason, type and involved object namespace. Higher is more urgent.
+    """
+
+    DEFAULT_REASON_PRIORITIES = {
+        "OOMKilling": 100,      # Node OOM killer fired on a container
+        "OOMKilled": 100,
+        "BackOff": 50,          # Container failed and is restarting
+        "Failed": 50,
+        "Evicted": 40,
+        "Unhealthy": 30,
+        "FailedScheduling": 10, # Often bursty and rarely urgent on its own
+    }
+
+    def __init__(self, reason_priorities: Optional[dict[str, int]] = None, type_priorities: Optional[dict[str, int]] = None, namespace_priorities: Optional[dict[str, int]] = None):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self.reason_priorities: dict[str, int] = self.DEFAULT_REASON_PRIORITIES if reason_priorities is None else reason_priorities
+        self.type_priorities: dict[str, int] = type_priorities or {}
+        self.namespace_priorities: dict[str, int] = namespace_priorities or {}
+
+    def get_priority(self, event: K8Event) -> int:
+        return self.reason_priorities.get(event.reason, 0) \
+            + self.type_priorities.get(event.type, 0) \
+            + self.namespace_priorities.get(event.involved_object.namespace, 0)
@@ -0,0 +1,64 @@
+
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock, Semaphore
+from typing import Callable
+
+from sibyl.models.events.k8_event import K8Event
+
+
+class EventProcessorPool():
+    """
+    Processes events on a pool of worker threads while keeping events for the same involved object
+    in the order they were submitted.
+
+    An event whose involved object already has an event in flight is chained behind it and run by
+    the same worker once the earlier one finishes. submit() blocks once worker_count events are
+    accepted but not yet finished, so the backlog stays in the EventQueue where priority ordering
+    and the overflow policy still apply.
+    """
+
+    def __init__(self, process_func: Callable[[K8Event], None], worker_count: int = 4):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self.process_func = process_func
+        self.worker_count = worker_count
+
+        self._executor = ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix="EventProcessor")
+        self._capacity = Semaphore(worker_count)
+        self._lock = Lock()
+        # Involved objects with an event in flight, mapped to the events waiting behind it
+        self._in_flight: dict[tuple[str, str, str], deque[K8Event]] = {}
+
+    def submit(self, event: K8Event) -> None:
+        self._capacity.acquire()
+
+        key = event.involved_object.get_key()
+        with self._lock:
+            if key in self._in_flight:
+                self._in_flight[key].append(event)
+                return
+            self._in_flight[key] = deque()
+
+        self._executor.submit(self._run, key, event)
+
+    def _run(self, key: tuple[str, str, str], event: K8Event) -> None:
+        while True:
+            try:
+                self.process_func(event)
+            except Exception as e:
+                self._logger.error(f"Error processing event: {e}", exc_info=e)
+            finally:
+                self._capacity.release()
+
+            with self._lock:
+                waiting = self._in_flight[key]
+                if not waiting:
+                    del self._in_flight[key]
+                    return
+                event = waiting.popleft()
+
+    def shutdown(self) -> None:
+        """Stop accepting events and wait for everything in flight to finish processing."""
+        self._logger.info("Waiting For In Flight Events To Finish Processing")
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,124 @@
+
+import heapq
+import itertools
+import logging
+from queue import Queue
+import time
+from typing import Callable, Literal, Optional
+
+from sibyl.models.events.k8_event import K8Event
+
+
+OverflowPolicy = Literal["block", "drop_oldest", "drop_lowest_priority", "coalesce"]
+
+
+class EventQueue(Queue):
+    """
+    Bounded priority queue of K8Events between the EventWatchThread and the main processing loop.
+
+    Events are handed out highest priority first, FIFO within the same priority. Waiting events age,
+    gaining aging_rate priority per second queued, so low priority events are still processed
+    eventually under a constant stream of high priority ones.
+
+    When the queue is full the overflow policy decides what happens to a new event:
+    - block: the watcher waits until there is room (standard Queue behaviour)
+    - drop_oldest: the oldest queued event is dropped to make room
+    - drop_lowest_priority: the lowest priority queued event is dropped (oldest first on ties). If the
+      new event is lower priority than everything queued, the new event is dropped instead
+    - coalesce: the new event replaces a queued event for the same involved object, adding its count.
+      If there is no event queued for that object, the oldest queued event is dropped
+    """
+
+    def __init__(self, maxsize: int = 0, overflow_policy: OverflowPolicy = "block", priority_func: Optional[Callable[[K8Event], int]] = None, aging_rate: float = 0.0):
+        super().__init__(maxsize=maxsize)
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self.overflow_policy: OverflowPolicy = overflow_policy
+        # Higher value is higher priority. Without one all events are treated as equal priority
+        self.priority_func: Callable[[K8Event], int] = priority_func or (lambda event: 0)
+        self.aging_rate = aging_rate
+
+        self._dropped = 0
+        self._coalesced = 0
+
+    def _init(self, maxsize: int) -> None:
+        # Heap of [sort_key, sequence, event] entries. Every queued event ages at the same rate, so an
+        # event's effective priority (priority + aging_rate * seconds_waited) only ever reorders against
+        # other events by (priority - aging_rate * enqueue_time). That is fixed at put() time, which lets
+        # a plain heap keep aging events in order
+        self.queue: list[list] = []
+        self._sequence = itertools.count()
+
+    def _qsize(self) -> int:
+        return len(self.queue)
+
+    def _create_entry(self, item: K8Event) -> list:
+        sort_key = self.aging_rate * time.monotonic() - self.priority_func(item)
+        return [sort_key, next(self._sequence), item]
+
+    def _put(self, item: K8Event) -> None:
+        heapq.heappush(self.queue, self._create_entry(item))
+
+    def _get(self) -> K8Event:
+        return heapq.heappop(self.queue)[2]
+
+    def put(self, item: K8Event, block: bool = True, timeout: Optional[float] = None) -> None:
+        if self.overflow_policy == "block":
+            return super().put(item, block=block, timeout=timeout)
+
+        with self.not_full:
+            if 0 < self.maxsize <= self._qsize():
+                if not self._make_room(item):
+                    return
+
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+    def _make_room(self, item: K8Event) -> bool:
+        """
+        Apply the overflow policy to a full queue. Returns whether the new item should still be added.
+        Must be called with the queue mutex held.
+        """
+        if self.overflow_policy == "coalesce":
+            for entry in self.queue:
+                queued = entry[2]
+                if queued.involved_object.get_key() == item.involved_object.get_key():
+                    item.count += queued.count
+                    entry[2] = item
+                    # Keep whichever of the two would be processed first
+                    new_entry = self._create_entry(item)
+                    if new_entry[0] < entry[0]:
+                        entry[0] = new_entry[0]
+                        heapq.heapify(self.queue)
+                    self._coalesced += 1
+                    self._logger.debug(f"Event Queue Full. Coalesced Event For {item.involved_object.namespace}/{item.involved_object.name}")
+                    return False
+
+        if self.overflow_policy == "drop_lowest_priority":
+            # Lowest effective priority is the largest sort key. On ties the oldest (lowest sequence) goes
+            drop_index = max(range(len(self.queue)), key=lambda index: (self.queue[index][0], -self.queue[index][1]))
+            if self._create_entry(item)[0] > self.queue[drop_index][0]:
+                self._dropped += 1
+                self._logger.warning(f"Event Queue Full. Dropping New Lower Priority Event {item.involved_object.namespace}/{item.involved_object.name} - {item.reason}")
+                return False
+        else:
+            drop_index = min(range(len(self.queue)), key=lambda index: self.queue[index][1])
+
+        dropped = self.queue[drop_index][2]
+        self.queue[drop_index] = self.queue[-1]
+        self.queue.pop()
+        heapq.heapify(self.queue)
+        self._dropped += 1
+        # The dropped event will never be processed, so it must not hold up a join()
+        self.unfinished_tasks -= 1
+        self._logger.warning(f"Event Queue Full. Dropping Queued Event {dropped.involved_object.namespace}/{dropped.involved_object.name} - {dropped.reason}")
+        return True
+
+    def get_stats(self) -> dict[str, int]:
+        """Get the dropped and coalesced counters along with the current queue depth."""
+        with self.mutex:
+            return {
+                "dropped": self._dropped,
+                "coalesced": self._coalesced,
+                "depth": self._qsize(),
+            }
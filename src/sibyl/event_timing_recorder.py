@@ -0,0 +1,57 @@
+from datetime import datetime
+import logging
+from typing import Optional
+
+from sibyl.metrics import EVENT_STAGE_DURATION
+from sibyl.models.events.k8_event import K8Event
+from sibyl.models.events.k8_event_timings import K8EventTimings
+
+
+class EventTimingRecorder():
+    """
+    Reports where the time went between an event happening and its notification being sent, from
+    the timing marks the event picked up on its way through Sibyl.
+
+    Each stage's duration is the time from the stage before it that the event reached, so stages an
+    event skipped (ex. no logs to fetch) are folded into the next one. The first stage is timed from
+    the event's own last timestamp. Durations are observed on the sibyl_event_stage_duration_seconds
+    histogram and logged as a single structured log line per event.
+    """
+
+    def __init__(self):
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    def get_stage_durations(self, event: K8Event) -> dict[str, float]:
+        durations: dict[str, float] = {}
+        previous = self._get_event_time(event)
+        for stage in K8EventTimings.STAGES:
+            marked = event.timings.marks.get(stage)
+            if marked is None:
+                continue
+            if previous is not None:
+                # Wall clock marks can step backwards, never report a negative stage
+                durations[stage] = max(0.0, marked - previous)
+            previous = marked
+        return durations
+
+    def record(self, event: K8Event) -> None:
+        durations = self.get_stage_durations(event)
+        for stage, seconds in durations.items():
+            EVENT_STAGE_DURATION.labels(stage=stage).observe(seconds)
+
+        self._logger.info(
+            f"Event Timings For {event.involved_object.namespace}/{event.involved_object.name} - {event.reason}",
+            extra={
+                "involved_object": f"{event.involved_object.kind}/{event.involved_object.namespace}/{event.involved_object.name}",
+                "reason": event.reason,
+                "stage_seconds": {stage: round(seconds, 4) for stage, seconds in durations.items()},
+                "total_seconds": round(sum(durations.values()), 4),
+            }
+        )
+
+    def _get_event_time(self, event: K8Event) -> Optional[float]:
+        try:
+            return datetime.fromisoformat(event.timestamp).timestamp()
+        except (TypeError, ValueError):
+            # Events without a last timestamp ("N/A") time their first stage from nothing
+            return None
@@ -1,35 +1,207 @@
-from typing import Callable, Optional
+from typing import Callable, Optional, Union
+import json
 import logging
 from kubernetes import client, watch
 from kubernetes.client import CoreV1Event, CoreV1Api
+from kubernetes.watch.watch import iter_resp_lines
+
+# orjson is an optional dependency (install the `fast-json` extra). It is only used on the raw JSON
+# watch path, falling back to the standard library decoder when it is not installed
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
 
 class EventWatch():
 
-    def __init__(self, core_v1_client: CoreV1Api, timeout_seconds: Optional[int] = 300):
+    HTTP_STATUS_GONE = 410
+
+    def __init__(self, core_v1_client: CoreV1Api, timeout_seconds: Optional[int] = 300, relist_page_size: int = 500, field_selector: Optional[str] = None, raw_json: bool = False, heartbeat_func: Optional[Callable[[], None]] = None):
         self._logger = logging.getLogger(self.__class__.__name__)
         self.core_v1_client = core_v1_client
         self.timeout_seconds = timeout_seconds
+        self.relist_page_size = relist_page_size
+        # Server side filtering so the apiserver never sends us events we would throw away
+        self.field_selector = field_selector
+        # When enabled events are passed to the callback as plain dicts decoded straight from the
+        # stream, skipping the kubernetes client CoreV1Event model deserialization
+        self.raw_json = raw_json
+        # Called whenever the apiserver is heard from (list pages, events and bookmarks), so a stream
+        # that has silently stopped can be told apart from a quiet cluster
+        self.heartbeat_func = heartbeat_func
 
-    def poll_for_event(self, callback: Callable[[CoreV1Event], None]) -> None:
-        self._logger.debug("Starting K8s Event Watcher Polling Loop")
+        # Last resourceVersion seen on the stream (events or bookmarks). When set, reconnects
+        # resume the watch from here instead of replaying the whole event history
+        self.resource_version: Optional[str] = None
+        # resourceVersion the watch had reached when it expired (410 Gone). Everything at or below it has
+        # already been passed to the callback, so the relist that follows skips it instead of replaying it
+        self.expired_resource_version: Optional[str] = None
+
+    @staticmethod
+    def build_field_selector(base_selector: Optional[str] = None, namespace: Optional[str] = None, involved_object_kind: Optional[str] = None) -> Optional[str]:
+        """
+        Combine the configured filters into a single field selector. Field selectors are AND'ed
+        together by the apiserver, so each filter narrows the watch further.
+        """
+        selectors = []
+        if base_selector:
+            selectors.append(base_selector)
+        if namespace:
+            selectors.append(f"metadata.namespace={namespace}")
+        if involved_object_kind:
+            selectors.append(f"involvedObject.kind={involved_object_kind}")
+
+        return ",".join(selectors) if selectors else None
+
+    def relist(self, callback: Callable[[Union[CoreV1Event, dict]], None]) -> None:
+        """
+        List all current events (paginated) passing each one to the callback, and record the
+        resourceVersion of the list so the following watch picks up right where the list ended.
+        After the watch has expired only the events changed since it was last seen are passed on.
+        """
+        self._logger.debug("Listing K8s Events To Establish Watch ResourceVersion")
+        seen_resource_version = self._parse_resource_version(self.expired_resource_version)
+        skipped = 0
+        continue_token: Optional[str] = None
+        while True:
+            kwargs = {"limit": self.relist_page_size, "field_selector": self.field_selector}
+            if continue_token:
+                kwargs["_continue"] = continue_token
+
+            if self.raw_json:
+                response = self.core_v1_client.list_event_for_all_namespaces(_preload_content=False, **kwargs)
+                event_list = json_loads(response.data)
+                for raw_event in event_list.get('items') or []:
+                    if seen_resource_version is not None and self._is_seen(raw_event['metadata'].get('resourceVersion'), seen_resource_version):
+                        skipped += 1
+                        continue
+                    callback(raw_event)
+
+                continue_token = event_list['metadata'].get('continue')
+                resource_version = event_list['metadata'].get('resourceVersion')
+            else:
+                event_list = self.core_v1_client.list_event_for_all_namespaces(**kwargs)
+                for k8s_event in event_list.items or []:
+                    if seen_resource_version is not None and self._is_seen(k8s_event.metadata.resource_version, seen_resource_version):
+                        skipped += 1
+                        continue
+                    callback(k8s_event)
+
+                continue_token = event_list.metadata._continue
+                resource_version = event_list.metadata.resource_version
+
+            self._heartbeat()
+            if not continue_token:
+                break
+
+        self.resource_version = resource_version
+        self.expired_resource_version = None
+        self._logger.debug(f"K8s Event List Complete. Skipped {skipped} Already Seen Events. Watching From ResourceVersion: {self.resource_version}")
+
+    @staticmethod
+    def _parse_resource_version(resource_version: Optional[str]) -> Optional[int]:
+        """
+        resourceVersions are opaque to clients, but the etcd backed apiserver hands out increasing integers.
+        Anything else can not be compared, so nothing is skipped.
+        """
+        try:
+            return int(resource_version) if resource_version else None
+        except ValueError:
+            return None
+
+    def _is_seen(self, resource_version: Optional[str], seen_resource_version: int) -> bool:
+        event_resource_version = self._parse_resource_version(resource_version)
+        return event_resource_version is not None and event_resource_version <= seen_resource_version
+
+    def _stream_events(self, callback: Callable[[CoreV1Event], None]) -> None:
         w = watch.Watch()
 
+        # Use stream() which handles the continuous API connection
+        event_stream = w.stream(
+            func=self.core_v1_client.list_event_for_all_namespaces,
+            field_selector=self.field_selector,
+            resource_version=self.resource_version,
+            allow_watch_bookmarks=True, # Bookmarks keep our resourceVersion fresh on quiet clusters
+            timeout_seconds=self.timeout_seconds # Reconnect based on the timeout_seconds parameter
+        )
+        self._logger.debug("K8s Event Watcher Stream Established")
+        for event in event_stream:
+            self._heartbeat()
+            if event['type'] == 'BOOKMARK':
+                self.resource_version = event['raw_object']['metadata']['resourceVersion']
+                self._logger.debug(f"K8s Event Watcher Bookmark Received. ResourceVersion: {self.resource_version}")
+                continue
+
+            self._logger.debug("K8s Event Received from Watcher Stream")
+            k8s_event = event['object']
+            self.resource_version = k8s_event.metadata.resource_version
+            callback(k8s_event)
+
+    def _stream_raw_events(self, callback: Callable[[dict], None]) -> None:
+        response = self.core_v1_client.list_event_for_all_namespaces(
+            watch=True,
+            _preload_content=False, # Hand us the raw response so we can decode the line delimited JSON ourselves
+            field_selector=self.field_selector,
+            resource_version=self.resource_version,
+            allow_watch_bookmarks=True,
+            timeout_seconds=self.timeout_seconds
+        )
+        self._logger.debug("K8s Event Watcher Raw JSON Stream Established")
         try:
-            # Use stream() which handles the continuous API connection
-            event_stream = w.stream(
-                func=self.core_v1_client.list_event_for_all_namespaces,
-                timeout_seconds=self.timeout_seconds # Reconnect based on the timeout_seconds parameter
-            )
-            self._logger.debug("K8s Event Watcher Stream Established")
-            for event in event_stream:
+            for line in iter_resp_lines(response):
+                if not line:
+                    continue
+
+                self._heartbeat()
+                event = json_loads(line)
+                raw_event = event['object']
+                if event['type'] == 'ERROR':
+                    raise client.ApiException(status=raw_event.get('code'), reason=f"{raw_event.get('reason')}: {raw_event.get('message')}")
+
+                self.resource_version = raw_event['metadata']['resourceVersion']
+                if event['type'] == 'BOOKMARK':
+                    self._logger.debug(f"K8s Event Watcher Bookmark Received. ResourceVersion: {self.resource_version}")
+                    continue
+
                 self._logger.debug("K8s Event Received from Watcher Stream")
-                k8s_event = event['object']
-                callback(k8s_event)
+                callback(raw_event)
+        finally:
+            response.close()
+            response.release_conn()
+
+    def _heartbeat(self) -> None:
+        if self.heartbeat_func is not None:
+            self.heartbeat_func()
+
+    def poll_for_event(self, callback: Callable[[Union[CoreV1Event, dict]], None]) -> None:
+        self._logger.debug("Starting K8s Event Watcher Polling Loop")
+
+        try:
+            # Only list when we have nowhere to resume from (first start or after a 410 Gone)
+            if self.resource_version is None:
+                self.relist(callback)
+
+            if self.raw_json:
+                self._stream_raw_events(callback)
+            else:
+                self._stream_events(callback)
+            # The apiserver ended the watch at timeout_seconds, the connection was alive all along
+            self._heartbeat()
 
         except client.ApiException as e:
+            if e.status == self.HTTP_STATUS_GONE:
+                # Our resourceVersion has been compacted away. Drop it so the next poll does a single relist,
+                # remembering how far we got so the relist does not alert on those events a second time
+                self._logger.warning(f"K8s Event Watcher ResourceVersion {self.resource_version} Expired (410 Gone). Relisting On Next Poll")
+                self.expired_resource_version = self.resource_version or self.expired_resource_version
+                self.resource_version = None
+                return
+
             # Log API errors and wait before attempting to reconnect
             self._logger.error(f"Kubernetes API Error in Watcher: {e}")
             raise e
         except Exception as e:
             self._logger.error(f"Unexpected error in Watcher: {e}")
-            raise e
\ No newline at end of file
+            raise e
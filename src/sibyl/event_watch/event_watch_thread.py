@@ -1,31 +1,49 @@
+from datetime import datetime
 from threading import Thread, Event
 from time import time
-from kubernetes import client, config, watch
+from kubernetes import client
 from kubernetes.client.models import CoreV1Event
 import logging
 from queue import Queue
 import time
+from typing import Optional
 
+from sibyl.event_queue.event_dedup_cache import EventDedupCache
 from sibyl.event_watch.event_watch import EventWatch
+from sibyl.health_check.health_status import HealthStatus
+from sibyl.k8_client_factory import K8ClientFactory
+from sibyl.metrics import WATCH_EVENTS_FILTERED, WATCH_EVENTS_RECEIVED
 from sibyl.models.events.k8_event import K8Event
 from sibyl.models.events.k8_event_involved_object import K8EventInvolvedObject
 from sibyl.models.events.k8_event_metadata import K8EventMetadata
 from sibyl.models.events.k8_event_source import K8EventSource
+from sibyl.models.events.k8_event_timings import K8EventTimings
 
 class EventWatchThread(Thread):
 
     ERROR_TYPES = ["Warning", "Error", "Failed", "Evicted", "Unhealthy", "BackOff", "FailedScheduling"]
 
+    # Name the watch's heartbeats are recorded under in the HealthStatus
+    HEARTBEAT_NAME = "event_watch"
 
-    def __init__(self, event_queue: Queue):
+
+    def __init__(self, event_queue: Queue, field_selector: Optional[str] = None, raw_json: bool = False, event_cutoff: Optional[datetime] = None, dedup_cache: Optional[EventDedupCache] = None, client_factory: Optional[K8ClientFactory] = None, health_status: Optional[HealthStatus] = None):
         super().__init__(daemon=True)
         self._logger = logging.getLogger(self.__class__.__name__)
         self.event_queue: Queue = event_queue
+        self.field_selector: Optional[str] = field_selector
+        self.raw_json: bool = raw_json
+        # Events last seen before this time are not queued. Stops a restart re-alerting on the event history
+        self.event_cutoff: Optional[datetime] = event_cutoff
+        # Collapses repeats of the same event so they are not each fetched and notified on
+        self.dedup_cache: Optional[EventDedupCache] = dedup_cache
+        self.client_factory: K8ClientFactory = client_factory or K8ClientFactory()
+        # Heartbeats are recorded here whenever the watch hears from the apiserver
+        self.health_status: Optional[HealthStatus] = health_status
         self._stop_event: Event = Event()
 
         try:
-            config.load_incluster_config()
-            self.core_v1_client = client.CoreV1Api()
+            self.core_v1_client = self.client_factory.get_core_v1_client()
             self._logger.debug("Loading K8s Configuration Successful")
         except Exception as e:
             self._logger.error("Exception Thrown Loading K8s In Cluster Configuration", exc_info=e)
@@ -47,17 +65,37 @@ class EventWatchThread(Thread):
             return
         
         def k8s_v1event_handler(k8s_event: CoreV1Event):
-            if k8s_event.type in self.ERROR_TYPES:
+            WATCH_EVENTS_RECEIVED.inc()
+            if k8s_event.type not in self.ERROR_TYPES:
+                WATCH_EVENTS_FILTERED.labels(reason="type").inc()
+                self._logger.debug(f"Ignoring Non-Error K8s Event: {k8s_event.reason} - {k8s_event.message}")
+            elif self._is_before_cutoff(k8s_event.last_timestamp or k8s_event.event_time):
+                WATCH_EVENTS_FILTERED.labels(reason="cutoff").inc()
+                self._logger.debug(f"Ignoring K8s Event From Before Cutoff: {k8s_event.reason} - {k8s_event.message}")
+            else:
                 self._logger.debug(f"Detected K8s Event: {k8s_event.reason} - {k8s_event.message}")
-                self.event_queue.put(self._format_event(k8s_event))
+                self._queue_event(self._format_event(k8s_event))
+
+        def k8s_raw_event_handler(raw_event: dict):
+            WATCH_EVENTS_RECEIVED.inc()
+            if raw_event.get('type') not in self.ERROR_TYPES:
+                WATCH_EVENTS_FILTERED.labels(reason="type").inc()
+                self._logger.debug(f"Ignoring Non-Error K8s Event: {raw_event.get('reason')} - {raw_event.get('message')}")
+            elif self._is_before_cutoff(self._parse_raw_timestamp(raw_event.get('lastTimestamp') or raw_event.get('eventTime'))):
+                WATCH_EVENTS_FILTERED.labels(reason="cutoff").inc()
+                self._logger.debug(f"Ignoring K8s Event From Before Cutoff: {raw_event.get('reason')} - {raw_event.get('message')}")
             else:
-                self._logger.debug(f"Ignoring Non-Error K8s Event: {k8s_event.reason} - {k8s_event.message}")
+                self._logger.debug(f"Detected K8s Event: {raw_event.get('reason')} - {raw_event.get('message')}")
+                self._queue_event(self._format_raw_event(raw_event))
 
-        event_watch = EventWatch(self.core_v1_client, timeout_seconds=300)
+        event_handler = k8s_raw_event_handler if self.raw_json else k8s_v1event_handler
+        event_watch = EventWatch(self.core_v1_client, timeout_seconds=300, field_selector=self.field_selector, raw_json=self.raw_json, heartbeat_func=self._heartbeat)
+        # Start the clock, a watch that never connects is as stalled as one that stops
+        self._heartbeat()
         while not self._stop_event.is_set():
             try:
 
-                event_watch.poll_for_event(callback=k8s_v1event_handler)
+                event_watch.poll_for_event(callback=event_handler)
                 
                 # If the loop naturally finishes (e.g., due to timeout_seconds), reconnect
                 self._logger.debug("Watcher stream timed out (reconnecting)...")
@@ -70,6 +108,27 @@ class EventWatchThread(Thread):
                 self._logger.error(f"Unexpected error in Watcher: {e}. Retrying in 10s...")
                 time.sleep(10)
 
+    def _heartbeat(self) -> None:
+        if self.health_status is not None:
+            self.health_status.heartbeat(self.HEARTBEAT_NAME)
+
+    def _queue_event(self, k8_event: K8Event) -> None:
+        k8_event.timings.mark(K8EventTimings.RECEIVED)
+        if self.dedup_cache is not None and not self.dedup_cache.should_notify(k8_event):
+            WATCH_EVENTS_FILTERED.labels(reason="duplicate").inc()
+            self._logger.debug(f"Suppressing Repeat K8s Event: {k8_event.involved_object.namespace}/{k8_event.involved_object.name} - {k8_event.reason}")
+            return
+
+        # Marked before the put, as the event can be taken off the queue before put() returns
+        k8_event.timings.mark(K8EventTimings.QUEUED)
+        self.event_queue.put(k8_event)
+
+    def _is_before_cutoff(self, event_time: Optional[datetime]) -> bool:
+        """Checks whether the event was last seen before the cutoff. Events without a timestamp are always let through."""
+        if self.event_cutoff is None or event_time is None:
+            return False
+        return event_time < self.event_cutoff
+
     def _format_event(self, k8s_event: CoreV1Event) -> K8Event:
         """Formats the CoreV1Event object into a simple dictionary for the queue."""
 
@@ -86,7 +145,8 @@ class EventWatchThread(Thread):
         k8_event_involved_object = K8EventInvolvedObject(
             kind=k8s_event.involved_object.kind,
             name=k8s_event.involved_object.name,
-            namespace=k8s_event.involved_object.namespace
+            namespace=k8s_event.involved_object.namespace,
+            field_path=k8s_event.involved_object.field_path
         )
 
         return K8Event(
@@ -101,4 +161,50 @@ class EventWatchThread(Thread):
             metadata=k8_event_metadata,
             involved_object=k8_event_involved_object,
             timestamp=k8s_event.last_timestamp.isoformat() if k8s_event.last_timestamp else "N/A"
+        )
+
+    def _parse_raw_timestamp(self, timestamp: Optional[str]) -> Optional[datetime]:
+        """Parses a raw JSON timestamp (RFC3339, ex. 2025-11-30T12:00:00Z) into a timezone aware datetime."""
+        return datetime.fromisoformat(timestamp) if timestamp else None
+
+    def _format_raw_timestamp(self, timestamp: Optional[str]) -> Optional[str]:
+        """Normalizes a raw JSON timestamp to the same isoformat() output the CoreV1Event model path produces."""
+        return self._parse_raw_timestamp(timestamp).isoformat() if timestamp else None
+
+    def _format_raw_event(self, raw_event: dict) -> K8Event:
+        """Formats a raw JSON event dict, as decoded straight off the watch stream, into a K8Event for the queue."""
+
+        source = raw_event.get('source') or {}
+        metadata = raw_event.get('metadata') or {}
+        involved_object = raw_event.get('involvedObject') or {}
+
+        k8_event_source = K8EventSource(
+            component=source.get('component'),
+            host=source.get('host')
+        )
+        k8_event_metadata = K8EventMetadata(
+            name=metadata.get('name'),
+            namespace=metadata.get('namespace'),
+            creation_timestamp=self._format_raw_timestamp(metadata.get('creationTimestamp')),
+            deletion_timestamp=self._format_raw_timestamp(metadata.get('deletionTimestamp'))
+        )
+        k8_event_involved_object = K8EventInvolvedObject(
+            kind=involved_object.get('kind'),
+            name=involved_object.get('name'),
+            namespace=involved_object.get('namespace'),
+            field_path=involved_object.get('fieldPath')
+        )
+
+        return K8Event(
+            kind=raw_event.get('kind'),
+            source=k8_event_source,
+            action=raw_event.get('action'),
+            type=raw_event.get('type'),
+            namespace=metadata.get('namespace'),
+            name=metadata.get('name'),
+            reason=raw_event.get('reason'),
+            message=raw_event.get('message'),
+            metadata=k8_event_metadata,
+            involved_object=k8_event_involved_object,
+            timestamp=self._format_raw_timestamp(raw_event.get('lastTimestamp')) or "N/A"
         )
\ No newline at end of file
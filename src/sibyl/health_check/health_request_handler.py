@@ -0,0 +1,79 @@
+from http.server import BaseHTTPRequestHandler
+import json
+import logging
+from typing import Optional
+from urllib.parse import parse_qsl, urlsplit
+
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from sibyl.health_check.health_status import HealthStatus
+from sibyl.health_check.process_profiler import ProcessProfiler
+
+
+class HealthRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves the health check endpoints from the standard library's http.server, as an alternative to
+    the Flask app. Responses are the same as the Flask app's.
+
+    The handler is created per request by the server, pass the HealthStatus (and the ProcessProfiler
+    when the /debug/ endpoints are enabled) with functools.partial.
+    """
+
+    # Keep-alive lets probes and scrapers reuse their connection
+    protocol_version = "HTTP/1.1"
+
+    def __init__(self, *args, health_status: HealthStatus, profiler: Optional[ProcessProfiler] = None, **kwargs):
+        self.health_status = health_status
+        self.profiler = profiler
+        self._logger = logging.getLogger(self.__class__.__name__)
+        # The request is handled inside BaseHTTPRequestHandler's __init__, so everything is set first
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if self.profiler is not None and path.startswith("/debug/"):
+            self._send_debug("GET")
+        elif path == "/health":
+            # Liveness probe endpoint
+            if self.health_status.is_healthy():
+                self._send_json(200, {"status": "healthy"})
+            else:
+                self._send_json(503, {"status": "unhealthy", "error": self.health_status.get_error_message()})
+        elif path == "/ready":
+            # Readiness probe endpoint
+            if self.health_status.is_ready():
+                self._send_json(200, {"status": "ready"})
+            else:
+                self._send_json(503, {"status": "not_ready"})
+        elif path == "/metrics":
+            self._send(200, CONTENT_TYPE_LATEST, generate_latest())
+        else:
+            self._send_json(404, {"status": "not_found"})
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        # Nothing reads a request body, drain it so the connection can be kept alive
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.profiler is not None and path.startswith("/debug/"):
+            self._send_debug("POST")
+        else:
+            self._send_json(404, {"status": "not_found"})
+
+    def _send_debug(self, method: str) -> None:
+        url = urlsplit(self.path)
+        status, body = self.profiler.handle(method, url.path, dict(parse_qsl(url.query)))
+        self._send(status, "text/plain; charset=utf-8", body.encode("utf-8"))
+
+    def _send_json(self, status: int, body: dict) -> None:
+        self._send(status, "application/json", json.dumps(body).encode("utf-8"))
+
+    def _send(self, status: int, content_type: str, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        # Probes hit every few seconds, only log them when debugging. Same as werkzeug's logger is set up in main
+        self._logger.debug(f"{self.address_string()} - {format % args}")
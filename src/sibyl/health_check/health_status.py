@@ -1,12 +1,25 @@
 from threading import Lock
+import time
+from typing import List, Optional
 
 class HealthStatus:
+    """
+    Health and readiness of the application, as reported by the health check endpoints.
+
+    Long running loops record heartbeats. Once a loop has sent a heartbeat, it must keep sending
+    them within heartbeat_timeout_seconds or the application is reported unhealthy, so a loop that
+    has silently stopped (ex. a watch hung on a half open connection) fails the liveness probe and
+    gets restarted. A heartbeat_timeout_seconds of 0 turns this off.
+    """
     
-    def __init__(self):
+    def __init__(self, heartbeat_timeout_seconds: float = 0):
         self._lock = Lock()
         self._healthy = True
         self._ready = True
         self._error_message = None
+        self.heartbeat_timeout_seconds = heartbeat_timeout_seconds
+        # Heartbeat name -> time.monotonic() of its last beat
+        self._heartbeats: dict[str, float] = {}
     
     def set_healthy(self, healthy: bool, error_message: str = None):
         """Set the health status."""
@@ -18,18 +31,38 @@ class HealthStatus:
         """Set the readiness status."""
         with self._lock:
             self._ready = ready
+
+    def heartbeat(self, name: str) -> None:
+        """Record that the named loop is still making progress."""
+        with self._lock:
+            self._heartbeats[name] = time.monotonic()
+
+    def get_stale_heartbeats(self) -> List[str]:
+        """Get the names of the heartbeats not seen within heartbeat_timeout_seconds."""
+        with self._lock:
+            return self._get_stale_heartbeats()
+
+    def _get_stale_heartbeats(self) -> List[str]:
+        if self.heartbeat_timeout_seconds <= 0:
+            return []
+        now = time.monotonic()
+        return [name for name, last_beat in self._heartbeats.items() if now - last_beat > self.heartbeat_timeout_seconds]
     
     def is_healthy(self) -> bool:
         """Check if application is healthy."""
         with self._lock:
-            return self._healthy
+            return self._healthy and not self._get_stale_heartbeats()
     
     def is_ready(self) -> bool:
         """Check if application is ready."""
         with self._lock:
             return self._ready
     
-    def get_error_message(self) -> str:
+    def get_error_message(self) -> Optional[str]:
         """Get the current error message."""
         with self._lock:
-            return self._error_message
\ No newline at end of file
+            if self._error_message is None:
+                stale_heartbeats = self._get_stale_heartbeats()
+                if stale_heartbeats:
+                    return f"No Heartbeat From {', '.join(stale_heartbeats)} In Over {self.heartbeat_timeout_seconds}s"
+            return self._error_message
@@ -1,35 +1,76 @@
-
+import functools
+from http.server import ThreadingHTTPServer
 import logging
-from threading import Thread, Lock
-from flask import Flask, jsonify
-from typing import Optional
+from threading import Thread
+from typing import TYPE_CHECKING, Literal, Optional
 
+from sibyl.health_check.health_request_handler import HealthRequestHandler
 from sibyl.health_check.health_status import HealthStatus
+from sibyl.health_check.process_profiler import ProcessProfiler
+
+if TYPE_CHECKING:
+    from flask import Flask
+
+
+HealthServer = Literal["flask", "stdlib"]
+
 
 class HealthStatusThread():
+    """
+    Serves the health check endpoints from a background thread, with either the Flask app on the
+    Werkzeug server or a threaded server from the standard library. Flask is only imported when it
+    is the server being used.
+    """
 
-    def __init__(self):
-        self.health_status = HealthStatus()
+    def __init__(self, server: HealthServer = "flask", heartbeat_timeout_seconds: float = 0, debug_endpoints: bool = False):
+        self.health_status = HealthStatus(heartbeat_timeout_seconds=heartbeat_timeout_seconds)
+        # Profiling endpoints under /debug/, only served when asked for
+        self.profiler: Optional[ProcessProfiler] = ProcessProfiler() if debug_endpoints else None
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.server: HealthServer = server
         self.thread: Optional[Thread] = None
-        self.app: Optional[Flask] = None
+        self.app: Optional["Flask"] = None
+        self.http_server: Optional[ThreadingHTTPServer] = None
 
     def get_health_status(self) -> HealthStatus:
         return self.health_status
 
     def start(self, host = "0.0.0.0", port = 8080, debug=False):
-        self.app = self.create_health_app()
-    
-        def run_server():
-            self.logger.info(f"Starting Health Endpoint On Port {port}")
-            self.app.run(host=host, port=port, debug=debug, use_reloader=False)
+        if self.server == "stdlib":
+            # Bind now, so a port already in use fails startup rather than the server thread
+            self.http_server = self.create_health_server(host, port)
+
+            def run_server():
+                self.logger.info(f"Starting Health Endpoint On Port {port}")
+                self.http_server.serve_forever()
+        else:
+            self.app = self.create_health_app()
+
+            def run_server():
+                self.logger.info(f"Starting Health Endpoint On Port {port}")
+                self.app.run(host=host, port=port, debug=debug, use_reloader=False)
         
         self.thread = Thread(target=run_server, daemon=True) # Daemon means it will terminate when the main thread terminates
         self.thread.start()
         self.logger.info("Health Check Endpoint Thread Started Successfully")
 
+    def create_health_server(self, host: str = "0.0.0.0", port: int = 8080) -> ThreadingHTTPServer:
+        """
+        Create a threaded standard library HTTP server serving the health check endpoints.
 
-    def create_health_app(self) -> Flask:
+        Args:
+            host: Address to listen on (default: 0.0.0.0)
+            port: Port to listen on (default: 8080)
+
+        Returns:
+            ThreadingHTTPServer instance, bound but not yet serving
+        """
+        http_server = ThreadingHTTPServer((host, port), functools.partial(HealthRequestHandler, health_status=self.health_status, profiler=self.profiler))
+        # Request threads should not hold up shutdown
+        http_server.daemon_threads = True
+        return http_server
+
+    def create_health_app(self) -> "Flask":
         """
         Create a minimal Flask app with a health check endpoint.
         
@@ -39,6 +80,9 @@ class HealthStatusThread():
         Returns:
             Flask application instance
         """
+        from flask import Flask, Response, jsonify, request
+        from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
         app = Flask('HealthStatusServer')
         
         @app.route('/health', methods=['GET'])
@@ -57,8 +101,19 @@ class HealthStatusThread():
                 return jsonify({"status": "ready"}), 200
             else:
                 return jsonify({"status": "not_ready"}), 503
+
+        @app.route('/metrics', methods=['GET'])
+        def metrics():
+            """Prometheus metrics endpoint."""
+            return Response(generate_latest(), status=200, headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+        if self.profiler is not None:
+            @app.route('/debug/<path:action>', methods=['GET', 'POST'])
+            def debug(action: str):
+                """Profiling endpoints, see ProcessProfiler."""
+                status, body = self.profiler.handle(request.method, f"/debug/{action}", request.args)
+                return Response(body, status=status, mimetype="text/plain")
         
         return app
         
         
-
@@ -0,0 +1,216 @@
+import io
+import logging
+import pstats
+import sys
+from threading import Event, Lock, Thread
+import threading
+import tracemalloc
+import traceback
+from types import FrameType
+from typing import Mapping, Optional
+
+
+class ProcessProfiler():
+    """
+    On demand CPU profiling, memory allocation tracing and thread stack dumps of the running process,
+    served from the health check server's /debug/ endpoints.
+
+    CPU profiles sample the stack of every thread at a fixed interval and are reported through pstats.
+    cProfile only profiles the thread that enables it, which would miss the watcher, fetcher and
+    notifier threads that are already running. Times are wall clock, so a thread waiting on the
+    network or a lock shows the time in the function that is waiting. Call counts are sample counts.
+
+    Routes:
+    - POST /debug/profile/start?interval=0.01&thread=<thread name prefix>
+    - POST /debug/profile/stop?sort=cumulative&limit=50
+    - POST /debug/tracemalloc/start?frames=10
+    - GET  /debug/tracemalloc?limit=25&reset=false
+    - POST /debug/tracemalloc/stop
+    - GET  /debug/threads
+    """
+
+    SAMPLER_THREAD_NAME = "ProcessProfilerSampler"
+
+    # pstats treats functions with this caller as top level, same as cProfile does for the outermost frames
+    TOP_LEVEL_CALLER = ("jprofile", 0, "profiler")
+
+    def __init__(self):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._lock = Lock()
+
+        self._sampler: Optional[Thread] = None
+        self._stop_event: Event = Event()
+        self._interval_seconds = 0.01
+        self._thread_name_prefix: Optional[str] = None
+        self._samples = 0
+        # (filename, line, function) -> [samples on the stack, samples as the leaf frame, {caller: samples}]
+        self._functions: dict[tuple[str, int, str], list] = {}
+
+        self._tracemalloc_baseline: Optional[tracemalloc.Snapshot] = None
+
+    def handle(self, method: str, path: str, query: Mapping[str, str]) -> tuple[int, str]:
+        """Handle a /debug/ request, returning the status code and plain text body."""
+        routes = {
+            ("POST", "/debug/profile/start"): lambda: self.start_cpu_profile(
+                interval_seconds=float(query.get("interval", 0.01)),
+                thread_name_prefix=query.get("thread")
+            ),
+            ("POST", "/debug/profile/stop"): lambda: self.stop_cpu_profile(
+                sort_by=query.get("sort", "cumulative"),
+                limit=int(query.get("limit", 50))
+            ),
+            ("POST", "/debug/tracemalloc/start"): lambda: self.start_memory_trace(frames=int(query.get("frames", 10))),
+            ("GET", "/debug/tracemalloc"): lambda: self.get_memory_diff(
+                limit=int(query.get("limit", 25)),
+                reset=str(query.get("reset", "false")).lower() in ("1", "true", "yes")
+            ),
+            ("POST", "/debug/tracemalloc/stop"): self.stop_memory_trace,
+            ("GET", "/debug/threads"): lambda: (200, self.dump_thread_stacks()),
+        }
+
+        route = routes.get((method, path))
+        if route is None:
+            if any(route_path == path for _, route_path in routes):
+                return 405, "Method Not Allowed\n"
+            return 404, "Not Found\n"
+
+        try:
+            return route()
+        except (KeyError, ValueError) as e:
+            return 400, f"Bad Request: {e}\n"
+
+    def start_cpu_profile(self, interval_seconds: float = 0.01, thread_name_prefix: Optional[str] = None) -> tuple[int, str]:
+        if interval_seconds <= 0:
+            raise ValueError("interval must be greater than 0")
+
+        with self._lock:
+            if self._sampler is not None:
+                return 409, "CPU Profile Already Running\n"
+
+            self._interval_seconds = interval_seconds
+            self._thread_name_prefix = thread_name_prefix
+            self._samples = 0
+            self._functions = {}
+            self._stop_event.clear()
+            self._sampler = Thread(target=self._sample, name=self.SAMPLER_THREAD_NAME, daemon=True)
+            self._sampler.start()
+
+        self._logger.info(f"Started CPU Profile. Sampling Every {interval_seconds}s")
+        return 200, f"CPU Profile Started. Sampling Every {interval_seconds}s\n"
+
+    def stop_cpu_profile(self, sort_by: str = "cumulative", limit: int = 50) -> tuple[int, str]:
+        # Checked before stopping, so a bad sort key does not throw away the profile
+        if sort_by not in pstats.Stats.sort_arg_dict_default:
+            raise ValueError(f"Unknown sort {sort_by}")
+
+        with self._lock:
+            sampler, self._sampler = self._sampler, None
+        if sampler is None:
+            return 409, "CPU Profile Not Running\n"
+
+        self._stop_event.set()
+        sampler.join()
+        self._logger.info(f"Stopped CPU Profile After {self._samples} Samples")
+
+        stream = io.StringIO()
+        stream.write(f"{self._samples} Samples Every {self._interval_seconds}s. ncalls Are Sample Counts, Times Are Wall Clock\n")
+        stats = pstats.Stats(stream=stream)
+        stats.stats = self._create_stats()
+        if stats.stats:
+            stats.get_top_level_stats()
+            stats.sort_stats(sort_by).print_stats(limit)
+        return 200, stream.getvalue()
+
+    def _sample(self) -> None:
+        sampler_ident = threading.get_ident()
+        while not self._stop_event.wait(self._interval_seconds):
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == sampler_ident:
+                    continue
+                if self._thread_name_prefix and not thread_names.get(ident, "").startswith(self._thread_name_prefix):
+                    continue
+                self._record_stack(frame)
+            self._samples += 1
+
+    def _record_stack(self, frame: Optional[FrameType]) -> None:
+        seen: set[tuple[str, int, str]] = set()
+        leaf = True
+        while frame is not None:
+            code = frame.f_code
+            function = (code.co_filename, code.co_firstlineno, code.co_name)
+            caller_frame = frame.f_back
+            caller = (caller_frame.f_code.co_filename, caller_frame.f_code.co_firstlineno, caller_frame.f_code.co_name) if caller_frame is not None else self.TOP_LEVEL_CALLER
+
+            entry = self._functions.setdefault(function, [0, 0, {}])
+            # Recursive functions are only counted once per sample, same as cProfile's cumulative time
+            if function not in seen:
+                entry[0] += 1
+                seen.add(function)
+            if leaf:
+                entry[1] += 1
+                leaf = False
+            entry[2][caller] = entry[2].get(caller, 0) + 1
+
+            frame = caller_frame
+
+    def _create_stats(self) -> dict:
+        """Convert the samples into pstats' (primitive calls, calls, total time, cumulative time, callers) form."""
+        return {
+            function: (on_stack, on_stack, leaf * self._interval_seconds, on_stack * self._interval_seconds, callers)
+            for function, (on_stack, leaf, callers) in self._functions.items()
+        }
+
+    def start_memory_trace(self, frames: int = 10) -> tuple[int, str]:
+        if frames < 1:
+            raise ValueError("frames must be at least 1")
+
+        with self._lock:
+            if tracemalloc.is_tracing():
+                return 409, "Memory Trace Already Running\n"
+            tracemalloc.start(frames)
+            self._tracemalloc_baseline = tracemalloc.take_snapshot()
+
+        self._logger.info(f"Started Memory Trace. Keeping {frames} Frames Per Allocation")
+        return 200, f"Memory Trace Started. Keeping {frames} Frames Per Allocation\n"
+
+    def get_memory_diff(self, limit: int = 25, reset: bool = False) -> tuple[int, str]:
+        """The allocations that grew the most since the memory trace started, or since the last reset."""
+        with self._lock:
+            if not tracemalloc.is_tracing() or self._tracemalloc_baseline is None:
+                return 409, "Memory Trace Not Running\n"
+
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            ))
+            differences = snapshot.compare_to(self._tracemalloc_baseline, "lineno")
+            if reset:
+                self._tracemalloc_baseline = snapshot
+
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [f"Traced Memory: {current / 1024:.1f} KiB Current, {peak / 1024:.1f} KiB Peak. Top {limit} Differences:"]
+        lines.extend(str(difference) for difference in differences[:limit])
+        return 200, "\n".join(lines) + "\n"
+
+    def stop_memory_trace(self) -> tuple[int, str]:
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                return 409, "Memory Trace Not Running\n"
+            tracemalloc.stop()
+            self._tracemalloc_baseline = None
+
+        self._logger.info("Stopped Memory Trace")
+        return 200, "Memory Trace Stopped\n"
+
+    def dump_thread_stacks(self) -> str:
+        frames = sys._current_frames()
+        sections = []
+        for thread in threading.enumerate():
+            frame = frames.get(thread.ident)
+            if frame is None:
+                continue
+            header = f"Thread {thread.name} (ident: {thread.ident}, daemon: {thread.daemon})"
+            sections.append(header + "\n" + "".join(traceback.format_stack(frame)))
+        return "\n".join(sections)
@@ -0,0 +1,89 @@
+import logging
+import socket
+from threading import Lock
+from typing import Optional
+
+from kubernetes import client, config
+from urllib3.connection import HTTPConnection
+
+
+class _PooledApiClient(client.ApiClient):
+    """
+    ApiClient that applies default connect and read timeouts to every request that does not set its
+    own _request_timeout. Watches are held open by the apiserver for their timeoutSeconds, so their
+    read timeout is extended by that long.
+    """
+
+    def __init__(self, configuration: client.Configuration, connect_timeout: float, read_timeout: float):
+        super().__init__(configuration=configuration)
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+    def call_api(self, resource_path, method, path_params=None, query_params=None, *args, **kwargs):
+        if kwargs.get("_request_timeout") is None:
+            kwargs["_request_timeout"] = self._get_request_timeout(query_params)
+        return super().call_api(resource_path, method, path_params, query_params, *args, **kwargs)
+
+    def _get_request_timeout(self, query_params: Optional[list]) -> tuple[float, float]:
+        params = dict(query_params or [])
+        if params.get("watch") and params.get("timeoutSeconds"):
+            return (self.connect_timeout, params["timeoutSeconds"] + self.read_timeout)
+        return (self.connect_timeout, self.read_timeout)
+
+
+class K8ClientFactory():
+    """
+    Builds the Kubernetes API clients for Sibyl from one shared ApiClient, so the event watch, pod
+    watch and log fetches all reuse the same pool of TLS connections to the apiserver.
+
+    The in cluster configuration is loaded once, on the first client requested.
+    """
+
+    # Probe idle connections so ones silently dropped by the network are noticed and replaced
+    TCP_KEEPALIVE_IDLE_SECONDS = 30
+    TCP_KEEPALIVE_INTERVAL_SECONDS = 10
+    TCP_KEEPALIVE_PROBES = 3
+
+    def __init__(self, pool_size: int = 10, connect_timeout: float = 5.0, read_timeout: float = 30.0, tcp_keepalive: bool = True):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._lock = Lock()
+        self._api_client: Optional[client.ApiClient] = None
+        # Number of connections kept open to the apiserver. urllib3 does not block when they are all in use,
+        # requests beyond this open a one-off connection that is closed once the request is done
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.tcp_keepalive = tcp_keepalive
+
+    def get_api_client(self) -> client.ApiClient:
+        with self._lock:
+            if self._api_client is None:
+                self._api_client = self._create_api_client()
+            return self._api_client
+
+    def get_core_v1_client(self) -> client.CoreV1Api:
+        return client.CoreV1Api(api_client=self.get_api_client())
+
+    def _create_api_client(self) -> client.ApiClient:
+        configuration = client.Configuration()
+        config.load_incluster_config(client_configuration=configuration)
+        configuration.connection_pool_maxsize = self.pool_size
+
+        api_client = _PooledApiClient(configuration, connect_timeout=self.connect_timeout, read_timeout=self.read_timeout)
+        if self.tcp_keepalive:
+            # Picked up by every connection pool the pool manager creates from here on
+            api_client.rest_client.pool_manager.connection_pool_kw["socket_options"] = self._get_keepalive_socket_options()
+
+        self._logger.debug(f"Created K8s ApiClient. Pool Size: {self.pool_size} Connect Timeout: {self.connect_timeout}s Read Timeout: {self.read_timeout}s")
+        return api_client
+
+    def _get_keepalive_socket_options(self) -> list[tuple[int, int, int]]:
+        socket_options = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+        # The probe timings are not available on every platform
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            socket_options += [
+                (socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, self.TCP_KEEPALIVE_IDLE_SECONDS),
+                (socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, self.TCP_KEEPALIVE_INTERVAL_SECONDS),
+                (socket.IPPROTO_TCP, socket.TCP_KEEPCNT, self.TCP_KEEPALIVE_PROBES),
+            ]
+        return socket_options
@@ -0,0 +1,93 @@
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+import time
+from typing import Optional
+
+
+# (namespace, pod name, container name, restart count, previous)
+LogCacheKey = tuple[str, str, str, int, bool]
+
+
+@dataclass
+class _LogCacheEntry:
+    logs: str
+    size: int
+    expires_at: Optional[float]
+
+
+class LogCache():
+    """
+    LRU cache of fetched container logs, bounded by the total size of the cached logs in bytes.
+
+    Logs are keyed on the container instance they came from (namespace, pod, container, restart count)
+    and whether they are the previous or current logs. Previous logs of a container instance never
+    change, so they are kept until evicted. Current logs are still being written to, so they expire
+    after current_ttl_seconds.
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024, current_ttl_seconds: int = 30):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._lock = Lock()
+        self._entries: OrderedDict[LogCacheKey, _LogCacheEntry] = OrderedDict()
+        self.max_bytes = max_bytes
+        self.current_ttl_seconds = current_ttl_seconds
+        self._size = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: LogCacheKey) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at is not None and time.monotonic() >= entry.expires_at:
+                self._remove(key)
+                entry = None
+
+            if entry is None:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry.logs
+
+    def set(self, key: LogCacheKey, logs: str) -> None:
+        size = len(logs.encode("utf-8"))
+        if size > self.max_bytes:
+            self._logger.debug(f"Logs For {key} Larger Than The Log Cache. Not Caching")
+            return
+
+        previous = key[4]
+        expires_at = None if previous else time.monotonic() + self.current_ttl_seconds
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = _LogCacheEntry(logs=logs, size=size, expires_at=expires_at)
+            self._size += size
+
+            while self._size > self.max_bytes:
+                evicted_key = next(iter(self._entries))
+                self._remove(evicted_key)
+                self._evictions += 1
+                self._logger.debug(f"Evicted Log Cache Entry: {evicted_key}")
+
+    def _remove(self, key: LogCacheKey) -> None:
+        # Must be called with the lock held
+        entry = self._entries.pop(key)
+        self._size -= entry.size
+
+    def get_stats(self) -> dict[str, int]:
+        """Get the hit, miss and eviction counters along with the number and total bytes of cached logs."""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "size": len(self._entries),
+                "bytes": self._size,
+            }
@@ -1,10 +1,18 @@
 
 
 import logging
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional
-from kubernetes import client, config
+from kubernetes import client
 
+from sibyl.k8_client_factory import K8ClientFactory
+from sibyl.log_cache import LogCache
+from sibyl.metrics import LOG_FETCH_DURATION
 from sibyl.models.events.k8_event import K8Event
+from sibyl.models.pods.k8_pod import K8Pod
+from sibyl.pod_watch.pod_cache import PodCache
 
 
 class LogFetcher():
@@ -16,17 +24,98 @@ class LogFetcher():
         "Failed"            # 'Failed' events often point directly to a container termination
     ]
 
-    def __init__(self):
+    # Container waiting reasons that mean the container itself has failed
+    FAILED_WAITING_REASONS = [
+        "CrashLoopBackOff",
+        "RunContainerError",
+        "CreateContainerError",
+        "CreateContainerConfigError",
+    ]
+
+    # Matches the container an event's involvedObject.fieldPath points at. Ex. spec.containers{app}
+    FIELD_PATH_CONTAINER_PATTERN = re.compile(r"^spec\.(?:initContainers|containers|ephemeralContainers)\{(?P<name>[^}]+)\}")
+
+    # Size of each read from the log stream
+    LOG_READ_CHUNK_BYTES = 64 * 1024
+
+    def __init__(self, max_workers: int = 4, pod_cache: Optional[PodCache] = None, all_containers: bool = False, max_log_bytes: int = 256 * 1024, since_seconds: Optional[int] = None, log_cache: Optional[LogCache] = None, client_factory: Optional[K8ClientFactory] = None):
         self._logger = logging.getLogger(self.__class__.__name__)
+        self.pod_cache: Optional[PodCache] = pod_cache
+        # When set, logs are fetched for every container in the pod rather than only the failing ones
+        self.all_containers = all_containers
+        # Upper bound on the bytes kept per container log, so one huge log line cannot blow up memory
+        self.max_log_bytes = max_log_bytes
+        # Optional window limiting logs to the last since_seconds seconds
+        self.since_seconds = since_seconds
+        # Repeat events for the same crashed container reuse the logs fetched for the first one
+        self.log_cache: Optional[LogCache] = log_cache
+        self.client_factory: K8ClientFactory = client_factory or K8ClientFactory()
+        # Shared across all events so the total number of concurrent log reads stays bounded
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="LogFetcher")
 
         try:
-            config.load_incluster_config()
-            self.core_v1_client = client.CoreV1Api()
+            self.core_v1_client = self.client_factory.get_core_v1_client()
             self._logger.debug("Loading K8s Configuration Successful")
         except Exception as e:
             self._logger.error("Exception Thrown Loading K8s In Cluster Configuration", exc_info=e)
             self._logger.error("Is External Secrets Reloader Running Inside Of A Kubernetes Cluster ?")
 
+    def _get_pod(self, namespace: str, pod_name: str) -> K8Pod:
+        """
+        Resolve the pod from the PodCache, only reading it from the apiserver on a cache miss. Until the
+        pod watch has finished its first list the cache is incomplete, so every pod is read.
+        """
+        if self.pod_cache is not None and self.pod_cache.has_synced():
+            pod = self.pod_cache.get(namespace, pod_name)
+            if pod is not None:
+                return pod
+            self._logger.debug(f"Pod Cache Miss For Pod: {namespace}/{pod_name}. Reading Pod Status")
+
+        try:
+            pod_status = self.core_v1_client.read_namespaced_pod_status(name=pod_name, namespace=namespace)
+            return PodCache.format_pod(pod_status)
+        except client.ApiException as e:
+            self._logger.error(f"Failed to read Pod status for Pod: {namespace}/{pod_name}", exc_info=e)
+            raise e
+
+    def get_pod(self, k8s_event: K8Event) -> Optional[K8Pod]:
+        """The event's pod, or None if the pod can not be read."""
+        namespace, pod_name, _ = self._get_pod_details(k8s_event)
+        try:
+            return self._get_pod(namespace, pod_name)
+        except client.ApiException:
+            return None
+
+    def get_restart_count(self, pod: K8Pod) -> int:
+        """Total container restarts of the pod."""
+        return sum(status.restart_count for status in pod.container_statuses)
+
+    def _get_failing_containers(self, k8s_event: K8Event, pod: K8Pod) -> List[str]:
+        """
+        Work out which containers the event is about. The event's fieldPath names the container when
+        the kubelet knows it, otherwise the container statuses are checked for restarts, failed
+        terminations and crash loops. If nothing stands out, all containers are returned.
+        """
+        field_path = k8s_event.involved_object.field_path
+        if field_path:
+            match = self.FIELD_PATH_CONTAINER_PATTERN.match(field_path)
+            if match:
+                return [match.group("name")]
+
+        failing = [
+            status.name
+            for status in pod.container_statuses
+            if status.restart_count > 0
+            or status.waiting_reason in self.FAILED_WAITING_REASONS
+            or (status.terminated_reason is not None and status.terminated_reason != "Completed")
+            or (status.last_terminated_reason is not None and status.last_terminated_reason != "Completed")
+        ]
+        if failing:
+            # Keep the pod's container order
+            return [container for container in pod.containers if container in failing] or failing
+
+        return pod.containers
+
     def _get_pod_details(self, event_data: K8Event) -> tuple[str, str, str]:
         """Helper to extract necessary details from the event_data."""
         namespace = event_data.namespace
@@ -35,19 +124,52 @@ class LogFetcher():
         return namespace, pod_name, reason
     
 
+    def _read_pod_log(self, pod_name: str, namespace: str, container_name: str, tail_lines: int, previous: bool) -> str:
+        """
+        Stream a container's log, keeping only the last max_log_bytes. The end of a log is where a crash
+        is, so the oldest chunks are dropped as newer ones arrive and memory stays bounded by the limit.
+        limit_bytes is not passed to the kubelet, as it keeps the start of the log rather than the end.
+        """
+        # Timed through to the end of the stream, as most of a log read is spent streaming it
+        with LOG_FETCH_DURATION.labels(previous=str(previous).lower()).time():
+            response = self.core_v1_client.read_namespaced_pod_log(
+                name=pod_name,
+                namespace=namespace,
+                container=container_name,
+                tail_lines=tail_lines,
+                previous=previous,
+                since_seconds=self.since_seconds,
+                _preload_content=False, # Hand us the raw response so the log is never loaded whole
+            )
+
+            chunks: deque[bytes] = deque()
+            size = 0
+            try:
+                for chunk in response.stream(amt=self.LOG_READ_CHUNK_BYTES, decode_content=True):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    # Drop the oldest chunks once the ones after them cover the limit on their own
+                    while size - len(chunks[0]) >= self.max_log_bytes:
+                        size -= len(chunks.popleft())
+            finally:
+                response.close()
+                response.release_conn()
+
+            log = b"".join(chunks)
+            if len(log) > self.max_log_bytes:
+                self._logger.debug(f"Log For Pod: {namespace}/{pod_name} Container: {container_name} Truncated To The Last {self.max_log_bytes} Bytes")
+                log = log[-self.max_log_bytes:]
+
+            # The byte limit can split a multi-byte character, so replace rather than fail on it
+            return log.decode("utf-8", errors="replace")
+
     def fetch_current_pod_logs_from_event(self, k8s_event: K8Event, container_name: str, tail_lines: int = 100) -> Optional[str]:
 
 
         namespace, pod_name, _ = self._get_pod_details(k8s_event)
 
         try:
-            log_response = self.core_v1_client.read_namespaced_pod_log(
-                name=pod_name,
-                namespace=namespace,
-                container=container_name,
-                tail_lines=tail_lines,
-                previous=False,
-            )
+            log_response = self._read_pod_log(pod_name, namespace, container_name, tail_lines, previous=False)
             self._logger.debug(f"Fetched current logs for Pod: {namespace}/{pod_name}")
             return log_response
         
@@ -64,13 +186,7 @@ class LogFetcher():
         namespace, pod_name, _ = self._get_pod_details(k8s_event)
 
         try:
-            log_response = self.core_v1_client.read_namespaced_pod_log(
-                name=pod_name,
-                namespace=namespace,
-                container=container_name,
-                tail_lines=tail_lines,
-                previous=True,
-            )
+            log_response = self._read_pod_log(pod_name, namespace, container_name, tail_lines, previous=True)
             self._logger.debug(f"Fetched previous logs for Pod: {namespace}/{pod_name}")
             return log_response
         except client.ApiException as e:
@@ -84,7 +200,8 @@ class LogFetcher():
             raise e
 
 
-    def fetch_pod_logs_from_event(self, k8s_event: K8Event, tail_lines: int = 100) -> List[tuple[str, str]]:
+    def fetch_pod_logs_from_event(self, k8s_event: K8Event, tail_lines: int = 100, pod: Optional[K8Pod] = None) -> List[tuple[str, str]]:
+        """Fetch the logs of the event's failing containers. pod is the event's pod when the caller already resolved it."""
 
         namespace, pod_name, reason = self._get_pod_details(k8s_event)
         fetch_previous = reason in self.PREVIOUS_LOG_REASONS
@@ -94,43 +211,61 @@ class LogFetcher():
         if reason == "Unhealthy" and "Liveness probe failed" in k8s_event.message:
             fetch_previous = True
 
-        containers = []
-        try:
-            pod_status = self.core_v1_client.read_namespaced_pod_status(name=pod_name, namespace=namespace)
-            containers.extend(pod_status.spec.containers if pod_status.spec.containers else [])
-        except client.ApiException as e:
-            self._logger.error(f"Failed to read Pod status for Pod: {namespace}/{pod_name}", exc_info=e)
-            raise e
+        if pod is None:
+            pod = self._get_pod(namespace, pod_name)
+        containers = pod.containers if self.all_containers else self._get_failing_containers(k8s_event, pod)
         
         if len(containers) == 0:
             self._logger.warning(f"No containers found in Pod ??: {namespace}/{pod_name}. Cannot fetch logs.")
             return []
 
-        try:
-            container_logs = list()
-            for container in containers:
-                container_name = container.name
-                self._logger.debug(f"Checking container: {container_name} in Pod: {namespace}/{pod_name}")
-
-                logs: Optional[str] = None
-
-                if fetch_previous:
-                    logs = self.fetch_previous_pod_logs_from_event(k8s_event, container_name, tail_lines)
-                    # If it returned None without an exception that means it was a 404 or some expected possible outcome
-                    if logs is not None:
-                        container_logs.append( (container_name, logs) )
-                        continue
-
-                    self._logger.debug(f"PREVIOUS logs not found for Pod: {namespace}/{pod_name}. Falling back to CURRENT logs.")
-
-                # We should check the current logs as well as a fallback for this
-                logs = self.fetch_current_pod_logs_from_event(k8s_event, container_name, tail_lines)
-                container_logs.append( (container_name, logs) )
+        restart_counts = {status.name: status.restart_count for status in pod.container_statuses}
 
-            return container_logs
+        try:
+            # Fetch every container concurrently. map() keeps the results in container order
+            return list(self._executor.map(
+                lambda container_name: self._fetch_container_logs(k8s_event, container_name, tail_lines, fetch_previous, restart_counts.get(container_name)),
+                containers
+            ))
         
         except client.ApiException as e:
             self._logger.error(f"Failed to fetch {'PREVIOUS' if fetch_previous else 'CURRENT'} logs for Pod: {namespace}/{pod_name}", exc_info=e)
             # if the above IF doesn't get anywhere then we throw our original exception
             raise e
-            
+
+    def _fetch_container_logs(self, k8s_event: K8Event, container_name: str, tail_lines: int, fetch_previous: bool, restart_count: Optional[int] = None) -> tuple[str, Optional[str]]:
+        namespace, pod_name, _ = self._get_pod_details(k8s_event)
+        self._logger.debug(f"Checking container: {container_name} in Pod: {namespace}/{pod_name}")
+
+        if fetch_previous:
+            logs = self._fetch_cached_logs(k8s_event, container_name, tail_lines, True, restart_count)
+            # If it returned None without an exception that means it was a 404 or some expected possible outcome
+            if logs is not None:
+                return (container_name, logs)
+
+            self._logger.debug(f"PREVIOUS logs not found for Pod: {namespace}/{pod_name}. Falling back to CURRENT logs.")
+
+        # We should check the current logs as well as a fallback for this
+        logs = self._fetch_cached_logs(k8s_event, container_name, tail_lines, False, restart_count)
+        return (container_name, logs)
+
+    def _fetch_cached_logs(self, k8s_event: K8Event, container_name: str, tail_lines: int, previous: bool, restart_count: Optional[int]) -> Optional[str]:
+        """
+        Fetch the previous or current logs, going through the LogCache when there is one. Without a
+        restart count the container instance the logs belong to is unknown, so the cache is skipped.
+        """
+        fetch = self.fetch_previous_pod_logs_from_event if previous else self.fetch_current_pod_logs_from_event
+        if self.log_cache is None or restart_count is None:
+            return fetch(k8s_event, container_name, tail_lines)
+
+        namespace, pod_name, _ = self._get_pod_details(k8s_event)
+        key = (namespace, pod_name, container_name, restart_count, previous)
+        logs = self.log_cache.get(key)
+        if logs is not None:
+            self._logger.debug(f"Log Cache Hit For {'PREVIOUS' if previous else 'CURRENT'} Logs: {namespace}/{pod_name} Container: {container_name}")
+            return logs
+
+        logs = fetch(k8s_event, container_name, tail_lines)
+        if logs is not None:
+            self.log_cache.set(key, logs)
+        return logs
@@ -1,17 +1,36 @@
 
 
+from datetime import datetime, timedelta, timezone
 import logging
-from queue import Queue, Empty
+from queue import Empty
 import signal
 from sys import exit, stdout
-from typing import List, Optional
+from typing import Callable, List, Optional
 from pythonjsonlogger import jsonlogger
 
+from sibyl.event_queue.event_dedup_cache import EventDedupCache
+from sibyl.event_queue.event_priority import EventPriority
+from sibyl.event_queue.event_processor_pool import EventProcessorPool
+from sibyl.event_queue.event_queue import EventQueue
+from sibyl.event_timing_recorder import EventTimingRecorder
+from sibyl.event_watch.event_watch import EventWatch
 from sibyl.event_watch.event_watch_thread import EventWatchThread
 from sibyl.health_check.health_status_thread import HealthStatusThread
+from sibyl.k8_client_factory import K8ClientFactory
+from sibyl.log_cache import LogCache
 from sibyl.log_fetcher import LogFetcher
+from sibyl.metrics import EVENT_DEDUP_CACHE_STATS, EVENT_QUEUE_DEPTH, EVENT_QUEUE_STATS, LOG_CACHE_STATS, NOTIFICATION_OUTBOX_STATS, POD_CACHE_STATS, SLACK_MESSAGE_INDEX_STATS
 from sibyl.models.events.k8_event import K8Event
+from sibyl.models.events.k8_event_timings import K8EventTimings
+from sibyl.models.notifications.notification_progress import NotificationProgress
+from sibyl.models.pods.k8_pod import K8Pod
+from sibyl.notifications.event_digest import EventDigest
+from sibyl.notifications.notification_outbox import NotificationOutbox
+from sibyl.notifications.slack_message_index import SlackMessageIndex
 from sibyl.notifications.slack_notifier import SlackNotifier
+from sibyl.notifications.slack_rate_limiter import SlackRateLimiter
+from sibyl.pod_watch.pod_cache import PodCache
+from sibyl.pod_watch.pod_watch_thread import PodWatchThread
 from sibyl.settings import Settings
 
 print("==== Starting Application ====")
@@ -94,6 +113,42 @@ signal.signal(signal.SIGTERM, signal_handler)
 
 print("==== SIG Handlers Registered ====")
 
+# Name the main processing loop's heartbeats are recorded under in the HealthStatus
+PROCESSING_HEARTBEAT_NAME = "event_processing"
+
+def notify_event(event: K8Event, logs: List[tuple[str,str]], restart_count: Optional[int], slack_notifier: SlackNotifier, event_timing_recorder: Optional[EventTimingRecorder] = None, progress: Optional[NotificationProgress] = None) -> None:
+    slack_notifier.notify(event, logs=logs, restart_count=restart_count, progress=progress)
+    if event_timing_recorder is not None:
+        event_timing_recorder.record(event)
+
+def process_event(event: K8Event, log_fetcher: LogFetcher, slack_notifier: SlackNotifier, notification_outbox: Optional[NotificationOutbox] = None, event_timing_recorder: Optional[EventTimingRecorder] = None) -> None:
+    logs: List[tuple[str,str]] = []
+    restart_count: Optional[int] = None
+
+    # We only fetch logs if the events are from pods and from kubelet
+    if "Pod" == event.involved_object.kind and "kubelet" == event.source.component:
+        logger.info(f"Processing event: {event}")
+        pod: Optional[K8Pod] = None
+        # The restart count is only used to tell whether a recurring event's pod restarted since its
+        # logs were uploaded, so the pod is only looked up ahead of the log fetch when messages are updated
+        if slack_notifier.message_index is not None:
+            pod = log_fetcher.get_pod(event)
+            restart_count = log_fetcher.get_restart_count(pod) if pod is not None else None
+        # Recurring events already have logs in their Slack thread unless the pod has restarted since
+        if slack_notifier.needs_logs(event, restart_count):
+            logs: List[tuple[str,str]] = log_fetcher.fetch_pod_logs_from_event(event, tail_lines=settings.POD_LOG_TAIL_LINES, pod=pod)
+            event.timings.mark(K8EventTimings.LOGS_FETCHED)
+            logger.debug(f"Fetched logs for event: {logs}")
+    else:
+        logger.debug(f"Event type is not from a Pod, skipping log fetch. Event Type: {event.involved_object.kind}. Component: {event.source.component}")
+
+    if notification_outbox is not None:
+        # Delivered to Slack by the outbox, which retries until Slack accepts it
+        notification_outbox.put(event, logs=logs, restart_count=restart_count)
+        return
+
+    notify_event(event, logs, restart_count, slack_notifier, event_timing_recorder)
+
 def main() -> None:
     global CONTINUE_PROCESSING
 
@@ -115,7 +170,7 @@ def main() -> None:
 
     # Start health check server for Kubernetes probes
     logger.info("Starting Health Check Endpoints")
-    hst = HealthStatusThread()
+    hst = HealthStatusThread(server=settings.HEALTH_CHECK_SERVER, heartbeat_timeout_seconds=settings.HEALTH_CHECK_HEARTBEAT_TIMEOUT_SECONDS, debug_endpoints=settings.HEALTH_CHECK_DEBUG_ENDPOINTS)
     hst.start(port=settings.HEALTH_CHECK_PORT, debug=(logging_level_int == logging.DEBUG))
     # Get the health status object to update during initialization
     health_status = hst.get_health_status()
@@ -123,29 +178,100 @@ def main() -> None:
     logger.debug("Health Check Endpoints Started")
 
     logger.info("Initializing Components")
-    event_queue = Queue()
+    event_priority = EventPriority(
+        reason_priorities=settings.EVENT_PRIORITY_REASONS,
+        type_priorities=settings.EVENT_PRIORITY_TYPES,
+        namespace_priorities=settings.EVENT_PRIORITY_NAMESPACES
+    )
+    event_queue = EventQueue(
+        maxsize=settings.EVENT_QUEUE_MAX_SIZE,
+        overflow_policy=settings.EVENT_QUEUE_OVERFLOW_POLICY,
+        priority_func=event_priority.get_priority,
+        aging_rate=settings.EVENT_PRIORITY_AGING_PER_SECOND
+    )
+    # Read from the queue each time /metrics is scraped
+    EVENT_QUEUE_DEPTH.set_function(event_queue.qsize)
+    EVENT_QUEUE_STATS.set_function(event_queue.get_stats)
     event_watch_thread: Optional[EventWatchThread] = None
     log_fetcher: Optional[LogFetcher] = None
+    # One pooled ApiClient shared by everything talking to the apiserver
+    client_factory = K8ClientFactory(
+        pool_size=settings.K8S_CLIENT_POOL_SIZE,
+        connect_timeout=settings.K8S_CLIENT_CONNECT_TIMEOUT_SECONDS,
+        read_timeout=settings.K8S_CLIENT_READ_TIMEOUT_SECONDS,
+        tcp_keepalive=settings.K8S_CLIENT_TCP_KEEPALIVE
+    )
 
 
     logger.info("Starting Kubernetes Event Watcher Thread")
     
     try:
-        event_watch_thread = EventWatchThread(event_queue)
+        field_selector = EventWatch.build_field_selector(
+            base_selector=settings.EVENT_FIELD_SELECTOR,
+            namespace=settings.EVENT_NAMESPACE,
+            involved_object_kind=settings.EVENT_INVOLVED_OBJECT_KIND
+        )
+        logger.debug(f"Kubernetes Event Watcher Field Selector: {field_selector}")
+        # Anything last seen before this has already been alerted on by a previous instance of Sibyl
+        event_cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.EVENT_STARTUP_LOOKBACK_SECONDS)
+        logger.debug(f"Kubernetes Event Watcher Ignoring Events Before: {event_cutoff.isoformat()}")
+        dedup_cache: Optional[EventDedupCache] = None
+        if settings.EVENT_DEDUP_WINDOW_SECONDS > 0:
+            dedup_cache = EventDedupCache(window_seconds=settings.EVENT_DEDUP_WINDOW_SECONDS, max_size=settings.EVENT_DEDUP_MAX_ENTRIES)
+            EVENT_DEDUP_CACHE_STATS.set_function(dedup_cache.get_stats)
+
+        event_watch_thread = EventWatchThread(event_queue, field_selector=field_selector, raw_json=settings.EVENT_WATCH_RAW_JSON, event_cutoff=event_cutoff, dedup_cache=dedup_cache, client_factory=client_factory, health_status=health_status)
         event_watch_thread.start()
     except Exception as e:
         logger.error(f"Failed to start Kubernetes Event Watcher Thread")
         event_watch_thread = None
         exit(1)
 
+    pod_cache: Optional[PodCache] = None
+    if settings.POD_CACHE_ENABLED:
+        logger.info("Starting Kubernetes Pod Watcher Thread")
+        try:
+            pod_cache = PodCache()
+            POD_CACHE_STATS.set_function(pod_cache.get_stats)
+            pod_watch_thread = PodWatchThread(pod_cache, namespace=settings.EVENT_NAMESPACE, client_factory=client_factory, health_status=health_status)
+            pod_watch_thread.start()
+        except Exception as e:
+            logger.error(f"Failed to start Kubernetes Pod Watcher Thread")
+            exit(1)
+
     try:
-        log_fetcher = LogFetcher()
+        log_cache = None
+        if settings.POD_LOG_CACHE_MAX_BYTES > 0:
+            log_cache = LogCache(max_bytes=settings.POD_LOG_CACHE_MAX_BYTES, current_ttl_seconds=settings.POD_LOG_CACHE_CURRENT_TTL_SECONDS)
+            LOG_CACHE_STATS.set_function(log_cache.get_stats)
+
+        log_fetcher = LogFetcher(
+            max_workers=settings.POD_LOG_FETCH_WORKERS,
+            pod_cache=pod_cache,
+            all_containers=settings.POD_LOG_ALL_CONTAINERS,
+            max_log_bytes=settings.POD_LOG_MAX_BYTES,
+            since_seconds=settings.POD_LOG_SINCE_SECONDS,
+            log_cache=log_cache,
+            client_factory=client_factory
+        )
     except Exception as e:
         logger.error(f"Failed to initialize LogFetcher")
         log_fetcher = None
         exit(1)
 
-    slack_notifier = SlackNotifier(bot_token=settings.SLACK_BOT_TOKEN, channel=settings.SLACK_CHANNEL, cluster_name=settings.CLUSTER_NAME)
+    slack_rate_limiter = SlackRateLimiter(max_retries=settings.SLACK_MAX_RETRIES, burst_seconds=settings.SLACK_RATE_LIMIT_BURST_SECONDS)
+    slack_message_index: Optional[SlackMessageIndex] = None
+    if settings.SLACK_MESSAGE_UPDATE_TTL_SECONDS > 0:
+        slack_message_index = SlackMessageIndex(ttl_seconds=settings.SLACK_MESSAGE_UPDATE_TTL_SECONDS, max_size=settings.SLACK_MESSAGE_INDEX_MAX_ENTRIES)
+        SLACK_MESSAGE_INDEX_STATS.set_function(slack_message_index.get_stats)
+    slack_notifier = SlackNotifier(
+        bot_token=settings.SLACK_BOT_TOKEN,
+        channel=settings.SLACK_CHANNEL,
+        cluster_name=settings.CLUSTER_NAME,
+        upload_workers=settings.SLACK_UPLOAD_WORKERS,
+        rate_limiter=slack_rate_limiter,
+        message_index=slack_message_index
+    )
 
     logger.debug("Kubernetes Event Watcher Thread Started")
 
@@ -153,29 +279,66 @@ def main() -> None:
     health_status.set_healthy(True)
     health_status.set_ready(True)
 
+    # Reports how long each event spent in each stage once its notification is sent
+    event_timing_recorder = EventTimingRecorder()
+
+    notification_outbox: Optional[NotificationOutbox] = None
+    if settings.NOTIFICATION_OUTBOX_PATH:
+        logger.info(f"Starting Notification Outbox Thread. Outbox: {settings.NOTIFICATION_OUTBOX_PATH}")
+        notification_outbox = NotificationOutbox(
+            path=settings.NOTIFICATION_OUTBOX_PATH,
+            deliver_func=lambda event, logs, restart_count, progress: notify_event(event, logs, restart_count, slack_notifier, event_timing_recorder, progress=progress),
+            flush_interval_seconds=settings.NOTIFICATION_OUTBOX_FLUSH_INTERVAL_SECONDS,
+            max_attempts=settings.NOTIFICATION_OUTBOX_MAX_ATTEMPTS
+        )
+        NOTIFICATION_OUTBOX_STATS.set_function(notification_outbox.get_stats)
+        notification_outbox.start()
+
+    processor_pool = EventProcessorPool(
+        process_func=lambda event: process_event(event, log_fetcher, slack_notifier, notification_outbox, event_timing_recorder),
+        worker_count=settings.EVENT_PROCESSING_WORKERS
+    )
+
+    dispatch_func: Callable[[K8Event], None] = processor_pool.submit
+    event_digest: Optional[EventDigest] = None
+    if settings.NOTIFICATION_DIGEST_WINDOW_SECONDS > 0:
+        # Events wait in the digest for their window, the ones not digested go on to the processing workers
+        event_digest = EventDigest(
+            notify_func=processor_pool.submit,
+            digest_func=lambda group_value, events: slack_notifier.notify_digest(settings.NOTIFICATION_DIGEST_GROUP_BY, group_value, events),
+            window_seconds=settings.NOTIFICATION_DIGEST_WINDOW_SECONDS,
+            min_events=settings.NOTIFICATION_DIGEST_MIN_EVENTS,
+            group_by=settings.NOTIFICATION_DIGEST_GROUP_BY,
+            max_events=settings.NOTIFICATION_DIGEST_MAX_EVENTS
+        )
+        dispatch_func = event_digest.submit
+
     logger.debug("Application Initialization Complete. Entering Main Processing Loop")
-    while CONTINUE_PROCESSING:
-        # Main loop can process events from the event_queue here
-        try:
-            event: K8Event = event_queue.get(block=True, timeout=30)  # Wait for an event for up to 30 seconds
-            logs: List[tuple[str,str]] = []
-
-            # We only fetch logs if the events are from pods and from kubelet
-            if "Pod" == event.involved_object.kind and "kubelet" == event.source.component:
-                logger.info(f"Processing event: {event}")
-                logs: List[tuple[str,str]] = log_fetcher.fetch_pod_logs_from_event(event, tail_lines=settings.POD_LOG_TAIL_LINES)
-                logger.debug(f"Fetched logs for event: {logs}")
-            else:
-                logger.debug(f"Event type is not from a Pod, skipping log fetch. Event Type: {event.involved_object.kind}. Component: {event.source.component}")
-
-            slack_notifier.notify(event, logs=logs)
-        except Empty:
-            # Timeout occurred, no event received, continue the loop
-            continue
-        except Exception as e:
-            logger.error(f"Error processing event: {e}", exc_info=e)
-            # Timeout occurred, no event received, continue the loop
-            continue
+    try:
+        while CONTINUE_PROCESSING:
+            # Goes stale if dispatching ever wedges. The queue get below wakes at least every 30 seconds
+            health_status.heartbeat(PROCESSING_HEARTBEAT_NAME)
+            # Main loop hands events from the event_queue to the processing workers
+            try:
+                event: K8Event = event_queue.get(block=True, timeout=30)  # Wait for an event for up to 30 seconds
+                event.timings.mark(K8EventTimings.DEQUEUED)
+                dispatch_func(event)
+            except Empty:
+                # Timeout occurred, no event received, continue the loop
+                continue
+            except Exception as e:
+                logger.error(f"Error dispatching event: {e}", exc_info=e)
+                continue
+    finally:
+        if event_digest is not None:
+            # Send whatever is still waiting in a digest window rather than dropping it
+            event_digest.flush()
+        # Let the workers finish whatever they already picked up before we go
+        processor_pool.shutdown()
+        if notification_outbox is not None:
+            # Anything not yet delivered stays in the outbox and is delivered on the next start
+            notification_outbox.stop()
+            notification_outbox.join(timeout=30)
 
 
     logger.info("Processing Has Stopped As We Are Shutting Down. Goodbye!")
\ No newline at end of file
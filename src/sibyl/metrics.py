@@ -0,0 +1,158 @@
+"""
+Prometheus metrics for Sibyl, served from the health check server's /metrics endpoint.
+
+Metrics are registered on the default prometheus_client registry when this module is imported, and
+updated by the components they describe.
+"""
+
+from typing import Callable, Iterable, Mapping, Optional
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+
+
+class StatsCollector(Collector):
+    """
+    Exports the counters a component already keeps for its get_stats(), read each time /metrics is
+    scraped rather than counted a second time on the hot path. Like Gauge.set_function, the component
+    is attached once it has been created, nothing is exported until then.
+    """
+
+    def __init__(self, prefix: str, counters: Mapping[str, str], gauges: Mapping[str, str] = {}, registry: CollectorRegistry = REGISTRY):
+        self.prefix = prefix
+        # get_stats() key -> metric documentation. Each key is exported as <prefix>_<key>
+        self.counters = counters
+        self.gauges = gauges
+        self._stats_func: Optional[Callable[[], Mapping[str, float]]] = None
+        registry.register(self)
+
+    def set_function(self, stats_func: Callable[[], Mapping[str, float]]) -> None:
+        self._stats_func = stats_func
+
+    def describe(self) -> Iterable[Metric]:
+        return self._create_metrics({})
+
+    def collect(self) -> Iterable[Metric]:
+        if self._stats_func is None:
+            return []
+        return self._create_metrics(self._stats_func())
+
+    def _create_metrics(self, stats: Mapping[str, float]) -> list[Metric]:
+        metrics: list[Metric] = []
+        for metric_type, metric_stats in ((CounterMetricFamily, self.counters), (GaugeMetricFamily, self.gauges)):
+            for key, documentation in metric_stats.items():
+                metric = metric_type(f"{self.prefix}_{key}", documentation)
+                if key in stats:
+                    metric.add_metric([], stats[key])
+                metrics.append(metric)
+        return metrics
+
+
+
+# Bucket boundaries in seconds. Kubernetes API calls are usually sub second, Slack calls a little slower
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Event timestamps only have second resolution, and a notification can wait on the queue, the digest and Slack's rate limits
+LAG_BUCKETS = (1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+# Waiting on a rate limit is usually nothing, then whole seconds once a method's burst is used up or Slack sends a Retry-After
+RATE_LIMIT_WAIT_BUCKETS = (0.0, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+# Stages run from a queue hand off of a millisecond to minutes waiting out Slack's rate limits
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+
+WATCH_EVENTS_RECEIVED = Counter(
+    "sibyl_watch_events_received_total",
+    "Kubernetes events received from the event watch"
+)
+WATCH_EVENTS_FILTERED = Counter(
+    "sibyl_watch_events_filtered_total",
+    "Kubernetes events received from the event watch that were not queued, by why they were filtered",
+    ["reason"]
+)
+
+EVENT_QUEUE_DEPTH = Gauge(
+    "sibyl_event_queue_depth",
+    "Events waiting in the event queue to be processed"
+)
+EVENT_QUEUE_STATS = StatsCollector("sibyl_event_queue", counters={
+    "dropped": "Events dropped by the event queue's overflow policy",
+    "coalesced": "Events merged into a matching event already waiting in the event queue",
+})
+EVENT_DEDUP_CACHE_STATS = StatsCollector("sibyl_event_dedup_cache", counters={
+    "hits": "Events suppressed as repeats inside the dedup window",
+    "misses": "Events let through the dedup cache",
+    "evictions": "Dedup cache entries evicted to stay under EVENT_DEDUP_MAX_ENTRIES",
+}, gauges={
+    "size": "Events tracked by the dedup cache",
+})
+
+POD_CACHE_STATS = StatsCollector("sibyl_pod_cache", counters={
+    "hits": "Pod lookups answered from the pod cache",
+    "misses": "Pod lookups the pod cache could not answer, falling back to the Kubernetes API",
+}, gauges={
+    "size": "Pods in the pod cache",
+})
+LOG_CACHE_STATS = StatsCollector("sibyl_log_cache", counters={
+    "hits": "Container log reads answered from the log cache",
+    "misses": "Container log reads not in the log cache",
+    "evictions": "Logs evicted from the log cache to stay under POD_LOG_CACHE_MAX_BYTES",
+}, gauges={
+    "size": "Container logs in the log cache",
+    "bytes": "Bytes of container logs in the log cache",
+})
+
+LOG_FETCH_DURATION = Histogram(
+    "sibyl_log_fetch_duration_seconds",
+    "Time taken to read a container's logs from the Kubernetes API, by whether the previous container's logs were read",
+    ["previous"],
+    buckets=LATENCY_BUCKETS
+)
+
+SLACK_REQUEST_DURATION = Histogram(
+    "sibyl_slack_request_duration_seconds",
+    "Time taken by Slack Web API calls, by method. Excludes time spent waiting on the rate limiter",
+    ["method"],
+    buckets=LATENCY_BUCKETS
+)
+SLACK_REQUEST_ERRORS = Counter(
+    "sibyl_slack_request_errors_total",
+    "Slack Web API calls that failed, by method and Slack error",
+    ["method", "error"]
+)
+SLACK_RATE_LIMIT_WAIT = Histogram(
+    "sibyl_slack_rate_limit_wait_seconds",
+    "Time Slack Web API calls waited for their method's rate limit before being sent, by method",
+    ["method"],
+    buckets=RATE_LIMIT_WAIT_BUCKETS
+)
+SLACK_THROTTLED = Counter(
+    "sibyl_slack_throttled_total",
+    "Slack Web API calls Slack answered as rate limited, by method",
+    ["method"]
+)
+SLACK_MESSAGE_INDEX_STATS = StatsCollector("sibyl_slack_message_index", counters={
+    "hits": "Recurring events that found the Slack message to update",
+    "misses": "Events with no Slack message to update",
+    "evictions": "Slack messages forgotten to stay under SLACK_MESSAGE_INDEX_MAX_ENTRIES",
+}, gauges={
+    "size": "Slack messages remembered for updating",
+})
+NOTIFICATION_OUTBOX_STATS = StatsCollector("sibyl_notification_outbox", counters={
+    "delivered": "Notifications delivered from the outbox",
+    "failed_attempts": "Outbox delivery attempts that failed and will be retried",
+    "dropped": "Notifications dropped from the outbox after NOTIFICATION_OUTBOX_MAX_ATTEMPTS",
+}, gauges={
+    "pending": "Notifications in the outbox waiting to be delivered",
+})
+
+NOTIFICATION_LAG = Histogram(
+    "sibyl_notification_lag_seconds",
+    "Time from an event's last timestamp to its notification being posted to Slack",
+    buckets=LAG_BUCKETS
+)
+
+EVENT_STAGE_DURATION = Histogram(
+    "sibyl_event_stage_duration_seconds",
+    "Time an event took to reach each stage of processing from the stage before it. The received stage is timed from the event's last timestamp",
+    ["stage"],
+    buckets=STAGE_BUCKETS
+)
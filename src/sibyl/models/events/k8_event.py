@@ -1,10 +1,12 @@
 
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Optional
 
 from sibyl.models.events.k8_event_involved_object import K8EventInvolvedObject
 from sibyl.models.events.k8_event_metadata import K8EventMetadata
 from sibyl.models.events.k8_event_source import K8EventSource
+from sibyl.models.events.k8_event_timings import K8EventTimings
 
 
 '''
@@ -52,5 +54,16 @@ class K8Event:
     metadata: K8EventMetadata
     involved_object: K8EventInvolvedObject
     timestamp: str
+    # Number of times this event occurred since it was last alerted on. Set by the EventDedupCache
+    count: int = 1
+    # When the event reached each stage of processing. Not part of the event's identity
+    timings: K8EventTimings = field(default_factory=K8EventTimings, compare=False, repr=False)
+
+    def get_alert_key(self) -> tuple[str, str, str, Optional[str], str]:
+        """
+        Identifies what the event alerts on, so repeats of it are deduplicated and update the same Slack
+        message. The field path tells apart events about different containers of the same pod.
+        """
+        return (*self.involved_object.get_key(), self.involved_object.field_path, self.reason)
 
 
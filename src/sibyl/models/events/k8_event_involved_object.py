@@ -1,5 +1,6 @@
 
 from dataclasses import dataclass
+from typing import Optional
 
 @dataclass
 class K8EventInvolvedObject:
@@ -8,4 +9,10 @@ class K8EventInvolvedObject:
     """
     kind: str
     name: str
-    namespace: str
\ No newline at end of file
+    namespace: str
+    # Points at the part of the object the event is about. For pods, the container. Ex. spec.containers{app}
+    field_path: Optional[str] = None
+
+    def get_key(self) -> tuple[str, str, str]:
+        """Identifies the object, ex. so events about the same pod are handled in order."""
+        return (self.namespace, self.kind, self.name)
@@ -0,0 +1,23 @@
+from dataclasses import dataclass, field
+import time
+from typing import ClassVar
+
+@dataclass
+class K8EventTimings:
+    """
+    Data class holding the wall clock time (time.time()) an event reached each stage of processing.
+    """
+    RECEIVED: ClassVar[str] = "received"            # Received from the event watch
+    QUEUED: ClassVar[str] = "queued"                # Put on the event queue
+    DEQUEUED: ClassVar[str] = "dequeued"            # Taken off the event queue by the main loop
+    LOGS_FETCHED: ClassVar[str] = "logs_fetched"    # Pod logs fetched, only for events that fetch logs
+    POSTED: ClassVar[str] = "posted"                # Slack message posted or updated
+    UPLOADED: ClassVar[str] = "uploaded"            # Log files uploaded to the Slack thread, only for events with logs
+
+    # Every stage in the order events pass through them
+    STAGES: ClassVar[tuple[str, ...]] = (RECEIVED, QUEUED, DEQUEUED, LOGS_FETCHED, POSTED, UPLOADED)
+
+    marks: dict[str, float] = field(default_factory=dict)
+
+    def mark(self, stage: str) -> None:
+        self.marks[stage] = time.time()
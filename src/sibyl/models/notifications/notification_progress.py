@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass
+class NotificationProgress:
+    """
+    Data class recording how far delivering a notification got, so a retry carries on from the stage
+    that failed rather than posting the event again.
+    """
+    # Slack message the event was posted as or updated. Set once the post or update succeeds
+    channel: Optional[str] = None
+    ts: Optional[str] = None
+    # Whether the notification's logs still have to be uploaded to the message's thread
+    logs_pending: bool = False
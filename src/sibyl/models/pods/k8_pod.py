@@ -0,0 +1,15 @@
+
+from dataclasses import dataclass, field
+from typing import List
+
+from sibyl.models.pods.k8_pod_container_status import K8PodContainerStatus
+
+@dataclass
+class K8Pod:
+    """
+    Data class representing the parts of a Kubernetes pod needed to fetch its logs.
+    """
+    namespace: str
+    name: str
+    containers: List[str]
+    container_statuses: List[K8PodContainerStatus] = field(default_factory=list)
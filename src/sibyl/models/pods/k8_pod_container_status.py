@@ -0,0 +1,15 @@
+
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass
+class K8PodContainerStatus:
+    """
+    Data class representing the status of a container within a Kubernetes pod.
+    """
+    name: str
+    restart_count: int
+    waiting_reason: Optional[str]
+    terminated_reason: Optional[str]
+    last_terminated_reason: Optional[str]
+    last_terminated_exit_code: Optional[int]
@@ -0,0 +1,123 @@
+import logging
+from threading import Lock, Timer
+from typing import Callable, List, Literal, Optional
+
+from sibyl.models.events.k8_event import K8Event
+
+
+DigestGroupBy = Literal["namespace", "node", "reason"]
+
+
+class EventDigest():
+    """
+    Collects events over a short window and groups them, so a burst of related events (ex. every pod
+    on a node that died) becomes one digest notification instead of one notification per event.
+
+    A group's window starts with its first event. When the window ends, a group with at least
+    min_events events is passed to digest_func. Smaller groups are passed to notify_func one event
+    at a time, the same as without the digest. A group that reaches max_events is sent straight away
+    rather than buffering the rest of its window. Events without a value to group on (ex. scheduler
+    and controller events have no node) are passed straight to notify_func, as grouping them
+    together would fold unrelated workloads into one digest.
+
+    Groups are sent from a timer thread, so notify_func should hand events off (ex. to the
+    EventProcessorPool) rather than process them itself.
+    """
+
+    def __init__(self, notify_func: Callable[[K8Event], None], digest_func: Callable[[str, List[K8Event]], None], window_seconds: float = 10, min_events: int = 3, group_by: DigestGroupBy = "node", max_events: int = 50):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self.notify_func = notify_func
+        self.digest_func = digest_func
+        self.window_seconds = window_seconds
+        self.min_events = min_events
+        self.max_events = max_events
+        self.group_by: DigestGroupBy = group_by
+
+        self._lock = Lock()
+        self._groups: dict[str, List[K8Event]] = {}
+        self._timers: dict[str, Timer] = {}
+        # Every timer started, including ones whose group is already being sent, so flush() can wait on them
+        self._started: List[Timer] = []
+
+    def get_group_key(self, event: K8Event) -> Optional[str]:
+        if self.group_by == "namespace":
+            return event.involved_object.namespace or None
+        if self.group_by == "reason":
+            return event.reason or None
+        # Node events and kubelet events carry the node name as the source host
+        return (event.source.host if event.source else None) or None
+
+    def submit(self, event: K8Event) -> None:
+        key = self.get_group_key(event)
+        if key is None:
+            self.notify_func(event)
+            return
+
+        with self._lock:
+            events = self._groups.get(key)
+            if events is None:
+                self._groups[key] = [event]
+                self._timers[key] = self._start_timer(self.window_seconds, self._flush_group, key)
+                return
+
+            events.append(event)
+            if len(events) < self.max_events:
+                return
+
+            # The group is full. Send it now and let its next event start a new window
+            del self._groups[key]
+            self._timers.pop(key).cancel()
+            self._start_timer(0, self._send, key, events)
+
+        self._logger.debug(f"Digest Group For {self.group_by}: {key} Reached {self.max_events} Events. Sending Early")
+
+    def _start_timer(self, interval: float, func: Callable, *args) -> Timer:
+        # Called with the lock held
+        timer = Timer(interval, func, args=args)
+        timer.daemon = True
+        timer.start()
+        self._started = [started for started in self._started if started.is_alive()]
+        self._started.append(timer)
+        return timer
+
+    def flush(self) -> None:
+        """
+        Notify on everything collected so far without waiting for the windows to end. Returns once
+        timers already sending a group have finished, so nothing reaches notify_func or digest_func
+        after flush() returns (ex. once the EventProcessorPool has been shut down).
+        """
+        with self._lock:
+            keys = list(self._groups)
+            for timer in self._timers.values():
+                timer.cancel()
+            started, self._started = self._started, []
+
+        for key in keys:
+            self._flush_group(key)
+        # Cancelled timers exit straight away, the rest are part way through sending their group
+        for timer in started:
+            timer.join()
+
+    def _flush_group(self, key: str) -> None:
+        with self._lock:
+            events = self._groups.pop(key, None)
+            self._timers.pop(key, None)
+
+        if events:
+            self._send(key, events)
+
+    def _send(self, key: str, events: List[K8Event]) -> None:
+        if len(events) >= self.min_events:
+            self._logger.info(f"Sending Digest Of {len(events)} Events For {self.group_by}: {key}")
+            self._call(self.digest_func, key, events)
+            return
+
+        for event in events:
+            self._call(self.notify_func, event)
+
+    def _call(self, func: Callable, *args) -> None:
+        # Runs on the timer thread, so failures are logged here rather than lost
+        try:
+            func(*args)
+        except Exception as e:
+            self._logger.error(f"Error sending event notification: {e}", exc_info=e)
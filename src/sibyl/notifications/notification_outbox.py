@@ -0,0 +1,201 @@
+from contextlib import contextmanager
+from dataclasses import asdict
+import json
+import logging
+import random
+import sqlite3
+from threading import Event, Lock, Thread
+import time
+from typing import Callable, Iterator, List, Optional
+
+from sibyl.models.events.k8_event import K8Event
+from sibyl.models.events.k8_event_involved_object import K8EventInvolvedObject
+from sibyl.models.events.k8_event_metadata import K8EventMetadata
+from sibyl.models.events.k8_event_source import K8EventSource
+from sibyl.models.events.k8_event_timings import K8EventTimings
+from sibyl.models.notifications.notification_progress import NotificationProgress
+
+
+class NotificationOutbox(Thread):
+    """
+    Durable outbox of notifications waiting to be sent, stored in SQLite in WAL mode.
+
+    Processed events are put in the outbox along with their fetched logs, and delivered to
+    deliver_func one at a time from this thread. A notification is removed as soon as deliver_func
+    returns for it and not before, so notifications that fail (ex. Slack is down) are retried with jittered exponential
+    backoff and notifications not yet delivered when Sibyl stops are delivered when it starts again.
+    deliver_func records each stage it completes in a NotificationProgress, which is saved with a
+    failed notification and handed back on the retry, so a notification whose post went through
+    but whose log upload failed only retries the upload. A crash part way through delivering can
+    still deliver a notification more than once, but it is not lost.
+
+    Puts are buffered in memory and written in one transaction every flush_interval_seconds (or
+    once batch_size are waiting), so the event processing path never waits on a disk sync. A crash
+    can lose at most the notifications put within the last flush interval.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event TEXT NOT NULL,
+            logs TEXT NOT NULL,
+            restart_count INTEGER,
+            progress TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL
+        )
+    """
+
+    def __init__(self, path: str, deliver_func: Callable[[K8Event, List[tuple[str, str]], Optional[int], NotificationProgress], None], batch_size: int = 100, flush_interval_seconds: float = 0.5, max_attempts: int = 10, retry_base_seconds: float = 5.0, retry_max_seconds: float = 300.0):
+        super().__init__(daemon=True)
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self.path = path
+        self.deliver_func = deliver_func
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+
+        self._lock = Lock()
+        self._buffer: List[tuple[str, str, Optional[int], float]] = []
+        self._wake_event: Event = Event()
+        self._stop_event: Event = Event()
+
+        self._delivered = 0
+        self._failed_attempts = 0
+        self._dropped = 0
+
+        # Only this thread writes after startup, the lock guards the connection against get_stats()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode NORMAL only syncs at checkpoints, commits do not each wait on the disk
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(self.SCHEMA)
+
+        pending = self._connection.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+        if pending:
+            self._logger.info(f"Notification Outbox Has {pending} Undelivered Notifications From A Previous Run")
+
+    def put(self, event: K8Event, logs: List[tuple[str, str]] = [], restart_count: Optional[int] = None) -> None:
+        row = (json.dumps(asdict(event)), json.dumps(logs), restart_count, time.time())
+        with self._lock:
+            self._buffer.append(row)
+            buffered = len(self._buffer)
+
+        if buffered >= self.batch_size:
+            self._wake_event.set()
+
+    def stop(self):
+        self._logger.info("Stopping Notification Outbox Thread")
+        self._stop_event.set()
+        self._wake_event.set()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self._wake_event.wait(timeout=self.flush_interval_seconds)
+            self._wake_event.clear()
+            try:
+                self._flush()
+                self._deliver_due()
+            except Exception as e:
+                self._logger.error(f"Error in Notification Outbox: {e}", exc_info=e)
+
+        # Whatever is still buffered is written so it is delivered on the next start
+        self._flush()
+        self._logger.info("Notification Outbox Thread Stopped")
+
+    def _flush(self) -> None:
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+            if not rows:
+                return
+
+            with self._transaction():
+                self._connection.executemany("INSERT INTO outbox (event, logs, restart_count, next_attempt_at) VALUES (?, ?, ?, ?)", rows)
+        self._logger.debug(f"Wrote {len(rows)} Notifications To The Outbox")
+
+    def _deliver_due(self) -> None:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, event, logs, restart_count, progress, attempts FROM outbox WHERE next_attempt_at <= ? ORDER BY id LIMIT ?",
+                (time.time(), self.batch_size)
+            ).fetchall()
+
+        for row_id, event_json, logs_json, restart_count, progress_json, attempts in rows:
+            if self._stop_event.is_set():
+                break
+            # Delivering a batch can take a while, keep writing new notifications to disk meanwhile
+            self._flush()
+
+            progress = NotificationProgress(**json.loads(progress_json)) if progress_json else NotificationProgress()
+            try:
+                event = self._deserialize_event(event_json)
+                logs = [tuple(log) for log in json.loads(logs_json)]
+                self.deliver_func(event, logs, restart_count, progress)
+            except Exception as e:
+                attempts += 1
+                if attempts >= self.max_attempts:
+                    self._logger.error(f"Dropping Notification {row_id} From The Outbox After {attempts} Failed Attempts", exc_info=e)
+                    self._remove(row_id)
+                    with self._lock:
+                        self._failed_attempts += 1
+                        self._dropped += 1
+                else:
+                    backoff = self._get_backoff(attempts)
+                    self._logger.warning(f"Failed To Deliver Notification {row_id} (Attempt {attempts}/{self.max_attempts}). Retrying In {backoff:.0f}s: {e}")
+                    # The retry picks up from the stage that failed
+                    with self._lock:
+                        self._connection.execute(
+                            "UPDATE outbox SET attempts = ?, next_attempt_at = ?, progress = ? WHERE id = ?",
+                            (attempts, time.time() + backoff, json.dumps(asdict(progress)), row_id)
+                        )
+                        self._failed_attempts += 1
+                continue
+
+            # Removed as soon as it is delivered, so a crash later in the batch does not send it again
+            self._remove(row_id)
+            with self._lock:
+                self._delivered += 1
+
+    def _remove(self, row_id: int) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM outbox WHERE id = ?", (row_id,))
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        # The connection is in autocommit mode, so group each batch into a single transaction (and sync)
+        self._connection.execute("BEGIN")
+        try:
+            yield
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+    def _get_backoff(self, attempts: int) -> float:
+        backoff = min(self.retry_max_seconds, self.retry_base_seconds * 2 ** (attempts - 1))
+        # Jitter so a backlog that failed together does not all retry together
+        return random.uniform(backoff / 2, backoff)
+
+    def _deserialize_event(self, event_json: str) -> K8Event:
+        data = json.loads(event_json)
+        return K8Event(**{
+            **data,
+            "source": K8EventSource(**data["source"]),
+            "metadata": K8EventMetadata(**data["metadata"]),
+            "involved_object": K8EventInvolvedObject(**data["involved_object"]),
+            # Kept so the time spent waiting in the outbox shows up in the event's timings
+            "timings": K8EventTimings(**data.get("timings", {})),
+        })
+
+    def get_stats(self) -> dict[str, int]:
+        """Get the delivered, failed attempt and dropped counters along with the number of notifications waiting."""
+        with self._lock:
+            pending = self._connection.execute("SELECT COUNT(*) FROM outbox").fetchone()[0] + len(self._buffer)
+            return {
+                "delivered": self._delivered,
+                "failed_attempts": self._failed_attempts,
+                "dropped": self._dropped,
+                "pending": pending,
+            }
@@ -0,0 +1,131 @@
+from typing import Optional
+
+from sibyl.models.events.k8_event import K8Event
+
+
+class SlackBlockTemplates():
+    """
+    Renders the Slack blocks of an event notification.
+
+    Everything that is the same for every notification (table headers, row labels, the divider, the
+    cluster field and header prefix) is built once when the templates are created and shared by
+    every rendered message. Rendering only builds the slots that change per event. Rendered blocks
+    must be treated as read only, as the static parts are shared between messages.
+    """
+
+    DIVIDER = {"type": "divider"}
+
+    def __init__(self, cluster_name: Optional[str] = None):
+        self._header_prefix = f"[{cluster_name}] " if cluster_name else ""
+
+        self._cluster_field: Optional[dict] = {
+            "type": "mrkdwn",
+            "text": f"*Cluster:*\n{cluster_name}"
+        } if cluster_name else None
+
+        self._timestamp_table_headers = [
+            self._create_rich_text_cell("Type", bold=True),
+            self._create_rich_text_cell("Timestamp", bold=True),
+        ]
+        self._event_timestamp_label = self._create_rich_text_cell("Event Timestamp")
+        self._creation_timestamp_label = self._create_rich_text_cell("Involved Object Creation Timestamp")
+        self._deletion_timestamp_label = self._create_rich_text_cell("Involved Object Deletion Timestamp")
+
+    @staticmethod
+    def _create_rich_text_cell(text: str, bold: bool = False) -> dict:
+        element = {
+            "type": "text",
+            "text": text
+        }
+        if bold:
+            element["style"] = {
+                "bold": True
+            }
+
+        return {
+            "type": "rich_text",
+            "elements": [
+                {
+                    "type": "rich_text_section",
+                    "elements": [element]
+                }
+            ]
+        }
+
+    def render_blocks(self, event_data: K8Event, occurrences: Optional[int] = None, last_seen: Optional[str] = None) -> list:
+        return [
+            {
+                "type": "section",
+                "text": {
+                    "type": "mrkdwn",
+                    "text": f"*{self._header_prefix}{event_data.type}:* {event_data.involved_object.kind} `{event_data.involved_object.namespace}/{event_data.involved_object.name}` -> {event_data.reason} "
+                }
+            },
+            {
+                "type": "section",
+                "fields": self.render_fields(event_data, occurrences=occurrences, last_seen=last_seen)
+            },
+            self.DIVIDER,
+            {
+                "type": "rich_text",
+                "elements": [
+                    {
+                        "type": "rich_text_preformatted",
+                        "elements": [
+                            {
+                                "type": "text",
+                                "text": event_data.message
+                            }
+                        ]
+                    }
+                ]
+            },
+            self.render_timestamp_table(event_data),
+        ]
+
+    def render_fields(self, event_data: K8Event, occurrences: Optional[int] = None, last_seen: Optional[str] = None) -> list:
+        fields = [
+            {
+                "type": "mrkdwn",
+                "text": f"*Namespace:*\n{event_data.involved_object.namespace}"
+            },
+            {
+                "type": "mrkdwn",
+                "text": f"*Involved Object:*\n{event_data.involved_object.kind} / `{event_data.involved_object.name}`"
+            },
+            {
+                "type": "mrkdwn",
+                "text": f"*Alert Type:*\n{event_data.type}"
+            },
+            {
+                "type": "mrkdwn",
+                "text": f"*Reason:*\n{event_data.reason}"
+            }
+        ]
+        if self._cluster_field is not None:
+            fields.insert(0, self._cluster_field)
+
+        if occurrences is not None:
+            # Updated message for a recurring event
+            fields.append({
+                "type": "mrkdwn",
+                "text": f"*Occurrences:*\n{occurrences}, last seen {last_seen}"
+            })
+        elif event_data.count > 1:
+            fields.append({
+                "type": "mrkdwn",
+                "text": f"*Occurrences:*\n{event_data.count} since last alert"
+            })
+
+        return fields
+
+    def render_timestamp_table(self, event_data: K8Event) -> dict:
+        return {
+            "type": "table",
+            "rows": [
+                self._timestamp_table_headers,
+                [self._event_timestamp_label, self._create_rich_text_cell(event_data.timestamp)],
+                [self._creation_timestamp_label, self._create_rich_text_cell(event_data.metadata.creation_timestamp or "N/A")],
+                [self._deletion_timestamp_label, self._create_rich_text_cell(event_data.metadata.deletion_timestamp or "N/A")],
+            ]
+        }
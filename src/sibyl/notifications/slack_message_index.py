@@ -0,0 +1,96 @@
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+import time
+from typing import Optional
+
+from sibyl.models.events.k8_event import K8Event
+
+
+@dataclass
+class SlackMessage:
+    """
+    A Slack message posted for an event, along with what is needed to update it in place.
+    """
+    channel: str
+    ts: str
+    expires_at: float
+    # Total occurrences shown on the message
+    count: int = 1
+    # Pod restart count when logs were last uploaded to the message's thread
+    restart_count: Optional[int] = None
+
+
+class SlackMessageIndex():
+    """
+    TTL bounded index of the Slack message posted for each (namespace, involved object, field path, reason), so
+    recurring events update their existing message instead of posting a new one.
+
+    A message is only updated for ttl_seconds after it was first posted, after that the next
+    occurrence posts a fresh message. Entries are evicted least recently used first once max_size
+    is reached.
+    """
+
+    def __init__(self, ttl_seconds: int = 3600, max_size: int = 1024):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._lock = Lock()
+        self._entries: OrderedDict[tuple[str, str, str, Optional[str], str], SlackMessage] = OrderedDict()
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, event: K8Event) -> Optional[SlackMessage]:
+        key = event.get_alert_key()
+        with self._lock:
+            message = self._entries.get(key)
+            if message is not None and time.monotonic() >= message.expires_at:
+                del self._entries[key]
+                message = None
+
+            if message is None:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return message
+
+    def peek(self, event: K8Event) -> Optional[SlackMessage]:
+        """Look the event's message up without counting a hit or miss or refreshing its recency."""
+        with self._lock:
+            message = self._entries.get(event.get_alert_key())
+            if message is None or time.monotonic() >= message.expires_at:
+                return None
+            return message
+
+    def set(self, event: K8Event, channel: str, ts: str, restart_count: Optional[int] = None) -> SlackMessage:
+        message = SlackMessage(channel=channel, ts=ts, expires_at=time.monotonic() + self.ttl_seconds, count=event.count, restart_count=restart_count)
+        key = event.get_alert_key()
+        with self._lock:
+            self._entries[key] = message
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                evicted_key, _ = self._entries.popitem(last=False)
+                self._evictions += 1
+                self._logger.debug(f"Evicted Slack Message Index Entry: {evicted_key}")
+
+        return message
+
+    def delete(self, event: K8Event) -> None:
+        with self._lock:
+            self._entries.pop(event.get_alert_key(), None)
+
+    def get_stats(self) -> dict[str, int]:
+        """Get the hit, miss and eviction counters along with the current index size."""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "size": len(self._entries),
+            }
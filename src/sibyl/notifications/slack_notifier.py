@@ -1,258 +1,310 @@
 
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from typing import List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 from slack_sdk.webhook import WebhookClient
 
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 
+from sibyl.metrics import NOTIFICATION_LAG
 from sibyl.models.events.k8_event import K8Event
+from sibyl.models.events.k8_event_timings import K8EventTimings
+from sibyl.models.notifications.notification_progress import NotificationProgress
 from sibyl.notifications.notifiable import Notifiable
+from sibyl.notifications.slack_block_templates import SlackBlockTemplates
+from sibyl.notifications.slack_message_index import SlackMessage, SlackMessageIndex
+from sibyl.notifications.slack_rate_limiter import SlackRateLimiter
 
 
 class SlackNotifier(Notifiable):
-    
-    def __init__(self, bot_token: str, channel: str, cluster_name: Optional[str] = None):
+
+    # Slack truncates message text beyond 40,000 characters, stay well under it
+    DIGEST_MESSAGE_MAX_CHARS = 3000
+
+    def __init__(self, bot_token: str, channel: str, cluster_name: Optional[str] = None, upload_workers: int = 4, rate_limiter: Optional[SlackRateLimiter] = None, message_index: Optional[SlackMessageIndex] = None):
         self._logger = logging.getLogger(self.__class__.__name__)
         self.client = WebClient(token=bot_token)
         self.channel = channel
         self.cluster_name = cluster_name
+        # Static parts of the notification blocks are built once here, rather than for every event
+        self.templates = SlackBlockTemplates(cluster_name=cluster_name)
+        # Every Slack API call goes through the rate limiter, so bursts of alerts queue instead of failing
+        self.rate_limiter = rate_limiter or SlackRateLimiter()
+        # Remembers the message posted for each event, so recurring events update it rather than posting again
+        self.message_index: Optional[SlackMessageIndex] = message_index
 
-    def _create_timestamp_table(self, event_data: K8Event) -> dict:
-        return {
-            "type": "table",
-            "rows": [
-                self._create_timestamp_table_headers(),
-                self._create_timestamp_table_row("Event Timestamp", event_data.timestamp),
-                self._create_timestamp_table_row("Involved Object Creation Timestamp", event_data.metadata.creation_timestamp or "N/A"),
-                self._create_timestamp_table_row("Involved Object Deletion Timestamp", event_data.metadata.deletion_timestamp or "N/A")
-            ]
-        }
-
-    def _create_timestamp_table_headers(self) -> list:
-        return [
-            {
-                "type": "rich_text",
-                "elements": [
-                    {
-                        "type": "rich_text_section",
-                        "elements": [
-                            {
-                                "type": "text",
-                                "text": "Type",
-                                "style": {
-                                    "bold": True
-                                }
-                            }
-                        ]
-                    }
-                ]
-            },
-            {
-                "type": "rich_text",
-                "elements": [
-                    {
-                        "type": "rich_text_section",
-                        "elements": [
-                            {
-                                "type": "text",
-                                "text": "Timestamp",
-                                "style": {
-                                    "bold": True
-                                }
-                            }
-                        ]
-                    }
-                ]
-            }
-        ]
-
-    def _create_timestamp_table_row(self, timestamp_type: str, timestamp: str) -> list:
-        return [
-                {
-                    "type": "rich_text",
-                    "elements": [
-                        {
-                            "type": "rich_text_section",
-                            "elements": [
-                                {
-                                    "type": "text",
-                                    "text": timestamp_type
-                                }
-                            ]
-                        }
-                    ]
-                },
-                {
-                    "type": "rich_text",
-                    "elements": [
-                        {
-                            "type": "rich_text_section",
-                            "elements": [
-                                {
-                                    "type": "text",
-                                    "text": timestamp
-                                }
-                            ]
-                        }
-                    ]
-                }
-            ]
-    
-    def _create_fields(self, event_data: K8Event) -> list:
-        base_fields = [
-            {
-                "type": "mrkdwn",
-                "text": f"*Namespace:*\n{event_data.involved_object.namespace}"
-            },
-            {
-                "type": "mrkdwn",
-                "text": f"*Involved Object:*\n{event_data.involved_object.kind} / `{event_data.involved_object.name}`"
-            },
-            {
-                "type": "mrkdwn",
-                "text": f"*Alert Type:*\n{event_data.type}"
-            },
-            {
-                "type": "mrkdwn",
-                "text": f"*Reason:*\n{event_data.reason}"
-            }
-        ]
+        # Log files are uploaded concurrently over a persistent session, so uploads reuse their connections
+        self._upload_executor = ThreadPoolExecutor(max_workers=upload_workers, thread_name_prefix="SlackUpload")
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_maxsize=upload_workers))
 
-        if self.cluster_name:
-            base_fields.insert(0, {
-                "type": "mrkdwn",
-                "text": f"*Cluster:*\n{self.cluster_name}"
-            })
+    def notify(self, event_data: K8Event, logs: List[tuple[str,str]] = [], restart_count: Optional[int] = None, progress: Optional[NotificationProgress] = None) -> None:
+        """
+        Post the event (or update the message already posted for it) and upload its logs to the thread.
+        progress is updated as each stage completes. Passing back the progress of a failed attempt carries
+        on from the stage that failed, so a retry neither posts the event twice nor skips its logs.
+        """
+        progress = progress if progress is not None else NotificationProgress()
+        if progress.ts is None and not self._post_message(event_data, logs, restart_count, progress):
+            return
 
-        return base_fields
+        # IF we have logs, then upload them and include them in a thread of the post
+        if progress.logs_pending:
+            if not self._upload_logs(event_data, logs, progress.channel, progress.ts):
+                # Left pending, so the progress does not claim logs that never reached the thread
+                self._logger.error(f"No logs were uploaded for event {event_data.involved_object.namespace}/{event_data.involved_object.name}")
+                return
+            progress.logs_pending = False
+            event_data.timings.mark(K8EventTimings.UPLOADED)
 
-    def notify(self, event_data: K8Event, logs: List[tuple[str,str]] = []) -> None:
+    def _post_message(self, event_data: K8Event, logs: List[tuple[str,str]], restart_count: Optional[int], progress: NotificationProgress) -> bool:
+        """Post the event, or update the message already posted for it. Returns False if neither succeeded."""
         self._logger.info(f"Sending Slack notification for event: {event_data.name} in namespace: {event_data.namespace}")
 
-        header_title = f"{event_data.type}:"
-        if self.cluster_name:
-            header_title = f"[{self.cluster_name}] "+ header_title 
-        bold_header_title = f"*{header_title}*"
-        
+        # Recurring events update the message already posted for them
+        message = self.message_index.get(event_data) if self.message_index is not None else None
+        if message is not None and self._update_message(event_data, message, logs, restart_count, progress):
+            return True
+
         # Notify slack of the event
-        postMessage_response = self.client.chat_postMessage(
+        postMessage_response = self.rate_limiter.call("chat.postMessage", self.client.chat_postMessage,
             channel=self.channel,
             text=f"*Kubernetes Ev[ent Notification*\n*Reason:* {event_data.reason}\n*Message:* {event_data.message}\n*Namespace:* {event_data.namespace}\n*Involved Object:* {event_data.involved_object.kind} / {event_data.involved_object.name}\n*Timestamp:* {event_data.timestamp}\n\n*Logs:*\n```{logs}```" if logs else "",
+            blocks=self.templates.render_blocks(event_data)
+        )
+
+        # Check the notification was successful
+        ok = postMessage_response.get("ok", False)
+        if not ok:
+            error = postMessage_response.get("error")
+            if error:
+                self._logger.error(f"Failed to post slack notification for event {event_data.involved_object.namespace}/{event_data.involved_object.name} to Slack: {error}")
+            return False
+
+        event_data.timings.mark(K8EventTimings.POSTED)
+        self._record_notification_lag(event_data)
+
+        progress.channel = postMessage_response.get('channel')
+        progress.ts = postMessage_response.get('ts')
+        progress.logs_pending = bool(logs)
+        if self.message_index is not None:
+            self.message_index.set(event_data, channel=str(progress.channel), ts=progress.ts, restart_count=restart_count)
+        return True
+
+    def needs_logs(self, event_data: K8Event, restart_count: Optional[int] = None) -> bool:
+        """
+        Whether a notification for the event would upload logs. Recurring events only upload logs
+        again when the pod has restarted since the last upload.
+        """
+        # Peeked so the lookup notify() makes for the same event is the only one counted
+        message = self.message_index.peek(event_data) if self.message_index is not None else None
+        return message is None or restart_count is None or restart_count != message.restart_count
+
+    def _update_message(self, event_data: K8Event, message: SlackMessage, logs: List[tuple[str,str]], restart_count: Optional[int], progress: NotificationProgress) -> bool:
+        """
+        Update the message previously posted for the event with the new occurrence count and last seen
+        time. Returns False if the message could not be updated, so a new one should be posted.
+        """
+        count = message.count + event_data.count
+        try:
+            update_response = self.rate_limiter.call("chat.update", self.client.chat_update,
+                channel=message.channel,
+                ts=message.ts,
+                text="",
+                blocks=self.templates.render_blocks(event_data, occurrences=count, last_seen=event_data.timestamp)
+            )
+        except SlackApiError as e:
+            # WebClient raises on ok: false, ex. message_not_found when the message was deleted
+            update_response = e.response
+
+        ok = update_response.get("ok", False)
+        if not ok:
+            error = update_response.get("error")
+            if error:
+                self._logger.warning(f"Failed to update slack notification for event {event_data.involved_object.namespace}/{event_data.involved_object.name}: {error}. Posting A New Notification")
+            self.message_index.delete(event_data)
+            return False
+
+        message.count = count
+        event_data.timings.mark(K8EventTimings.POSTED)
+        self._record_notification_lag(event_data)
+        self._logger.debug(f"Updated Slack notification for event {event_data.involved_object.namespace}/{event_data.involved_object.name}. Occurrences: {count}")
+
+        progress.channel = message.channel
+        progress.ts = message.ts
+        # Only upload logs again when the pod has restarted since the logs in the thread were uploaded
+        progress.logs_pending = bool(logs) and restart_count != message.restart_count
+        if progress.logs_pending:
+            message.restart_count = restart_count
+
+        return True
+
+    def _record_notification_lag(self, event_data: K8Event) -> None:
+        """Record how long after the event was last seen its notification reached Slack."""
+        try:
+            lag = datetime.now(timezone.utc) - datetime.fromisoformat(event_data.timestamp)
+        except (TypeError, ValueError):
+            # Events without a last timestamp ("N/A") can not be measured
+            return
+        NOTIFICATION_LAG.observe(max(0.0, lag.total_seconds()))
+
+    def _upload_logs(self, event_data: K8Event, logs: List[tuple[str,str]], channel_id: str, message_ts: str) -> bool:
+        """Upload the logs to the message's thread. Returns whether the logs of at least one container were posted."""
+        # Upload every container's logs at the same time. map() keeps the files in container order
+        uploaded_files = list(self._upload_executor.map(lambda log: self._upload_log_file(event_data, *log), logs))
+        files = [file for file in uploaded_files if file is not None]
+        if not files:
+            return False
+
+        container_names = ", ".join(file["container_name"] for file in files)
+        self._logger.debug("Sending To Channel ID: " + str(channel_id))
+        # Complete every upload in one call, posting the logs as a thread to the original message
+        completeUploadExternal_response = self.rate_limiter.call("files.completeUploadExternal", self.client.files_completeUploadExternal,
+            channels=[str(channel_id)],
+            thread_ts=message_ts,
+            initial_comment=f"Logs for Container{'s' if len(files) > 1 else ''}: {container_names} in Pod: {event_data.involved_object.namespace}/{event_data.involved_object.name}",
+            files=[{"id": file["id"], "title": file["title"]} for file in files]
+        )
+
+        # Check completion was successful
+        ok = completeUploadExternal_response.get("ok", False)
+        self._logger.debug(completeUploadExternal_response)
+        if not ok:
+            error = completeUploadExternal_response.get("error")
+            if error:
+                self._logger.error(f"Slack files.completeUploadExternal Failed for event {event_data.involved_object.namespace}/{event_data.involved_object.name} -> {container_names} to Slack: {error}")
+            return False
+
+        return True
+
+    def notify_digest(self, group_by: str, group_value: str, events: List[K8Event]) -> None:
+        """
+        Post a single summary message for a burst of events sharing the same group (namespace, node or
+        reason), with a line per event in a thread under it.
+        """
+        self._logger.info(f"Sending Slack digest notification for {len(events)} events with {group_by}: {group_value}")
+
+        header_title = f"{len(events)} Events on {group_by} `{group_value}`"
+        if self.cluster_name:
+            header_title = f"[{self.cluster_name}] " + header_title
+
+        reason_counts: dict[str, int] = {}
+        namespace_counts: dict[str, int] = {}
+        for event in events:
+            reason_counts[event.reason] = reason_counts.get(event.reason, 0) + event.count
+            namespace_counts[event.involved_object.namespace] = namespace_counts.get(event.involved_object.namespace, 0) + event.count
+
+        postMessage_response = self.rate_limiter.call("chat.postMessage", self.client.chat_postMessage,
+            channel=self.channel,
+            text=header_title,
             blocks=[
                 {
-                    "type" : "section",
+                    "type": "section",
                     "text": {
-                        "type":"mrkdwn",
-                        "text": f"{bold_header_title} {event_data.involved_object.kind} `{event_data.involved_object.namespace}/{event_data.involved_object.name}` -> {event_data.reason} "
+                        "type": "mrkdwn",
+                        "text": f"*{header_title}*"
                     }
                 },
-                
                 {
                     "type": "section",
-                    "fields": self._create_fields(event_data)
-                },
-                {
-                    "type": "divider"
-                },
-                {
-                    "type": "rich_text",
-                    "elements": [
+                    "fields": [
                         {
-                            "type": "rich_text_preformatted",
-                            "elements": [
-                                {
-                                    "type": "text",
-                                    "text": event_data.message
-                                }
-                            ]
+                            "type": "mrkdwn",
+                            "text": "*Reasons:*\n" + "\n".join(f"{reason}: {count}" for reason, count in sorted(reason_counts.items(), key=lambda item: -item[1]))
+                        },
+                        {
+                            "type": "mrkdwn",
+                            "text": "*Namespaces:*\n" + "\n".join(f"{namespace}: {count}" for namespace, count in sorted(namespace_counts.items(), key=lambda item: -item[1]))
                         }
                     ]
-                },
-                self._create_timestamp_table(event_data),
+                }
             ]
         )
 
-        # Check the notification was successful
         ok = postMessage_response.get("ok", False)
         if not ok:
             error = postMessage_response.get("error")
             if error:
-                self._logger.error(f"Failed to post slack notification for event {event_data.involved_object.namespace}/{event_data.involved_object.name} to Slack: {error}")
+                self._logger.error(f"Failed to post slack digest notification for {group_by} {group_value} to Slack: {error}")
             return
 
-        # IF we have logs, then upload them and include them in a thread of the post
-        if logs:
-            message_ts = postMessage_response.get('ts')
-            channel_id = postMessage_response.get('channel')
-
-            for log in logs:
-                container_name, log_content = log
+        message_ts = postMessage_response.get("ts")
+        channel_id = postMessage_response.get("channel")
 
-                file_name = f"logs_{event_data.involved_object.kind}_{event_data.involved_object.namespace}_{event_data.involved_object.name}_{container_name}.txt".lower().replace("-","_")
-
-                # Allocate upload space on Slack
-                getUploadURLExternal_response = self.client.files_getUploadURLExternal(
-                    filename=file_name,
-                    length=len(log_content),
-                    snippet_type="text"
-                )
+        detail_lines = [
+            f"• {event.involved_object.kind} `{event.involved_object.namespace}/{event.involved_object.name}` -> *{event.reason}*{f' (x{event.count})' if event.count > 1 else ''}: {event.message}"
+            for event in events
+        ]
+        # Keep each thread reply within the size Slack accepts for a single message
+        for details in self._chunk_lines(detail_lines, self.DIGEST_MESSAGE_MAX_CHARS):
+            thread_response = self.rate_limiter.call("chat.postMessage", self.client.chat_postMessage,
+                channel=str(channel_id),
+                thread_ts=message_ts,
+                text=details
+            )
 
-                # Check allocation was successful
-                ok = getUploadURLExternal_response.get("ok", False)
-                if not ok:
-                    error = getUploadURLExternal_response.get("error")
-                    if error:
-                        self._logger.error(f"Slack files.getUploadURLExternal Failed for event {event_data.involved_object.namespace}/{event_data.involved_object.name} -> {container_name} to Slack", exc_info=error)
-                    return
+            ok = thread_response.get("ok", False)
+            if not ok:
+                error = thread_response.get("error")
+                if error:
+                    self._logger.error(f"Failed to post slack digest details for {group_by} {group_value} to Slack: {error}")
+                return
 
+    def _chunk_lines(self, lines: List[str], max_chars: int) -> List[str]:
+        chunks: List[str] = []
+        current = ""
+        for line in lines:
+            line = line[:max_chars]
+            if current and len(current) + len(line) + 1 > max_chars:
+                chunks.append(current)
+                current = ""
+            current = f"{current}\n{line}" if current else line
+        if current:
+            chunks.append(current)
+        return chunks
 
-                upload_url = getUploadURLExternal_response.get("upload_url")
-                file_id = getUploadURLExternal_response.get("file_id")
+    def _upload_log_file(self, event_data: K8Event, container_name: str, log_content: str) -> Optional[dict]:
+        """
+        Allocate an upload on Slack and upload a container's logs to it. Returns the uploaded file
+        ready to be completed, or None if the upload failed.
+        """
+        file_name = f"logs_{event_data.involved_object.kind}_{event_data.involved_object.namespace}_{event_data.involved_object.name}_{container_name}.txt".lower().replace("-","_")
+        file_content = log_content.encode('utf-8')
 
+        # Allocate upload space on Slack
+        getUploadURLExternal_response = self.rate_limiter.call("files.getUploadURLExternal", self.client.files_getUploadURLExternal,
+            filename=file_name,
+            length=len(file_content),
+            snippet_type="text"
+        )
 
-                # Upload the actual log/file contents
-                try:
-                    headers = {
-                        # This header tells the server we are sending raw bytes
-                        'Content-Type': 'application/octet-stream'
-                    }
-                    upload_response = requests.post(
-                        upload_url, 
-                        headers=headers, 
-                        data=log_content.encode('utf-8'),
-                        
-                    )
-                    upload_response.raise_for_status()
-                except Exception as e:
-                    self._logger.error(f"Failed to upload logs for event {event_data.involved_object.namespace}/{event_data.involved_object.name} -> {container_name} to Slack", exc_info=e)
-                    return
-
-                self._logger.debug("Sending To Channel ID: " + str(channel_id))
-                # Complete the upload process, posting the logs as a thread to the original message
-                completeUploadExternal_response = self.client.files_completeUploadExternal(
-                    upload_url=upload_url,
-                    channels=[str(channel_id)],
-                    thread_ts=message_ts,
-                    initial_comment=f"Logs for Container: {container_name} in Pod: {event_data.involved_object.namespace}/{event_data.involved_object.name}",
-                    files=[
-                        {
-                            "id": file_id,
-                            "title": file_name,
-                        }
-                    ]
-                )
+        # Check allocation was successful
+        ok = getUploadURLExternal_response.get("ok", False)
+        if not ok:
+            error = getUploadURLExternal_response.get("error")
+            if error:
+                self._logger.error(f"Slack files.getUploadURLExternal Failed for event {event_data.involved_object.namespace}/{event_data.involved_object.name} -> {container_name} to Slack: {error}")
+            return None
 
-                # Check completion was successful
-                ok = completeUploadExternal_response.get("ok", False)
-                self._logger.debug(completeUploadExternal_response)
-                if not ok:
-                    error = completeUploadExternal_response.get("error")
-                    if error:
-                        self._logger.error(f"Slack files.completeUploadExternal Failed for event {event_data.involved_object.namespace}/{event_data.involved_object.name} -> {container_name} to Slack: {error}")
-                    return
+        upload_url = getUploadURLExternal_response.get("upload_url")
+        file_id = getUploadURLExternal_response.get("file_id")
 
+        # Upload the actual log/file contents
+        try:
+            headers = {
+                # This header tells the server we are sending raw bytes
+                'Content-Type': 'application/octet-stream'
+            }
+            upload_response = self._session.post(upload_url, headers=headers, data=file_content)
+            upload_response.raise_for_status()
+        except Exception as e:
+            self._logger.error(f"Failed to upload logs for event {event_data.involved_object.namespace}/{event_data.involved_object.name} -> {container_name} to Slack", exc_info=e)
+            return None
 
+        return {"id": file_id, "title": file_name, "container_name": container_name}
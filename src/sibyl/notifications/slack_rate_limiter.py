@@ -0,0 +1,205 @@
+import logging
+import random
+from threading import Lock
+import time
+from typing import Any, Callable, Optional, TypeVar
+
+from slack_sdk.errors import SlackApiError
+
+from sibyl.metrics import SLACK_RATE_LIMIT_WAIT, SLACK_REQUEST_DURATION, SLACK_REQUEST_ERRORS, SLACK_THROTTLED
+
+
+T = TypeVar("T")
+
+
+class _TokenBucket():
+    """
+    Token bucket that hands out reservations. Callers take a token even when the bucket is empty,
+    driving it negative, and wait until their token would have been refilled. Waiters are therefore
+    spread out at the bucket rate instead of all retrying at once.
+    """
+
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate_per_second = rate_per_second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        # Set from Retry-After, no calls are let through before this
+        self.blocked_until = 0.0
+        self._lock = Lock()
+
+    def reserve(self) -> float:
+        """Take a token, returning how many seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + max(0.0, now - self.updated) * self.rate_per_second)
+            self.updated = max(self.updated, now)
+            self.tokens -= 1
+
+            wait = -self.tokens / self.rate_per_second if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def block(self, seconds: float) -> None:
+        """Stop handing out tokens for the given number of seconds, as asked by Slack's Retry-After."""
+        with self._lock:
+            until = time.monotonic() + seconds
+            self.blocked_until = max(self.blocked_until, until)
+            # Start refilling from empty once the block ends, so the backlog drains at the bucket rate
+            self.tokens = min(self.tokens, 0.0)
+            self.updated = max(self.updated, until)
+
+
+class SlackRateLimiter():
+    """
+    Schedules outbound Slack Web API calls within Slack's rate limits.
+
+    Every method gets a token bucket refilling at its rate limit tier, with a burst of burst_seconds
+    worth of calls. Calls wait for a token before being made. If Slack still answers 429 ratelimited,
+    the method's bucket is paused for the Retry-After period and the call is retried with jittered
+    exponential backoff, up to max_retries times.
+    """
+
+    # Calls per minute for each Slack rate limit tier. https://api.slack.com/apis/rate-limits
+    TIER_RATES_PER_MINUTE = {
+        1: 1,
+        2: 20,
+        3: 50,
+        4: 100,
+    }
+
+    METHOD_TIERS = {
+        "chat.update": 3,
+        "files.getUploadURLExternal": 4,
+        "files.completeUploadExternal": 4,
+    }
+
+    # Methods with their own limit outside the tiers. chat.postMessage allows about one message per second per channel
+    METHOD_RATES_PER_MINUTE = {
+        "chat.postMessage": 60,
+    }
+
+    # Tier used for methods not listed above
+    DEFAULT_TIER = 3
+
+    HTTP_STATUS_TOO_MANY_REQUESTS = 429
+
+    def __init__(self, max_retries: int = 3, burst_seconds: float = 10.0, backoff_base_seconds: float = 1.0, backoff_max_seconds: float = 30.0):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self.max_retries = max_retries
+        self.burst_seconds = burst_seconds
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+
+        self._lock = Lock()
+        self._buckets: dict[str, _TokenBucket] = {}
+
+        self._calls = 0
+        self._throttled = 0
+        self._retries = 0
+        self._failures = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+
+    def _get_bucket(self, method: str) -> _TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(method)
+            if bucket is None:
+                rate_per_minute = self.METHOD_RATES_PER_MINUTE.get(method) or self.TIER_RATES_PER_MINUTE[self.METHOD_TIERS.get(method, self.DEFAULT_TIER)]
+                rate_per_second = rate_per_minute / 60
+                bucket = _TokenBucket(rate_per_second, capacity=max(1.0, rate_per_second * self.burst_seconds))
+                self._buckets[method] = bucket
+            return bucket
+
+    def call(self, method: str, func: Callable[..., T], **kwargs: Any) -> T:
+        """
+        Call func(**kwargs) for the Slack API method once its rate limit allows, retrying when Slack
+        answers ratelimited. Any other error, or running out of retries, is raised.
+        """
+        bucket = self._get_bucket(method)
+        attempt = 0
+        while True:
+            wait = bucket.reserve()
+            self._record_wait(method, wait)
+            if wait > 0:
+                self._logger.debug(f"Waiting {wait:.2f}s For Slack Rate Limit On {method}")
+                time.sleep(wait)
+
+            try:
+                return self._timed_call(method, func, **kwargs)
+            except SlackApiError as e:
+                if not self._is_rate_limited(e):
+                    raise e
+
+                retry_after = self._get_retry_after(e)
+                SLACK_THROTTLED.labels(method=method).inc()
+                with self._lock:
+                    self._throttled += 1
+                if retry_after is not None:
+                    bucket.block(retry_after)
+
+                if attempt >= self.max_retries:
+                    with self._lock:
+                        self._failures += 1
+                    self._logger.error(f"Slack {method} Rate Limited. Giving Up After {attempt} Retries")
+                    raise e
+
+                backoff = self._get_backoff(attempt, retry_after)
+                attempt += 1
+                with self._lock:
+                    self._retries += 1
+                self._logger.warning(f"Slack {method} Rate Limited. Retry-After: {retry_after}. Retrying In {backoff:.2f}s (Attempt {attempt}/{self.max_retries})")
+                time.sleep(backoff)
+
+    def _timed_call(self, method: str, func: Callable[..., T], **kwargs: Any) -> T:
+        start = time.perf_counter()
+        try:
+            return func(**kwargs)
+        except SlackApiError as e:
+            SLACK_REQUEST_ERRORS.labels(method=method, error=e.response.get("error") or "unknown").inc()
+            raise e
+        except Exception as e:
+            SLACK_REQUEST_ERRORS.labels(method=method, error=type(e).__name__).inc()
+            raise e
+        finally:
+            SLACK_REQUEST_DURATION.labels(method=method).observe(time.perf_counter() - start)
+
+    def _is_rate_limited(self, error: SlackApiError) -> bool:
+        response = error.response
+        return getattr(response, "status_code", None) == self.HTTP_STATUS_TOO_MANY_REQUESTS or response.get("error") == "ratelimited"
+
+    def _get_retry_after(self, error: SlackApiError) -> Optional[float]:
+        headers = getattr(error.response, "headers", None) or {}
+        for name, value in headers.items():
+            if name.lower() == "retry-after":
+                try:
+                    return float(value[0] if isinstance(value, list) else value)
+                except (TypeError, ValueError):
+                    return None
+        return None
+
+    def _get_backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        # Full jitter, so callers throttled together do not all retry together
+        backoff = random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** attempt))
+        if retry_after is not None:
+            # Retry-After is a minimum, the jitter spreads the retries out past it
+            return retry_after + backoff
+        return backoff
+
+    def _record_wait(self, method: str, wait: float) -> None:
+        SLACK_RATE_LIMIT_WAIT.labels(method=method).observe(wait)
+        with self._lock:
+            self._calls += 1
+            self._wait_seconds_total += wait
+            self._wait_seconds_max = max(self._wait_seconds_max, wait)
+
+    def get_stats(self) -> dict[str, float]:
+        """Get the call, throttled, retry and failure counters along with the time calls waited for the rate limit."""
+        with self._lock:
+            return {
+                "calls": self._calls,
+                "throttled": self._throttled,
+                "retries": self._retries,
+                "failures": self._failures,
+                "wait_seconds_total": self._wait_seconds_total,
+                "wait_seconds_max": self._wait_seconds_max,
+            }
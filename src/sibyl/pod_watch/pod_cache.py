@@ -0,0 +1,85 @@
+
+import logging
+from threading import Lock
+from typing import List, Optional
+
+from kubernetes.client import V1Pod
+
+from sibyl.models.pods.k8_pod import K8Pod
+from sibyl.models.pods.k8_pod_container_status import K8PodContainerStatus
+
+
+class PodCache():
+    """
+    Thread safe, in memory index of the pods in the cluster by namespace/name. Kept current by the
+    PodWatchThread so pod details can be resolved without a round trip to the apiserver.
+    """
+
+    def __init__(self):
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._lock = Lock()
+        self._pods: dict[tuple[str, str], K8Pod] = {}
+        self._synced = False
+
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def format_pod(pod: V1Pod) -> K8Pod:
+        """Formats the V1Pod object into the slimmed down K8Pod kept in the cache."""
+        containers = pod.spec.containers if pod.spec and pod.spec.containers else []
+        container_statuses = pod.status.container_statuses if pod.status and pod.status.container_statuses else []
+
+        return K8Pod(
+            namespace=pod.metadata.namespace,
+            name=pod.metadata.name,
+            containers=[container.name for container in containers],
+            container_statuses=[
+                K8PodContainerStatus(
+                    name=status.name,
+                    restart_count=status.restart_count or 0,
+                    waiting_reason=status.state.waiting.reason if status.state and status.state.waiting else None,
+                    terminated_reason=status.state.terminated.reason if status.state and status.state.terminated else None,
+                    last_terminated_reason=status.last_state.terminated.reason if status.last_state and status.last_state.terminated else None,
+                    last_terminated_exit_code=status.last_state.terminated.exit_code if status.last_state and status.last_state.terminated else None
+                )
+                for status in container_statuses
+            ]
+        )
+
+    def get(self, namespace: str, name: str) -> Optional[K8Pod]:
+        with self._lock:
+            pod = self._pods.get((namespace, name))
+            if pod is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+            return pod
+
+    def set(self, pod: K8Pod) -> None:
+        with self._lock:
+            self._pods[(pod.namespace, pod.name)] = pod
+
+    def delete(self, namespace: str, name: str) -> None:
+        with self._lock:
+            self._pods.pop((namespace, name), None)
+
+    def replace(self, pods: List[K8Pod]) -> None:
+        """Replace the whole cache contents, as done after a full relist of the pods."""
+        with self._lock:
+            self._pods = {(pod.namespace, pod.name): pod for pod in pods}
+            self._synced = True
+
+    def has_synced(self) -> bool:
+        """Check if the cache has been filled by at least one full list of the pods."""
+        with self._lock:
+            return self._synced
+
+    def get_stats(self) -> dict[str, int]:
+        """Get the hit and miss counters along with the number of pods cached."""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "size": len(self._pods),
+            }
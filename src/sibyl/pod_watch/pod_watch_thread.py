@@ -0,0 +1,134 @@
+from threading import Thread, Event
+from kubernetes import client, watch
+import logging
+import time
+from typing import Callable, Optional
+
+from sibyl.health_check.health_status import HealthStatus
+from sibyl.k8_client_factory import K8ClientFactory
+from sibyl.pod_watch.pod_cache import PodCache
+
+class PodWatchThread(Thread):
+    """
+    Informer style watch of the pods in the cluster, or in one namespace, keeping the PodCache current
+    from the watch deltas. Lists once to fill the cache, then resumes the watch from the last
+    resourceVersion seen (including bookmarks), only relisting if the apiserver answers 410 Gone.
+    """
+
+    HTTP_STATUS_GONE = 410
+
+    # Name the watch's heartbeats are recorded under in the HealthStatus
+    HEARTBEAT_NAME = "pod_watch"
+
+    def __init__(self, pod_cache: PodCache, namespace: Optional[str] = None, timeout_seconds: int = 300, relist_page_size: int = 500, client_factory: Optional[K8ClientFactory] = None, health_status: Optional[HealthStatus] = None):
+        super().__init__(daemon=True)
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self.pod_cache: PodCache = pod_cache
+        # Only pods in this namespace are cached when set, matching an event watch limited to it
+        self.namespace: Optional[str] = namespace
+        self.timeout_seconds = timeout_seconds
+        self.relist_page_size = relist_page_size
+        self.resource_version: Optional[str] = None
+        self.client_factory: K8ClientFactory = client_factory or K8ClientFactory()
+        # Heartbeats are recorded here whenever the watch hears from the apiserver
+        self.health_status: Optional[HealthStatus] = health_status
+        self._stop_event: Event = Event()
+
+        try:
+            self.core_v1_client = self.client_factory.get_core_v1_client()
+            self._logger.debug("Loading K8s Configuration Successful")
+        except Exception as e:
+            self._logger.error("Exception Thrown Loading K8s In Cluster Configuration", exc_info=e)
+
+            self.core_v1_client = None
+            self._stop_event.set()
+
+            raise e
+
+    def stop(self):
+        self._logger.info("Stopping Pod Watch Thread")
+        self._stop_event.set()
+
+    def run(self):
+        # Start the clock, a watch that never connects is as stalled as one that stops
+        self._heartbeat()
+        while not self._stop_event.is_set():
+            try:
+                if self.resource_version is None:
+                    self._relist()
+
+                self._watch()
+
+                # If the loop naturally finishes (e.g., due to timeout_seconds), reconnect
+                self._logger.debug("Pod watcher stream timed out (reconnecting)...")
+                self._heartbeat()
+
+            except client.ApiException as e:
+                if e.status == self.HTTP_STATUS_GONE:
+                    self._logger.warning(f"Pod Watcher ResourceVersion {self.resource_version} Expired (410 Gone). Relisting")
+                    self.resource_version = None
+                    continue
+
+                self._logger.error(f"Kubernetes API Error in Pod Watcher: {e}. Retrying in 10s...")
+                time.sleep(10)
+            except Exception as e:
+                self._logger.error(f"Unexpected error in Pod Watcher: {e}. Retrying in 10s...")
+                time.sleep(10)
+
+    def _heartbeat(self) -> None:
+        if self.health_status is not None:
+            self.health_status.heartbeat(self.HEARTBEAT_NAME)
+
+    def _get_list_func(self) -> tuple[Callable, dict]:
+        """The list call for the watched pods along with its arguments. Watch.stream() needs the API method itself."""
+        if self.namespace:
+            return self.core_v1_client.list_namespaced_pod, {"namespace": self.namespace}
+        return self.core_v1_client.list_pod_for_all_namespaces, {}
+
+    def _relist(self) -> None:
+        self._logger.debug("Listing Pods To Fill Pod Cache")
+        list_func, list_kwargs = self._get_list_func()
+        pods = []
+        continue_token: Optional[str] = None
+        while True:
+            kwargs = {**list_kwargs, "limit": self.relist_page_size}
+            if continue_token:
+                kwargs["_continue"] = continue_token
+
+            pod_list = list_func(**kwargs)
+            pods.extend(self.pod_cache.format_pod(pod) for pod in pod_list.items or [])
+            self._heartbeat()
+
+            continue_token = pod_list.metadata._continue
+            if not continue_token:
+                break
+
+        self.pod_cache.replace(pods)
+        self.resource_version = pod_list.metadata.resource_version
+        self._logger.debug(f"Pod Cache Filled With {len(pods)} Pods. Watching From ResourceVersion: {self.resource_version}")
+
+    def _watch(self) -> None:
+        w = watch.Watch()
+        list_func, list_kwargs = self._get_list_func()
+        pod_stream = w.stream(
+            func=list_func,
+            resource_version=self.resource_version,
+            allow_watch_bookmarks=True,
+            timeout_seconds=self.timeout_seconds,
+            **list_kwargs
+        )
+        for event in pod_stream:
+            self._heartbeat()
+            if event['type'] == 'BOOKMARK':
+                self.resource_version = event['raw_object']['metadata']['resourceVersion']
+                continue
+
+            pod = event['object']
+            self.resource_version = pod.metadata.resource_version
+            if event['type'] == 'DELETED':
+                self.pod_cache.delete(pod.metadata.namespace, pod.metadata.name)
+            else:
+                self.pod_cache.set(self.pod_cache.format_pod(pod))
+
+            if self._stop_event.is_set():
+                break
@@ -23,10 +23,57 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
 
     HEALTH_CHECK_PORT: int = Field(ge=1024, lt=65535, default=8080, description="Port the Health Check Endpoints Are Served Over")
+    HEALTH_CHECK_HEARTBEAT_TIMEOUT_SECONDS: int = Field(ge=0, default=900, description="The liveness probe fails when the event watch, the pod watch or the processing loop have not made progress in this many seconds, so a stalled Sibyl is restarted. 0 disables the check")
+    HEALTH_CHECK_DEBUG_ENDPOINTS: bool = Field(default=False, description="Serve the /debug/ profiling endpoints (CPU profile, memory allocation diff, thread stacks) from the health check server")
+    HEALTH_CHECK_SERVER: Literal["flask", "stdlib"] = Field(default="flask", description="Server the Health Check Endpoints Are Served With. stdlib uses a threaded server from the Python standard library and does not load Flask")
     LOG_LEVEL: Literal["DEBUG", "INFO", "WARN", "ERROR"] = "INFO"
 
     SLACK_BOT_TOKEN: str = Field(description="Slack Bot Token for sending notifications")
     SLACK_CHANNEL: str = Field(description="Slack Channel ID to send notifications to")
+    NOTIFICATION_OUTBOX_PATH: Optional[str] = Field(default=None, description="Path of the SQLite database notifications are queued in until Slack accepts them, so they survive Slack outages and restarts. Unset sends notifications directly")
+    NOTIFICATION_OUTBOX_FLUSH_INTERVAL_SECONDS: float = Field(gt=0, default=0.5, description="How often queued notifications are written to the outbox in one batch")
+    NOTIFICATION_OUTBOX_MAX_ATTEMPTS: int = Field(ge=1, default=10, description="Number of delivery attempts for a notification in the outbox before it is dropped")
+    NOTIFICATION_DIGEST_WINDOW_SECONDS: float = Field(ge=0, default=0, description="Collect events for this many seconds and send bursts of related events as one digest notification. 0 disables the digest")
+    NOTIFICATION_DIGEST_MIN_EVENTS: int = Field(ge=2, default=3, description="Minimum number of events in a group within the digest window for them to be sent as a digest")
+    NOTIFICATION_DIGEST_GROUP_BY: Literal["namespace", "node", "reason"] = Field(default="node", description="How events are grouped into digests")
+    NOTIFICATION_DIGEST_MAX_EVENTS: int = Field(ge=2, default=50, description="Maximum number of events a digest group holds. A full group is sent straight away instead of waiting out its window")
+    SLACK_MESSAGE_UPDATE_TTL_SECONDS: int = Field(ge=0, default=3600, description="Recurring events update the Slack message first posted for them for this many seconds, instead of posting a new message. 0 always posts a new message")
+    SLACK_MESSAGE_INDEX_MAX_ENTRIES: int = Field(ge=1, default=1024, description="Maximum number of posted Slack messages remembered for updating before the least recently used are forgotten")
+    SLACK_MAX_RETRIES: int = Field(ge=0, default=3, description="Number of times a Slack API call rate limited by Slack is retried")
+    SLACK_RATE_LIMIT_BURST_SECONDS: float = Field(gt=0, default=10.0, description="Seconds worth of calls to a Slack API method that can be made in a burst before calls are spaced out at the method's rate limit")
+    SLACK_UPLOAD_WORKERS: int = Field(ge=1, default=4, description="Number of log files uploaded to Slack concurrently")
 
     CLUSTER_NAME: Optional[str] = Field(default=None, description="Optional name of the Kubernetes cluster to include in notifications")
-    POD_LOG_TAIL_LINES: int = Field(ge=10, default=100, description="Number of lines to fetch from pod logs for notifications")
\ No newline at end of file
+
+    K8S_CLIENT_POOL_SIZE: int = Field(ge=1, default=10, description="Number of connections kept open to the Kubernetes API. Shared by the event watch, pod watch and log fetches")
+    K8S_CLIENT_CONNECT_TIMEOUT_SECONDS: float = Field(gt=0, default=5.0, description="Timeout for connecting to the Kubernetes API")
+    K8S_CLIENT_READ_TIMEOUT_SECONDS: float = Field(gt=0, default=30.0, description="Timeout waiting for data from the Kubernetes API. Watches get this on top of their watch timeout")
+    K8S_CLIENT_TCP_KEEPALIVE: bool = Field(default=True, description="Enable TCP keep-alive probes on connections to the Kubernetes API")
+
+    POD_LOG_TAIL_LINES: int = Field(ge=10, default=100, description="Number of lines to fetch from pod logs for notifications")
+    POD_LOG_MAX_BYTES: int = Field(ge=1024, default=262144, description="Maximum number of bytes of logs kept per container. The last this many bytes of the tailed lines are kept")
+    POD_LOG_SINCE_SECONDS: Optional[int] = Field(ge=1, default=None, description="Optionally only fetch log lines written in the last this many seconds")
+    POD_LOG_CACHE_MAX_BYTES: int = Field(ge=0, default=16777216, description="Maximum total bytes of fetched logs cached, so repeat events for the same crashed container reuse them. 0 disables the log cache")
+    POD_LOG_CACHE_CURRENT_TTL_SECONDS: int = Field(ge=0, default=30, description="How long current (still running container) logs are cached for. Previous logs never change so are cached until evicted")
+    POD_LOG_ALL_CONTAINERS: bool = Field(default=False, description="Fetch logs for every container in the pod instead of only the ones that failed")
+    POD_LOG_FETCH_WORKERS: int = Field(ge=1, default=4, description="Number of container logs fetched concurrently")
+    POD_CACHE_ENABLED: bool = Field(default=True, description="Watch all pods and keep a local cache of them, so pod details do not need to be read from the apiserver for every event")
+
+    EVENT_FIELD_SELECTOR: Optional[str] = Field(default="type!=Normal", description="Field selector applied by the apiserver to the event watch. Set to an empty string to receive all events")
+    EVENT_NAMESPACE: Optional[str] = Field(default=None, description="Optional namespace to limit the event watch to")
+    EVENT_INVOLVED_OBJECT_KIND: Optional[str] = Field(default=None, description="Optional involved object kind (ex. Pod) to limit the event watch to")
+    EVENT_WATCH_RAW_JSON: bool = Field(default=False, description="Decode the event watch stream as raw JSON instead of building kubernetes client models. Uses orjson when installed")
+    EVENT_STARTUP_LOOKBACK_SECONDS: int = Field(ge=0, default=0, description="Events last seen more than this many seconds before Sibyl started are not alerted on. 0 means only events after startup are alerted on")
+
+    EVENT_DEDUP_WINDOW_SECONDS: int = Field(ge=0, default=300, description="Repeats of the same event (namespace, involved object, reason) within this window are collapsed into a single alert. 0 disables deduplication")
+    EVENT_DEDUP_MAX_ENTRIES: int = Field(ge=1, default=1024, description="Maximum number of events tracked for deduplication before the least recently seen are evicted")
+
+    EVENT_QUEUE_MAX_SIZE: int = Field(ge=0, default=1000, description="Maximum number of events waiting to be processed. 0 means unbounded")
+    EVENT_QUEUE_OVERFLOW_POLICY: Literal["block", "drop_oldest", "drop_lowest_priority", "coalesce"] = Field(default="block", description="What to do with new events when the event queue is full")
+
+    EVENT_PRIORITY_REASONS: Optional[dict[str, int]] = Field(default=None, description="JSON map of event reason to priority weight. Unset uses the built in defaults")
+    EVENT_PRIORITY_TYPES: dict[str, int] = Field(default={}, description="JSON map of event type to priority weight")
+    EVENT_PRIORITY_NAMESPACES: dict[str, int] = Field(default={}, description="JSON map of namespace to priority weight")
+    EVENT_PRIORITY_AGING_PER_SECOND: float = Field(ge=0, default=1.0, description="Priority gained by a queued event for every second it waits, so low priority events are still processed eventually")
+
+    EVENT_PROCESSING_WORKERS: int = Field(ge=1, default=4, description="Number of events processed (log fetch and notify) concurrently. Events for the same involved object are always processed in order")
\ No newline at end of file
@@ -0,0 +1,41 @@
+import pytest
+from unittest.mock import patch
+
+from sibyl.models.events.k8_event import K8Event
+from sibyl.models.events.k8_event_involved_object import K8EventInvolvedObject
+from sibyl.models.events.k8_event_metadata import K8EventMetadata
+from sibyl.models.events.k8_event_source import K8EventSource
+
+
+@pytest.fixture
+def make_event():
+    """Factory for warning events about a pod, overriding only the fields a test cares about."""
+    def make_event(name="test-pod", reason="BackOff", type="Warning", namespace="default", host="node-1", field_path=None,
+                   message="Back-off restarting failed container", timestamp="2025-11-30T12:00:00+00:00", count=1, marks=None):
+        event = K8Event(
+            kind="Event",
+            source=K8EventSource(component="kubelet", host=host),
+            action="",
+            type=type,
+            namespace=namespace,
+            name=f"{name}.123",
+            reason=reason,
+            message=message,
+            metadata=K8EventMetadata(name=f"{name}.123", namespace=namespace, creation_timestamp="2025-11-30T11:00:00+00:00", deletion_timestamp=None),
+            involved_object=K8EventInvolvedObject(kind="Pod", name=name, namespace=namespace, field_path=field_path),
+            timestamp=timestamp,
+            count=count
+        )
+        event.timings.marks = marks or {}
+        return event
+    return make_event
+
+@pytest.fixture
+def mock_monotonic(request):
+    """
+    Patch the time.monotonic a test module is indirectly parametrized with, ex.
+    pytestmark = pytest.mark.parametrize("mock_monotonic", ["sibyl.log_cache.time.monotonic"], indirect=True)
+    """
+    with patch(request.param) as mock_monotonic:
+        mock_monotonic.return_value = 1000.0
+        yield mock_monotonic
@@ -0,0 +1,63 @@
+
+import pytest
+
+from sibyl.event_queue.event_dedup_cache import EventDedupCache
+
+
+pytestmark = pytest.mark.parametrize("mock_monotonic", ["sibyl.event_queue.event_dedup_cache.time.monotonic"], indirect=True)
+
+def test_first_occurrence_is_notified(mock_monotonic, make_event):
+    cache = EventDedupCache(window_seconds=60)
+    event = make_event()
+
+    assert cache.should_notify(event) is True
+    assert event.count == 1
+    assert cache.get_stats() == {"hits": 0, "misses": 1, "evictions": 0, "size": 1}
+
+def test_repeats_within_window_are_suppressed_and_counted(mock_monotonic, make_event):
+    cache = EventDedupCache(window_seconds=60)
+
+    assert cache.should_notify(make_event()) is True
+    mock_monotonic.return_value = 1030.0
+    assert cache.should_notify(make_event()) is False
+    assert cache.should_notify(make_event()) is False
+
+    # Window expired, the next occurrence alerts with everything since the last alert
+    mock_monotonic.return_value = 1061.0
+    event = make_event()
+    assert cache.should_notify(event) is True
+    assert event.count == 3
+
+    assert cache.get_stats()["hits"] == 2
+    assert cache.get_stats()["misses"] == 2
+
+def test_different_objects_and_reasons_are_not_deduplicated(mock_monotonic, make_event):
+    cache = EventDedupCache(window_seconds=60)
+
+    assert cache.should_notify(make_event(name="pod-a")) is True
+    assert cache.should_notify(make_event(name="pod-b")) is True
+    assert cache.should_notify(make_event(name="pod-a", reason="Unhealthy")) is True
+    assert cache.should_notify(make_event(name="pod-a", namespace="other")) is True
+
+def test_different_containers_are_not_deduplicated(mock_monotonic, make_event):
+    cache = EventDedupCache(window_seconds=60)
+
+    assert cache.should_notify(make_event(field_path="spec.containers{app}")) is True
+    assert cache.should_notify(make_event(field_path="spec.containers{sidecar}")) is True
+    assert cache.should_notify(make_event(field_path="spec.containers{app}")) is False
+
+def test_lru_eviction_bounds_size(mock_monotonic, make_event):
+    cache = EventDedupCache(window_seconds=60, max_size=2)
+
+    cache.should_notify(make_event(name="pod-a"))
+    cache.should_notify(make_event(name="pod-b"))
+    # Touch pod-a so pod-b becomes the least recently used
+    cache.should_notify(make_event(name="pod-a"))
+    cache.should_notify(make_event(name="pod-c"))
+
+    stats = cache.get_stats()
+    assert stats["size"] == 2
+    assert stats["evictions"] == 1
+    # pod-b was evicted so it alerts again, pod-a is still suppressed
+    assert cache.should_notify(make_event(name="pod-b")) is True
+    assert cache.should_notify(make_event(name="pod-c")) is False
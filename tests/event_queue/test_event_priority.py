@@ -0,0 +1,18 @@
+from sibyl.event_queue.event_priority import EventPriority
+
+
+def test_default_reason_priorities(make_event):
+    event_priority = EventPriority()
+    assert event_priority.get_priority(make_event(reason="OOMKilled")) > event_priority.get_priority(make_event(reason="BackOff"))
+    assert event_priority.get_priority(make_event(reason="BackOff")) > event_priority.get_priority(make_event(reason="FailedScheduling"))
+    assert event_priority.get_priority(make_event(reason="SomethingElse")) == 0
+
+def test_priority_sums_reason_type_and_namespace(make_event):
+    event_priority = EventPriority(
+        reason_priorities={"BackOff": 10},
+        type_priorities={"Warning": 1},
+        namespace_priorities={"production": 100}
+    )
+    assert event_priority.get_priority(make_event(namespace="production")) == 111
+    assert event_priority.get_priority(make_event(namespace="staging")) == 11
+    assert event_priority.get_priority(make_event(reason="Unhealthy", type="Normal", namespace="staging")) == 0
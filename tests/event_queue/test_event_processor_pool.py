@@ -0,0 +1,70 @@
+import time
+from threading import Event, Lock
+
+from sibyl.event_queue.event_processor_pool import EventProcessorPool
+
+
+def test_processes_all_events_and_drains_on_shutdown(make_event):
+    processed = []
+    pool = EventProcessorPool(process_func=processed.append, worker_count=3)
+    events = [make_event(name=f"pod-{i}") for i in range(20)]
+    for event in events:
+        pool.submit(event)
+    pool.shutdown()
+
+    assert sorted(processed, key=lambda event: event.name) == sorted(events, key=lambda event: event.name)
+
+def test_events_for_same_object_stay_in_order(make_event):
+    processed = []
+    lock = Lock()
+
+    def process(event):
+        time.sleep(0.001)
+        with lock:
+            processed.append(event)
+
+    pool = EventProcessorPool(process_func=process, worker_count=4)
+    events = [make_event(name=f"pod-{i % 3}", reason=str(i)) for i in range(30)]
+    for event in events:
+        pool.submit(event)
+    pool.shutdown()
+
+    for name in ["pod-0", "pod-1", "pod-2"]:
+        assert [event for event in processed if event.name == name] == [event for event in events if event.name == name]
+
+def test_events_for_different_objects_run_concurrently(make_event):
+    started = []
+    release = Event()
+
+    def process(event):
+        started.append(event)
+        release.wait(timeout=5)
+
+    pool = EventProcessorPool(process_func=process, worker_count=2)
+    pool.submit(make_event(name="pod-a"))
+    pool.submit(make_event(name="pod-b"))
+
+    deadline = time.monotonic() + 5
+    while len(started) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(started) == 2
+
+    release.set()
+    pool.shutdown()
+
+def test_processing_errors_do_not_stop_the_pool(caplog, make_event):
+    processed = []
+
+    def process(event):
+        if event.reason == "Boom":
+            raise Exception("test error")
+        processed.append(event)
+
+    pool = EventProcessorPool(process_func=process, worker_count=1)
+    pool.submit(make_event(reason="Boom"))
+    ok_event = make_event(reason="BackOff")
+    pool.submit(ok_event)
+    pool.shutdown()
+
+    assert processed == [ok_event]
+    assert "Error processing event: test error" in caplog.text
@@ -0,0 +1,122 @@
+
+import pytest
+from queue import Full
+from unittest.mock import patch
+
+from sibyl.event_queue.event_queue import EventQueue
+
+
+def drain(event_queue):
+    events = []
+    while not event_queue.empty():
+        events.append(event_queue.get_nowait())
+    return events
+
+def test_unbounded_queue_is_fifo(make_event):
+    event_queue = EventQueue()
+    events = [make_event(name=f"pod-{i}") for i in range(3)]
+    for event in events:
+        event_queue.put(event)
+
+    assert drain(event_queue) == events
+
+def test_higher_priority_events_are_processed_first(make_event):
+    priorities = {"FailedScheduling": 1, "BackOff": 10, "OOMKilled": 20}
+    event_queue = EventQueue(priority_func=lambda event: priorities[event.reason])
+
+    scheduling = [make_event(name=f"pod-{i}", reason="FailedScheduling") for i in range(100)]
+    for event in scheduling:
+        event_queue.put(event)
+    backoff = make_event(reason="BackOff")
+    oom = make_event(reason="OOMKilled")
+    event_queue.put(backoff)
+    event_queue.put(oom)
+
+    # High priority events jump the whole backlog, the backlog stays FIFO
+    assert drain(event_queue) == [oom, backoff] + scheduling
+
+def test_aging_lets_old_low_priority_events_through(make_event):
+    priorities = {"FailedScheduling": 1, "BackOff": 10}
+    event_queue = EventQueue(priority_func=lambda event: priorities[event.reason], aging_rate=1.0)
+
+    with patch('sibyl.event_queue.event_queue.time.monotonic') as mock_monotonic:
+        mock_monotonic.return_value = 1000.0
+        scheduling = make_event(reason="FailedScheduling")
+        event_queue.put(scheduling)
+
+        # Queued 5s later, BackOff still outranks the aged FailedScheduling
+        mock_monotonic.return_value = 1005.0
+        recent_backoff = make_event(name="pod-a", reason="BackOff")
+        event_queue.put(recent_backoff)
+
+        # Queued 20s later, FailedScheduling has waited long enough to go first
+        mock_monotonic.return_value = 1020.0
+        late_backoff = make_event(name="pod-b", reason="BackOff")
+        event_queue.put(late_backoff)
+
+    assert drain(event_queue) == [recent_backoff, scheduling, late_backoff]
+
+def test_block_policy_blocks_when_full(make_event):
+    event_queue = EventQueue(maxsize=1, overflow_policy="block")
+    event_queue.put(make_event())
+
+    with pytest.raises(Full):
+        event_queue.put(make_event(), timeout=0.01)
+
+def test_drop_oldest_policy(make_event):
+    event_queue = EventQueue(maxsize=2, overflow_policy="drop_oldest")
+    events = [make_event(name=f"pod-{i}") for i in range(3)]
+    for event in events:
+        event_queue.put(event)
+
+    assert drain(event_queue) == events[1:]
+    assert event_queue.get_stats() == {"dropped": 1, "coalesced": 0, "depth": 0}
+
+def test_drop_lowest_priority_policy(make_event):
+    priorities = {"FailedScheduling": 1, "BackOff": 10, "OOMKilled": 20}
+    event_queue = EventQueue(maxsize=2, overflow_policy="drop_lowest_priority", priority_func=lambda event: priorities[event.reason])
+
+    backoff = make_event(name="pod-a", reason="BackOff")
+    scheduling = make_event(name="pod-b", reason="FailedScheduling")
+    oom = make_event(name="pod-c", reason="OOMKilled")
+    event_queue.put(backoff)
+    event_queue.put(scheduling)
+    event_queue.put(oom)
+
+    assert drain(event_queue) == [oom, backoff]
+    assert event_queue.get_stats()["dropped"] == 1
+
+def test_drop_lowest_priority_policy_drops_new_event_when_lowest(make_event):
+    priorities = {"FailedScheduling": 1, "BackOff": 10}
+    event_queue = EventQueue(maxsize=1, overflow_policy="drop_lowest_priority", priority_func=lambda event: priorities[event.reason])
+
+    backoff = make_event(reason="BackOff")
+    event_queue.put(backoff)
+    event_queue.put(make_event(reason="FailedScheduling"))
+
+    assert drain(event_queue) == [backoff]
+    assert event_queue.get_stats()["dropped"] == 1
+
+def test_coalesce_policy_replaces_event_for_same_object(make_event):
+    event_queue = EventQueue(maxsize=2, overflow_policy="coalesce")
+
+    first = make_event(name="pod-a", reason="BackOff")
+    other = make_event(name="pod-b")
+    repeat = make_event(name="pod-a", reason="Unhealthy")
+    event_queue.put(first)
+    event_queue.put(other)
+    event_queue.put(repeat)
+
+    assert drain(event_queue) == [repeat, other]
+    assert repeat.count == 2
+    assert event_queue.get_stats() == {"dropped": 0, "coalesced": 1, "depth": 0}
+
+def test_coalesce_policy_drops_oldest_without_match(make_event):
+    event_queue = EventQueue(maxsize=1, overflow_policy="coalesce")
+
+    event_queue.put(make_event(name="pod-a"))
+    newest = make_event(name="pod-b")
+    event_queue.put(newest)
+
+    assert drain(event_queue) == [newest]
+    assert event_queue.get_stats()["dropped"] == 1
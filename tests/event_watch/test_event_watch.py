@@ -1,6 +1,6 @@
 
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, patch, call
 from kubernetes import client, watch
 from sibyl.event_watch.event_watch import EventWatch
 
@@ -16,14 +16,29 @@ def test_event_watch_init(event_watch, mock_core_v1_client):
     assert event_watch.core_v1_client == mock_core_v1_client
     assert event_watch.timeout_seconds == 10
 
+def _mock_k8s_event(resource_version):
+    mock_event = Mock()
+    mock_event.metadata.resource_version = resource_version
+    return mock_event
+
+def _mock_event_list(items, resource_version, continue_token=None):
+    event_list = Mock()
+    event_list.items = items
+    event_list.metadata.resource_version = resource_version
+    event_list.metadata._continue = continue_token
+    return event_list
+
 @patch('kubernetes.watch.Watch')
 def test_poll_for_event_calls_stream_and_callback(mock_watch, event_watch, mock_core_v1_client):
+    event1 = _mock_k8s_event("101")
+    event2 = _mock_k8s_event("102")
     mock_stream = [
-        {'object': 'event1'},
-        {'object': 'event2'}
+        {'type': 'ADDED', 'object': event1},
+        {'type': 'ADDED', 'object': event2}
     ]
     mock_watch_instance = mock_watch.return_value
     mock_watch_instance.stream.return_value = mock_stream
+    mock_core_v1_client.list_event_for_all_namespaces.return_value = _mock_event_list([], "100")
     
     callback = Mock()
     
@@ -31,16 +46,119 @@ def test_poll_for_event_calls_stream_and_callback(mock_watch, event_watch, mock_
     
     mock_watch_instance.stream.assert_called_once_with(
         func=mock_core_v1_client.list_event_for_all_namespaces,
+        field_selector=None,
+        resource_version="100",
+        allow_watch_bookmarks=True,
         timeout_seconds=10
     )
     assert callback.call_count == 2
-    callback.assert_any_call('event1')
-    callback.assert_any_call('event2')
+    callback.assert_any_call(event1)
+    callback.assert_any_call(event2)
+    assert event_watch.resource_version == "102"
+
+def test_relist_paginates_and_records_resource_version(event_watch, mock_core_v1_client):
+    event1 = _mock_k8s_event("1")
+    event2 = _mock_k8s_event("2")
+    mock_core_v1_client.list_event_for_all_namespaces.side_effect = [
+        _mock_event_list([event1], "50", continue_token="next-page"),
+        _mock_event_list([event2], "50"),
+    ]
+
+    callback = Mock()
+    event_watch.relist(callback)
+
+    assert mock_core_v1_client.list_event_for_all_namespaces.call_count == 2
+    mock_core_v1_client.list_event_for_all_namespaces.assert_any_call(limit=500, field_selector=None, _continue="next-page")
+    callback.assert_has_calls([call(event1), call(event2)])
+    assert event_watch.resource_version == "50"
+
+@patch('kubernetes.watch.Watch')
+def test_poll_for_event_resumes_without_relist(mock_watch, event_watch, mock_core_v1_client):
+    event_watch.resource_version = "200"
+    mock_watch.return_value.stream.return_value = []
+
+    event_watch.poll_for_event(Mock())
+
+    mock_core_v1_client.list_event_for_all_namespaces.assert_not_called()
+    assert mock_watch.return_value.stream.call_args.kwargs['resource_version'] == "200"
+
+@patch('kubernetes.watch.Watch')
+def test_poll_for_event_bookmark_updates_resource_version(mock_watch, event_watch):
+    event_watch.resource_version = "200"
+    mock_watch.return_value.stream.return_value = [
+        {'type': 'BOOKMARK', 'object': {}, 'raw_object': {'metadata': {'resourceVersion': "250"}}}
+    ]
+
+    callback = Mock()
+    event_watch.poll_for_event(callback)
+
+    callback.assert_not_called()
+    assert event_watch.resource_version == "250"
+
+@patch('kubernetes.watch.Watch')
+def test_poll_for_event_heartbeats_on_bookmarks_and_stream_end(mock_watch, mock_core_v1_client):
+    heartbeat_func = Mock()
+    event_watch = EventWatch(core_v1_client=mock_core_v1_client, timeout_seconds=10, heartbeat_func=heartbeat_func)
+    event_watch.resource_version = "200"
+    mock_watch.return_value.stream.return_value = [
+        {'type': 'BOOKMARK', 'object': {}, 'raw_object': {'metadata': {'resourceVersion': "250"}}}
+    ]
+
+    event_watch.poll_for_event(Mock())
+
+    # Once for the bookmark, once for the apiserver ending the watch
+    assert heartbeat_func.call_count == 2
+
+@patch('kubernetes.watch.Watch')
+def test_poll_for_event_no_heartbeat_on_error(mock_watch, mock_core_v1_client):
+    heartbeat_func = Mock()
+    event_watch = EventWatch(core_v1_client=mock_core_v1_client, timeout_seconds=10, heartbeat_func=heartbeat_func)
+    event_watch.resource_version = "200"
+    mock_watch.return_value.stream.side_effect = Exception("test error")
+
+    with pytest.raises(Exception, match="test error"):
+        event_watch.poll_for_event(Mock())
+
+    heartbeat_func.assert_not_called()
+
+@patch('kubernetes.watch.Watch')
+def test_poll_for_event_gone_resets_resource_version(mock_watch, event_watch):
+    event_watch.resource_version = "200"
+    mock_watch.return_value.stream.side_effect = client.ApiException(status=410)
+
+    event_watch.poll_for_event(Mock())
+
+    assert event_watch.resource_version is None
+    assert event_watch.expired_resource_version == "200"
+
+def test_relist_after_gone_skips_seen_events(event_watch, mock_core_v1_client):
+    event_watch.expired_resource_version = "200"
+    seen_event = _mock_k8s_event("150")
+    updated_event = _mock_k8s_event("201")
+    mock_core_v1_client.list_event_for_all_namespaces.return_value = _mock_event_list([seen_event, updated_event], "300")
+
+    callback = Mock()
+    event_watch.relist(callback)
+
+    callback.assert_called_once_with(updated_event)
+    assert event_watch.resource_version == "300"
+    assert event_watch.expired_resource_version is None
+
+def test_relist_after_gone_passes_uncomparable_resource_versions(event_watch, mock_core_v1_client):
+    event_watch.expired_resource_version = "not-an-etcd-revision"
+    event = _mock_k8s_event("150")
+    mock_core_v1_client.list_event_for_all_namespaces.return_value = _mock_event_list([event], "300")
+
+    callback = Mock()
+    event_watch.relist(callback)
+
+    callback.assert_called_once_with(event)
 
 @patch('kubernetes.watch.Watch')
 def test_poll_for_event_api_exception(mock_watch, event_watch):
     mock_watch_instance = mock_watch.return_value
     mock_watch_instance.stream.side_effect = client.ApiException()
+    event_watch.resource_version = "200"
     
     callback = Mock()
     
@@ -53,6 +171,7 @@ def test_poll_for_event_api_exception(mock_watch, event_watch):
 def test_poll_for_event_generic_exception(mock_watch, event_watch):
     mock_watch_instance = mock_watch.return_value
     mock_watch_instance.stream.side_effect = Exception("test error")
+    event_watch.resource_version = "200"
     
     callback = Mock()
     
@@ -60,3 +179,110 @@ def test_poll_for_event_generic_exception(mock_watch, event_watch):
         event_watch.poll_for_event(callback)
     
     callback.assert_not_called()
+
+def test_build_field_selector():
+    assert EventWatch.build_field_selector() is None
+    assert EventWatch.build_field_selector("type!=Normal") == "type!=Normal"
+    assert EventWatch.build_field_selector("type!=Normal", namespace="prod", involved_object_kind="Pod") == \
+        "type!=Normal,metadata.namespace=prod,involvedObject.kind=Pod"
+
+@patch('kubernetes.watch.Watch')
+def test_poll_for_event_passes_field_selector(mock_watch, mock_core_v1_client):
+    event_watch = EventWatch(core_v1_client=mock_core_v1_client, timeout_seconds=10, field_selector="type!=Normal")
+    mock_core_v1_client.list_event_for_all_namespaces.return_value = _mock_event_list([], "100")
+    mock_watch.return_value.stream.return_value = []
+
+    event_watch.poll_for_event(Mock())
+
+    mock_core_v1_client.list_event_for_all_namespaces.assert_called_once_with(limit=500, field_selector="type!=Normal")
+    assert mock_watch.return_value.stream.call_args.kwargs['field_selector'] == "type!=Normal"
+
+class MockRawResponse:
+    def __init__(self, chunks=None, data=None):
+        self.chunks = chunks or []
+        self.data = data
+        self.closed = False
+
+    def stream(self, amt=None, decode_content=False):
+        yield from self.chunks
+
+    def close(self):
+        self.closed = True
+
+    def release_conn(self):
+        pass
+
+def test_relist_raw_json(mock_core_v1_client):
+    event_watch = EventWatch(core_v1_client=mock_core_v1_client, timeout_seconds=10, raw_json=True)
+    mock_core_v1_client.list_event_for_all_namespaces.return_value = MockRawResponse(
+        data=b'{"metadata": {"resourceVersion": "100"}, "items": [{"reason": "BackOff"}]}'
+    )
+
+    callback = Mock()
+    event_watch.relist(callback)
+
+    mock_core_v1_client.list_event_for_all_namespaces.assert_called_once_with(_preload_content=False, limit=500, field_selector=None)
+    callback.assert_called_once_with({"reason": "BackOff"})
+    assert event_watch.resource_version == "100"
+
+def test_poll_for_event_raw_json(mock_core_v1_client):
+    event_watch = EventWatch(core_v1_client=mock_core_v1_client, timeout_seconds=10, raw_json=True)
+    event_watch.resource_version = "100"
+    response = MockRawResponse(chunks=[
+        b'{"type": "ADDED", "object": {"reason": "BackOff", "metadata": {"resourceVersion": "101"}}}\n{"type": "BOOK',
+        b'MARK", "object": {"metadata": {"resourceVersion": "102"}}}\n',
+    ])
+    mock_core_v1_client.list_event_for_all_namespaces.return_value = response
+
+    callback = Mock()
+    event_watch.poll_for_event(callback)
+
+    mock_core_v1_client.list_event_for_all_namespaces.assert_called_once_with(
+        watch=True,
+        _preload_content=False,
+        field_selector=None,
+        resource_version="100",
+        allow_watch_bookmarks=True,
+        timeout_seconds=10
+    )
+    callback.assert_called_once_with({"reason": "BackOff", "metadata": {"resourceVersion": "101"}})
+    assert event_watch.resource_version == "102"
+    assert response.closed
+
+def test_poll_for_event_raw_json_heartbeats(mock_core_v1_client):
+    heartbeat_func = Mock()
+    event_watch = EventWatch(core_v1_client=mock_core_v1_client, timeout_seconds=10, raw_json=True, heartbeat_func=heartbeat_func)
+    event_watch.resource_version = "100"
+    mock_core_v1_client.list_event_for_all_namespaces.return_value = MockRawResponse(chunks=[
+        b'{"type": "ADDED", "object": {"reason": "BackOff", "metadata": {"resourceVersion": "101"}}}\n',
+        b'{"type": "BOOKMARK", "object": {"metadata": {"resourceVersion": "102"}}}\n',
+    ])
+
+    event_watch.poll_for_event(Mock())
+
+    # The event, the bookmark and the apiserver ending the watch
+    assert heartbeat_func.call_count == 3
+
+def test_poll_for_event_raw_json_gone(mock_core_v1_client):
+    event_watch = EventWatch(core_v1_client=mock_core_v1_client, timeout_seconds=10, raw_json=True)
+    event_watch.resource_version = "100"
+    mock_core_v1_client.list_event_for_all_namespaces.return_value = MockRawResponse(chunks=[
+        b'{"type": "ERROR", "object": {"code": 410, "reason": "Expired", "message": "too old resource version"}}\n',
+    ])
+
+    event_watch.poll_for_event(Mock())
+
+    assert event_watch.resource_version is None
+
+def test_relist_raw_json_after_gone_skips_seen_events(mock_core_v1_client):
+    event_watch = EventWatch(core_v1_client=mock_core_v1_client, timeout_seconds=10, raw_json=True)
+    event_watch.expired_resource_version = "100"
+    mock_core_v1_client.list_event_for_all_namespaces.return_value = MockRawResponse(
+        data=b'{"metadata": {"resourceVersion": "200"}, "items": [{"reason": "Seen", "metadata": {"resourceVersion": "99"}}, {"reason": "New", "metadata": {"resourceVersion": "150"}}]}'
+    )
+
+    callback = Mock()
+    event_watch.relist(callback)
+
+    callback.assert_called_once_with({"reason": "New", "metadata": {"resourceVersion": "150"}})
+    assert event_watch.resource_version == "200"
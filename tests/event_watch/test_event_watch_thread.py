@@ -5,7 +5,11 @@ from unittest.mock import Mock, patch, MagicMock
 
 from queue import Queue
 
-from kubernetes import client, config
+from datetime import datetime, timezone
+
+from kubernetes import client
+
+from prometheus_client import REGISTRY
 
 from sibyl.event_watch.event_watch_thread import EventWatchThread, EventWatch
 
@@ -23,9 +27,9 @@ def mock_queue():
 
 @pytest.fixture
 
-@patch('sibyl.event_watch.event_watch_thread.config.load_incluster_config')
+@patch('sibyl.k8_client_factory.config.load_incluster_config')
 
-@patch('sibyl.event_watch.event_watch_thread.client.CoreV1Api')
+@patch('sibyl.k8_client_factory.client.CoreV1Api')
 
 def event_watch_thread(mock_core_v1_api, mock_load_config, mock_queue):
 
@@ -41,7 +45,7 @@ def test_init_success(event_watch_thread):
 
 
 
-@patch('sibyl.event_watch.event_watch_thread.config.load_incluster_config', side_effect=Exception("Test error"))
+@patch('sibyl.k8_client_factory.config.load_incluster_config', side_effect=Exception("Test error"))
 
 def test_init_fails(mock_load_config, mock_queue):
 
@@ -111,6 +115,8 @@ def test_run_loop(mock_event_watch, event_watch_thread, mock_queue):
 
     assert isinstance(mock_queue.put.call_args[0][0], K8Event)
 
+    assert list(mock_queue.put.call_args[0][0].timings.marks) == ["received", "queued"]
+
 
 
 @patch('sibyl.event_watch.event_watch_thread.EventWatch')
@@ -195,6 +201,30 @@ def test_run_handles_api_exception(mock_event_watch, mock_sleep, event_watch_thr
 
 
 
+@patch('sibyl.event_watch.event_watch_thread.EventWatch')
+
+@patch('sibyl.k8_client_factory.config.load_incluster_config')
+
+@patch('sibyl.k8_client_factory.client.CoreV1Api')
+
+def test_run_passes_field_selector(mock_core_v1_api, mock_load_config, mock_event_watch, mock_queue):
+
+    event_watch_thread = EventWatchThread(event_queue=mock_queue, field_selector="type!=Normal")
+
+    mock_event_watch.return_value.poll_for_event.side_effect = lambda callback: event_watch_thread.stop()
+
+
+
+    event_watch_thread.run()
+
+
+
+    mock_event_watch.assert_called_once_with(mock_core_v1_api.return_value, timeout_seconds=300, field_selector="type!=Normal", raw_json=False, heartbeat_func=event_watch_thread._heartbeat)
+
+
+
+
+
 def test_format_event(event_watch_thread):
 
     mock_event = MagicMock(spec=client.CoreV1Event)
@@ -239,5 +269,306 @@ def test_format_event(event_watch_thread):
 
 
 
+def test_format_raw_event(event_watch_thread):
+
+    raw_event = {
+
+        "kind": "Event",
+
+        "type": "Warning",
+
+        "reason": "BackOff",
+
+        "message": "Back-off restarting failed container",
+
+        "source": {"component": "kubelet", "host": "node-1"},
+
+        "metadata": {"name": "name", "namespace": "ns", "creationTimestamp": "2025-11-30T12:00:00Z"},
+
+        "involvedObject": {"kind": "Pod", "name": "pod-name", "namespace": "pod-ns"},
+
+        "lastTimestamp": "2025-11-30T12:00:00Z"
+
+    }
+
+
+
+    formatted_event = event_watch_thread._format_raw_event(raw_event)
+
+    assert isinstance(formatted_event, K8Event)
+
+    assert formatted_event.reason == "BackOff"
+
+    assert formatted_event.source.component == "kubelet"
+
+    assert formatted_event.involved_object.name == "pod-name"
+
+    assert formatted_event.metadata.creation_timestamp == "2025-11-30T12:00:00+00:00"
+
+    assert formatted_event.metadata.deletion_timestamp is None
+
+    assert formatted_event.timestamp == "2025-11-30T12:00:00+00:00"
+
+
+
+@patch('sibyl.event_watch.event_watch_thread.EventWatch')
+
+@patch('sibyl.k8_client_factory.config.load_incluster_config')
+
+@patch('sibyl.k8_client_factory.client.CoreV1Api')
+
+def test_run_raw_json_queues_error_events(mock_core_v1_api, mock_load_config, mock_event_watch, mock_queue):
+
+    event_watch_thread = EventWatchThread(event_queue=mock_queue, raw_json=True)
+
+
+
+    def side_effect(callback):
+
+        callback({"type": "Normal", "reason": "Pulled"})
+
+        callback({"type": "Warning", "reason": "BackOff"})
+
+        event_watch_thread.stop()
+
+
+
+    mock_event_watch.return_value.poll_for_event.side_effect = side_effect
+
+
+
+    event_watch_thread.run()
+
+
+
+    mock_queue.put.assert_called_once()
+
+    assert mock_queue.put.call_args[0][0].reason == "BackOff"
+
+
+
+@patch('sibyl.event_watch.event_watch_thread.EventWatch')
+
+@patch('sibyl.k8_client_factory.config.load_incluster_config')
+
+@patch('sibyl.k8_client_factory.client.CoreV1Api')
+
+def test_run_ignores_events_before_cutoff(mock_core_v1_api, mock_load_config, mock_event_watch, mock_queue):
+
+    event_cutoff = datetime(2025, 11, 30, 12, 0, 0, tzinfo=timezone.utc)
+
+    event_watch_thread = EventWatchThread(event_queue=mock_queue, event_cutoff=event_cutoff)
+
+
+
+    stale_event = MagicMock(spec=client.CoreV1Event)
+
+    stale_event.type = "Warning"
+
+    stale_event.last_timestamp = datetime(2025, 11, 30, 11, 0, 0, tzinfo=timezone.utc)
+
+
+
+    fresh_event = MagicMock(spec=client.CoreV1Event)
+
+    fresh_event.type = "Warning"
+
+    fresh_event.reason = "BackOff"
+
+    fresh_event.last_timestamp = None
+
+    fresh_event.event_time = datetime(2025, 11, 30, 12, 0, 1, tzinfo=timezone.utc)
+
+    fresh_event.metadata.creation_timestamp = None
+
+    fresh_event.metadata.deletion_timestamp = None
+
+
+
+    def side_effect(callback):
+
+        callback(stale_event)
+
+        callback(fresh_event)
+
+        event_watch_thread.stop()
+
+
+
+    mock_event_watch.return_value.poll_for_event.side_effect = side_effect
+
+
+
+    event_watch_thread.run()
+
+
+
+    mock_queue.put.assert_called_once()
+
+    assert mock_queue.put.call_args[0][0].reason == "BackOff"
+
+
+
+@patch('sibyl.event_watch.event_watch_thread.EventWatch')
+
+@patch('sibyl.k8_client_factory.config.load_incluster_config')
+
+@patch('sibyl.k8_client_factory.client.CoreV1Api')
+
+def test_run_raw_json_ignores_events_before_cutoff(mock_core_v1_api, mock_load_config, mock_event_watch, mock_queue):
+
+    event_cutoff = datetime(2025, 11, 30, 12, 0, 0, tzinfo=timezone.utc)
+
+    event_watch_thread = EventWatchThread(event_queue=mock_queue, raw_json=True, event_cutoff=event_cutoff)
+
+
+
+    def side_effect(callback):
+
+        callback({"type": "Warning", "reason": "Stale", "lastTimestamp": "2025-11-30T11:59:59Z"})
+
+        callback({"type": "Warning", "reason": "Fresh", "eventTime": "2025-11-30T12:00:00.500000Z"})
+
+        event_watch_thread.stop()
+
+
+
+    mock_event_watch.return_value.poll_for_event.side_effect = side_effect
+
+
+
+    event_watch_thread.run()
+
+
+
+    mock_queue.put.assert_called_once()
+
+    assert mock_queue.put.call_args[0][0].reason == "Fresh"
+
+
+
+@patch('sibyl.event_watch.event_watch_thread.EventWatch')
+
+@patch('sibyl.k8_client_factory.config.load_incluster_config')
+
+@patch('sibyl.k8_client_factory.client.CoreV1Api')
+
+def test_run_suppresses_repeats_with_dedup_cache(mock_core_v1_api, mock_load_config, mock_event_watch, mock_queue):
+
+    dedup_cache = Mock()
+
+    dedup_cache.should_notify.side_effect = [True, False]
+
+    event_watch_thread = EventWatchThread(event_queue=mock_queue, raw_json=True, dedup_cache=dedup_cache)
+
+
+
+    def side_effect(callback):
+
+        callback({"type": "Warning", "reason": "BackOff"})
+
+        callback({"type": "Warning", "reason": "BackOff"})
+
+        event_watch_thread.stop()
+
+
+
+    mock_event_watch.return_value.poll_for_event.side_effect = side_effect
+
+
+
+    event_watch_thread.run()
+
+
+
+    assert dedup_cache.should_notify.call_count == 2
+
+    mock_queue.put.assert_called_once()
+
+
+
+@patch('sibyl.event_watch.event_watch_thread.EventWatch')
+
+@patch('sibyl.k8_client_factory.config.load_incluster_config')
+
+@patch('sibyl.k8_client_factory.client.CoreV1Api')
+
+def test_run_counts_received_and_filtered_events(mock_core_v1_api, mock_load_config, mock_event_watch, mock_queue):
+
+    dedup_cache = Mock()
+
+    dedup_cache.should_notify.side_effect = [True, False]
+
+    event_cutoff = datetime(2025, 11, 30, 12, 0, 0, tzinfo=timezone.utc)
+
+    event_watch_thread = EventWatchThread(event_queue=mock_queue, raw_json=True, event_cutoff=event_cutoff, dedup_cache=dedup_cache)
+
+
+    def get_sample(name, labels=None):
+
+        return REGISTRY.get_sample_value(name, labels or {}) or 0
+
+
+    received = get_sample("sibyl_watch_events_received_total")
+
+    filtered = {reason: get_sample("sibyl_watch_events_filtered_total", {"reason": reason}) for reason in ["type", "cutoff", "duplicate"]}
+
+
+    def side_effect(callback):
+
+        callback({"type": "Normal", "reason": "Scheduled"})
+
+        callback({"type": "Warning", "reason": "BackOff", "lastTimestamp": "2025-11-30T11:00:00Z"})
+
+        callback({"type": "Warning", "reason": "BackOff"})
+
+        callback({"type": "Warning", "reason": "BackOff"})
+
+        event_watch_thread.stop()
+
+
+    mock_event_watch.return_value.poll_for_event.side_effect = side_effect
+
+
+    event_watch_thread.run()
+
+
+    mock_queue.put.assert_called_once()
+
+    assert get_sample("sibyl_watch_events_received_total") - received == 4
+
+    for reason in ["type", "cutoff", "duplicate"]:
+
+        assert get_sample("sibyl_watch_events_filtered_total", {"reason": reason}) - filtered[reason] == 1
+
+
+
+@patch('sibyl.event_watch.event_watch_thread.EventWatch')
+
+@patch('sibyl.k8_client_factory.config.load_incluster_config')
+
+@patch('sibyl.k8_client_factory.client.CoreV1Api')
+
+def test_run_records_heartbeats(mock_core_v1_api, mock_load_config, mock_event_watch, mock_queue):
+
+    health_status = Mock()
+
+    event_watch_thread = EventWatchThread(event_queue=mock_queue, health_status=health_status)
+
+    mock_event_watch.return_value.poll_for_event.side_effect = lambda callback: event_watch_thread.stop()
+
+
+    event_watch_thread.run()
+
+
+    # The heartbeat starts when the watch does
+
+    health_status.heartbeat.assert_called_once_with("event_watch")
+
+    # And the watch beats it whenever the apiserver is heard from
+
+    heartbeat_func = mock_event_watch.call_args.kwargs["heartbeat_func"]
 
+    heartbeat_func()
 
+    assert health_status.heartbeat.call_count == 2
@@ -0,0 +1,95 @@
+import http.client
+import json
+from threading import Thread
+
+import pytest
+
+from sibyl import metrics  # Registers the Sibyl metrics served by /metrics
+from sibyl.health_check.health_status_thread import HealthStatusThread
+
+
+@pytest.fixture
+def health_thread():
+    return HealthStatusThread(server="stdlib")
+
+@pytest.fixture
+def server_port(health_thread):
+    http_server = health_thread.create_health_server(host="127.0.0.1", port=0)
+    thread = Thread(target=http_server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield http_server.server_address[1]
+    http_server.shutdown()
+    http_server.server_close()
+
+def get(port, path, method="GET"):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    try:
+        connection.request(method, path)
+        response = connection.getresponse()
+        return response.status, response.getheader("Content-Type"), response.read()
+    finally:
+        connection.close()
+
+def test_health_endpoint_healthy(server_port):
+    status, content_type, body = get(server_port, "/health")
+    assert status == 200
+    assert content_type == "application/json"
+    assert json.loads(body) == {"status": "healthy"}
+
+def test_health_endpoint_unhealthy(health_thread, server_port):
+    health_thread.get_health_status().set_healthy(False, "Test error")
+    status, _, body = get(server_port, "/health")
+    assert status == 503
+    assert json.loads(body) == {"status": "unhealthy", "error": "Test error"}
+
+def test_ready_endpoint(health_thread, server_port):
+    status, _, body = get(server_port, "/ready")
+    assert status == 200
+    assert json.loads(body) == {"status": "ready"}
+
+    health_thread.get_health_status().set_ready(False)
+    status, _, body = get(server_port, "/ready?verbose=1")
+    assert status == 503
+    assert json.loads(body) == {"status": "not_ready"}
+
+def test_metrics_endpoint(server_port):
+    status, content_type, body = get(server_port, "/metrics")
+    assert status == 200
+    assert content_type.startswith("text/plain")
+    assert b"sibyl_watch_events_received_total" in body
+
+def test_unknown_path(server_port):
+    status, _, _ = get(server_port, "/nope")
+    assert status == 404
+
+def test_keep_alive_connection_serves_multiple_requests(server_port):
+    connection = http.client.HTTPConnection("127.0.0.1", server_port, timeout=5)
+    try:
+        for path in ["/health", "/ready", "/health"]:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            assert response.status == 200
+    finally:
+        connection.close()
+
+def test_debug_endpoints_disabled_by_default(server_port):
+    assert get(server_port, "/debug/threads")[0] == 404
+    assert get(server_port, "/debug/profile/start", method="POST")[0] == 404
+
+def test_debug_endpoints():
+    health_thread = HealthStatusThread(server="stdlib", debug_endpoints=True)
+    http_server = health_thread.create_health_server(host="127.0.0.1", port=0)
+    Thread(target=http_server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    port = http_server.server_address[1]
+    try:
+        status, content_type, body = get(port, "/debug/threads")
+        assert status == 200
+        assert content_type == "text/plain; charset=utf-8"
+        assert b"Thread MainThread" in body
+
+        assert get(port, "/debug/profile/stop?limit=5", method="POST")[0] == 409
+        assert get(port, "/debug/profile/start", method="GET")[0] == 405
+    finally:
+        http_server.shutdown()
+        http_server.server_close()
@@ -1,5 +1,6 @@
 
 import pytest
+from unittest.mock import patch
 from sibyl.health_check.health_status import HealthStatus
 
 def test_health_status_initial_state():
@@ -32,3 +33,36 @@ def test_set_and_is_ready():
     assert health_status.is_ready() is False
     health_status.set_ready(True)
     assert health_status.is_ready() is True
+
+def test_stale_heartbeat_is_unhealthy():
+    """
+    Test a heartbeat not seen within the timeout fails the health check, until it beats again.
+    """
+    health_status = HealthStatus(heartbeat_timeout_seconds=60)
+    with patch('sibyl.health_check.health_status.time.monotonic', return_value=1000.0):
+        health_status.heartbeat("event_watch")
+        health_status.heartbeat("event_processing")
+
+    with patch('sibyl.health_check.health_status.time.monotonic', return_value=1030.0):
+        health_status.heartbeat("event_processing")
+
+    with patch('sibyl.health_check.health_status.time.monotonic', return_value=1061.0):
+        assert health_status.get_stale_heartbeats() == ["event_watch"]
+        assert health_status.is_healthy() is False
+        assert health_status.get_error_message() == "No Heartbeat From event_watch In Over 60s"
+
+        health_status.heartbeat("event_watch")
+        assert health_status.is_healthy() is True
+        assert health_status.get_error_message() is None
+
+def test_heartbeats_ignored_without_timeout():
+    """
+    Test heartbeats never go stale when the heartbeat timeout is disabled.
+    """
+    health_status = HealthStatus()
+    with patch('sibyl.health_check.health_status.time.monotonic', return_value=1000.0):
+        health_status.heartbeat("event_watch")
+
+    with patch('sibyl.health_check.health_status.time.monotonic', return_value=1000000.0):
+        assert health_status.get_stale_heartbeats() == []
+        assert health_status.is_healthy() is True
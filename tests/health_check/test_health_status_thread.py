@@ -1,5 +1,6 @@
 
 import pytest
+from sibyl import metrics  # Registers the Sibyl metrics served by /metrics
 from sibyl.health_check.health_status_thread import HealthStatusThread
 
 @pytest.fixture
@@ -17,6 +18,7 @@ def test_create_health_app(health_thread):
     rules = [rule.rule for rule in app.url_map.iter_rules()]
     assert '/health' in rules
     assert '/ready' in rules
+    assert '/metrics' in rules
 
 def test_health_endpoint_healthy(health_thread):
     app = health_thread.create_health_app()
@@ -47,3 +49,39 @@ def test_ready_endpoint_not_ready(health_thread):
     response = client.get('/ready')
     assert response.status_code == 503
     assert response.json == {"status": "not_ready"}
+
+def test_metrics_endpoint(health_thread):
+    app = health_thread.create_health_app()
+    client = app.test_client()
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain")
+    assert b"sibyl_watch_events_received_total" in response.data
+
+def test_start_stdlib_server():
+    health_thread = HealthStatusThread(server="stdlib")
+    health_thread.start(host="127.0.0.1", port=0)
+    try:
+        assert health_thread.app is None
+        assert health_thread.http_server is not None
+        assert health_thread.thread.is_alive()
+    finally:
+        health_thread.http_server.shutdown()
+        health_thread.http_server.server_close()
+
+def test_debug_endpoints_disabled_by_default(health_thread):
+    app = health_thread.create_health_app()
+    assert health_thread.profiler is None
+    assert app.test_client().get('/debug/threads').status_code == 404
+
+def test_debug_endpoints():
+    health_thread = HealthStatusThread(debug_endpoints=True)
+    client = health_thread.create_health_app().test_client()
+
+    response = client.get('/debug/threads')
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain")
+    assert b"Thread MainThread" in response.data
+
+    assert client.post('/debug/profile/stop').status_code == 409
+    assert client.get('/debug/profile/start').status_code == 405
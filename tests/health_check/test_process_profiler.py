@@ -0,0 +1,105 @@
+import time
+import tracemalloc
+from threading import Event, Thread
+
+import pytest
+
+from sibyl.health_check.process_profiler import ProcessProfiler
+
+
+@pytest.fixture
+def profiler():
+    profiler = ProcessProfiler()
+    yield profiler
+    # Never leave a sampler or memory trace running into other tests
+    if profiler._sampler is not None:
+        profiler.stop_cpu_profile()
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+def busy_loop(stop_event):
+    while not stop_event.is_set():
+        sum(range(1000))
+
+def test_cpu_profile_samples_other_threads(profiler):
+    stop_event = Event()
+    worker = Thread(target=busy_loop, args=(stop_event,), name="EventProcessor_0", daemon=True)
+    worker.start()
+    try:
+        assert profiler.handle("POST", "/debug/profile/start", {"interval": "0.001", "thread": "EventProcessor"}) == (200, "CPU Profile Started. Sampling Every 0.001s\n")
+        time.sleep(0.2)
+        status, body = profiler.handle("POST", "/debug/profile/stop", {"sort": "tottime", "limit": "10"})
+    finally:
+        stop_event.set()
+        worker.join()
+
+    assert status == 200
+    assert "Samples Every 0.001s" in body
+    assert "busy_loop" in body
+    # Only threads matching the name prefix are sampled
+    assert "test_cpu_profile_samples_other_threads" not in body
+
+def test_cpu_profile_start_twice(profiler):
+    assert profiler.start_cpu_profile()[0] == 200
+    assert profiler.start_cpu_profile() == (409, "CPU Profile Already Running\n")
+
+def test_cpu_profile_stop_when_not_running(profiler):
+    assert profiler.stop_cpu_profile() == (409, "CPU Profile Not Running\n")
+
+def test_cpu_profile_bad_sort_keeps_profile_running(profiler):
+    profiler.start_cpu_profile()
+
+    status, _ = profiler.handle("POST", "/debug/profile/stop", {"sort": "nope"})
+
+    assert status == 400
+    assert profiler._sampler is not None
+
+def test_record_stack_counts_recursion_once(profiler):
+    def recurse(depth):
+        if depth == 0:
+            import sys
+            return sys._getframe()
+        return recurse(depth - 1)
+
+    profiler._record_stack(recurse(3))
+    profiler._interval_seconds = 0.5
+    stats = profiler._create_stats()
+
+    recurse_stats = next(value for function, value in stats.items() if function[2] == "recurse")
+    primitive_calls, calls, total_time, cumulative_time, callers = recurse_stats
+    assert (primitive_calls, calls, total_time, cumulative_time) == (1, 1, 0.5, 0.5)
+    assert sum(callers.values()) == 4
+
+def test_memory_trace_diff(profiler):
+    assert profiler.handle("POST", "/debug/tracemalloc/start", {"frames": "5"})[0] == 200
+    assert profiler.start_memory_trace() == (409, "Memory Trace Already Running\n")
+
+    retained = [bytearray(1024) for _ in range(1000)]
+    status, body = profiler.handle("GET", "/debug/tracemalloc", {"limit": "5"})
+
+    assert status == 200
+    assert body.startswith("Traced Memory:")
+    assert "test_process_profiler.py" in body
+    assert len(retained) == 1000
+
+    assert profiler.handle("POST", "/debug/tracemalloc/stop", {}) == (200, "Memory Trace Stopped\n")
+    assert profiler.get_memory_diff() == (409, "Memory Trace Not Running\n")
+
+def test_dump_thread_stacks(profiler):
+    stop_event = Event()
+    worker = Thread(target=stop_event.wait, name="EventWatchThread", daemon=True)
+    worker.start()
+    try:
+        status, body = profiler.handle("GET", "/debug/threads", {})
+    finally:
+        stop_event.set()
+        worker.join()
+
+    assert status == 200
+    assert "Thread EventWatchThread" in body
+    assert "test_dump_thread_stacks" in body
+
+def test_handle_unknown_route(profiler):
+    assert profiler.handle("GET", "/debug/nope", {}) == (404, "Not Found\n")
+    assert profiler.handle("GET", "/debug/profile/start", {}) == (405, "Method Not Allowed\n")
+    assert profiler.handle("POST", "/debug/profile/start", {"interval": "abc"})[0] == 400
@@ -4,6 +4,7 @@ from sibyl.models.events.k8_event import K8Event
 from sibyl.models.events.k8_event_involved_object import K8EventInvolvedObject
 from sibyl.models.events.k8_event_metadata import K8EventMetadata
 from sibyl.models.events.k8_event_source import K8EventSource
+from sibyl.models.events.k8_event_timings import K8EventTimings
 
 def test_k8_event_creation():
     """
@@ -45,3 +46,27 @@ def test_k8_event_creation():
     assert event.metadata == metadata
     assert event.involved_object == involved_object
     assert event.timestamp == "2025-11-30T12:00:00Z"
+    assert event.count == 1
+    assert event.timings == K8EventTimings()
+
+def test_k8_event_timings_not_compared():
+    """
+    Test events are equal regardless of their timings.
+    """
+    source = K8EventSource(component="kubelet", host="minikube")
+    metadata = K8EventMetadata(name="test-event", namespace="default", creation_timestamp=None, deletion_timestamp=None)
+    involved_object = K8EventInvolvedObject(kind="Pod", name="test-pod", namespace="default")
+    event_args = dict(kind="Event", source=source, action="", type="Warning", namespace="default", name="test-event", reason="BackOff", message="", metadata=metadata, involved_object=involved_object, timestamp="N/A")
+
+    event = K8Event(**event_args)
+    event.timings.mark(K8EventTimings.RECEIVED)
+
+    assert event == K8Event(**event_args)
+    assert "timings" not in repr(event)
+
+def test_k8_event_alert_key(make_event):
+    """
+    Test the alert key names the involved object, container and reason.
+    """
+    event = make_event(field_path="spec.containers{app}")
+    assert event.get_alert_key() == ("default", "Pod", "test-pod", "spec.containers{app}", "BackOff")
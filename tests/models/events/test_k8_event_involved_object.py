@@ -14,3 +14,11 @@ def test_k8_event_involved_object_creation():
     assert involved_object.kind == "Pod"
     assert involved_object.name == "test-pod"
     assert involved_object.namespace == "default"
+    assert involved_object.field_path is None
+
+def test_k8_event_involved_object_key():
+    """
+    Test the key names the object, not the part of it the event is about.
+    """
+    involved_object = K8EventInvolvedObject(kind="Pod", name="test-pod", namespace="default", field_path="spec.containers{app}")
+    assert involved_object.get_key() == ("default", "Pod", "test-pod")
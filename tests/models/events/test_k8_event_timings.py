@@ -0,0 +1,19 @@
+from unittest.mock import patch
+from sibyl.models.events.k8_event_timings import K8EventTimings
+
+def test_k8_event_timings_mark():
+    """
+    Test marking the stages an event reaches.
+    """
+    timings = K8EventTimings()
+    with patch('sibyl.models.events.k8_event_timings.time.time', side_effect=[100.0, 100.5]):
+        timings.mark(K8EventTimings.RECEIVED)
+        timings.mark(K8EventTimings.QUEUED)
+
+    assert timings.marks == {"received": 100.0, "queued": 100.5}
+
+def test_k8_event_timings_stage_order():
+    """
+    Test the stages are listed in the order events pass through them.
+    """
+    assert K8EventTimings.STAGES == ("received", "queued", "dequeued", "logs_fetched", "posted", "uploaded")
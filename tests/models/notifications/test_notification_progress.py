@@ -0,0 +1,19 @@
+from sibyl.models.notifications.notification_progress import NotificationProgress
+
+def test_notification_progress_defaults():
+    """
+    Test a new NotificationProgress has not reached any stage.
+    """
+    progress = NotificationProgress()
+    assert progress.channel is None
+    assert progress.ts is None
+    assert progress.logs_pending is False
+
+def test_notification_progress_creation():
+    """
+    Test the creation of a NotificationProgress.
+    """
+    progress = NotificationProgress(channel="C123", ts="12345", logs_pending=True)
+    assert progress.channel == "C123"
+    assert progress.ts == "12345"
+    assert progress.logs_pending is True
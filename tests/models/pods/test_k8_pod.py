@@ -0,0 +1,26 @@
+from sibyl.models.pods.k8_pod import K8Pod
+from sibyl.models.pods.k8_pod_container_status import K8PodContainerStatus
+
+def test_k8_pod_creation():
+    """
+    Test the creation of a K8Pod.
+    """
+    container_status = K8PodContainerStatus(
+        name="app",
+        restart_count=2,
+        waiting_reason="CrashLoopBackOff",
+        terminated_reason=None,
+        last_terminated_reason="Error",
+        last_terminated_exit_code=1
+    )
+    pod = K8Pod(namespace="default", name="test-pod", containers=["app"], container_statuses=[container_status])
+    assert pod.namespace == "default"
+    assert pod.name == "test-pod"
+    assert pod.containers == ["app"]
+    assert pod.container_statuses == [container_status]
+    assert container_status.restart_count == 2
+    assert container_status.last_terminated_exit_code == 1
+
+def test_k8_pod_default_container_statuses():
+    pod = K8Pod(namespace="default", name="test-pod", containers=[])
+    assert pod.container_statuses == []
@@ -0,0 +1,146 @@
+import pytest
+from threading import Event, Thread
+from unittest.mock import Mock, patch
+
+from sibyl.notifications.event_digest import EventDigest
+
+
+@pytest.fixture
+def mock_timer():
+    # Timers are never started, windows end when the test calls flush()
+    with patch('sibyl.notifications.event_digest.Timer') as mock_timer:
+        yield mock_timer
+
+def test_burst_is_sent_as_digest(mock_timer, make_event):
+    notify_func, digest_func = Mock(), Mock()
+    event_digest = EventDigest(notify_func, digest_func, window_seconds=10, min_events=3)
+
+    events = [make_event(name=f"pod-{i}") for i in range(3)]
+    for event in events:
+        event_digest.submit(event)
+    event_digest.flush()
+
+    digest_func.assert_called_once_with("node-1", events)
+    notify_func.assert_not_called()
+
+def test_small_groups_are_notified_individually(mock_timer, make_event):
+    notify_func, digest_func = Mock(), Mock()
+    event_digest = EventDigest(notify_func, digest_func, window_seconds=10, min_events=3)
+
+    events = [make_event(name="pod-1", host="node-1"), make_event(name="pod-2", host="node-1"), make_event(name="pod-3", host="node-2")]
+    for event in events:
+        event_digest.submit(event)
+    event_digest.flush()
+
+    digest_func.assert_not_called()
+    assert [call.args[0] for call in notify_func.call_args_list] == events
+
+def test_window_starts_with_first_event_of_group(mock_timer, make_event):
+    event_digest = EventDigest(Mock(), Mock(), window_seconds=10)
+
+    event_digest.submit(make_event(name="pod-1", host="node-1"))
+    event_digest.submit(make_event(name="pod-2", host="node-1"))
+    event_digest.submit(make_event(name="pod-3", host="node-2"))
+
+    assert mock_timer.call_count == 2
+    mock_timer.assert_any_call(10, event_digest._flush_group, args=("node-1",))
+    mock_timer.return_value.start.assert_called()
+
+def test_timer_flushes_group(mock_timer, make_event):
+    notify_func = Mock()
+    event_digest = EventDigest(notify_func, Mock(), window_seconds=10)
+    event = make_event()
+
+    event_digest.submit(event)
+    event_digest._flush_group("node-1")
+
+    notify_func.assert_called_once_with(event)
+    # A new window starts for the next event of the group
+    event_digest.submit(make_event())
+    assert mock_timer.call_count == 2
+
+def test_full_group_is_sent_without_waiting_for_window(make_event):
+    notify_func, digest_func = Mock(), Mock()
+    event_digest = EventDigest(notify_func, digest_func, window_seconds=60, min_events=2, max_events=3)
+
+    events = [make_event(name=f"pod-{i}") for i in range(4)]
+    for event in events:
+        event_digest.submit(event)
+    # Waits for the early send of the full group, then flushes the new group the fourth event started
+    event_digest.flush()
+
+    assert digest_func.call_args_list[0].args == ("node-1", events[:3])
+    notify_func.assert_called_once_with(events[3])
+
+@pytest.mark.parametrize("group_by, expected", [
+    ("namespace", "kube-system"),
+    ("node", "node-7"),
+    ("reason", "Evicted"),
+])
+def test_group_key(group_by, expected, make_event):
+    event_digest = EventDigest(Mock(), Mock(), group_by=group_by)
+    assert event_digest.get_group_key(make_event(namespace="kube-system", host="node-7", reason="Evicted")) == expected
+
+def test_group_key_without_node(make_event):
+    event_digest = EventDigest(Mock(), Mock(), group_by="node")
+    assert event_digest.get_group_key(make_event(host=None)) is None
+
+def test_events_without_group_key_are_not_digested(mock_timer, make_event):
+    notify_func, digest_func = Mock(), Mock()
+    event_digest = EventDigest(notify_func, digest_func, min_events=2)
+
+    events = [make_event(name="pod-1", namespace="team-a", host=None), make_event(name="pod-2", namespace="team-b", host=None)]
+    for event in events:
+        event_digest.submit(event)
+
+    # Passed on straight away rather than waiting out a window
+    assert [call.args[0] for call in notify_func.call_args_list] == events
+    mock_timer.assert_not_called()
+    event_digest.flush()
+    digest_func.assert_not_called()
+
+def test_notify_errors_are_logged(mock_timer, caplog, make_event):
+    notify_func = Mock(side_effect=[Exception("test error"), None])
+    event_digest = EventDigest(notify_func, Mock(), min_events=3)
+
+    event_digest.submit(make_event(name="pod-1"))
+    event_digest.submit(make_event(name="pod-2"))
+    event_digest.flush()
+
+    assert notify_func.call_count == 2
+    assert "Error sending event notification: test error" in caplog.text
+
+def test_timer_fires_after_window(make_event):
+    digest_func = Mock()
+    event_digest = EventDigest(Mock(), digest_func, window_seconds=0.01, min_events=2)
+
+    event_digest.submit(make_event(name="pod-1"))
+    event_digest.submit(make_event(name="pod-2"))
+    event_digest._timers["node-1"].join(timeout=5)
+
+    digest_func.assert_called_once()
+
+def test_flush_waits_for_windows_already_sending(make_event):
+    sending, release = Event(), Event()
+    notified = []
+    def notify_func(event):
+        sending.set()
+        release.wait(timeout=5)
+        notified.append(event)
+
+    event_digest = EventDigest(notify_func, Mock(), window_seconds=0.01, min_events=2)
+    event = make_event()
+    event_digest.submit(event)
+    assert sending.wait(timeout=5)
+
+    flushed = []
+    flusher = Thread(target=lambda: flushed.append(event_digest.flush()))
+    flusher.start()
+    flusher.join(timeout=0.1)
+    # The window's timer is still sending its group, so flush() has not returned
+    assert not flushed
+
+    release.set()
+    flusher.join(timeout=5)
+    assert flushed
+    assert notified == [event]
@@ -0,0 +1,154 @@
+import sqlite3
+import pytest
+from unittest.mock import Mock, patch
+
+from sibyl.models.events.k8_event_timings import K8EventTimings
+from sibyl.models.notifications.notification_progress import NotificationProgress
+from sibyl.notifications.notification_outbox import NotificationOutbox
+
+
+@pytest.fixture
+def outbox_path(tmp_path):
+    return str(tmp_path / "outbox.db")
+
+def test_outbox_uses_wal(outbox_path):
+    outbox = NotificationOutbox(outbox_path, deliver_func=Mock())
+    assert outbox._connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+def test_put_is_buffered_until_flush(outbox_path, make_event):
+    outbox = NotificationOutbox(outbox_path, deliver_func=Mock())
+    outbox.put(make_event(), logs=[("app", "logs")], restart_count=1)
+
+    assert sqlite3.connect(outbox_path).execute("SELECT COUNT(*) FROM outbox").fetchone()[0] == 0
+    assert outbox.get_stats()["pending"] == 1
+
+    outbox._flush()
+
+    assert sqlite3.connect(outbox_path).execute("SELECT COUNT(*) FROM outbox").fetchone()[0] == 1
+
+def test_put_wakes_thread_once_batch_is_full(outbox_path, make_event):
+    outbox = NotificationOutbox(outbox_path, deliver_func=Mock(), batch_size=2)
+
+    outbox.put(make_event())
+    assert not outbox._wake_event.is_set()
+    outbox.put(make_event())
+    assert outbox._wake_event.is_set()
+
+def test_deliver_round_trips_notification(outbox_path, make_event):
+    deliver_func = Mock()
+    outbox = NotificationOutbox(outbox_path, deliver_func=deliver_func)
+    event = make_event(field_path="spec.containers{app}", count=2)
+
+    outbox.put(event, logs=[("app", "logs")], restart_count=3)
+    outbox._flush()
+    outbox._deliver_due()
+
+    deliver_func.assert_called_once_with(event, [("app", "logs")], 3, NotificationProgress())
+    assert outbox.get_stats() == {"delivered": 1, "failed_attempts": 0, "dropped": 0, "pending": 0}
+
+def test_deliver_keeps_event_timings(outbox_path, make_event):
+    deliver_func = Mock()
+    outbox = NotificationOutbox(outbox_path, deliver_func=deliver_func)
+    event = make_event()
+    event.timings.marks = {K8EventTimings.RECEIVED: 100.0, K8EventTimings.DEQUEUED: 101.5}
+
+    outbox.put(event)
+    outbox._flush()
+    outbox._deliver_due()
+
+    assert deliver_func.call_args.args[0].timings.marks == {K8EventTimings.RECEIVED: 100.0, K8EventTimings.DEQUEUED: 101.5}
+
+def test_failed_delivery_is_retried_with_backoff(outbox_path, make_event):
+    deliver_func = Mock(side_effect=[Exception("slack down"), None])
+    outbox = NotificationOutbox(outbox_path, deliver_func=deliver_func, retry_base_seconds=5)
+
+    with patch('sibyl.notifications.notification_outbox.time.time', return_value=1000.0), \
+         patch('sibyl.notifications.notification_outbox.random.uniform', side_effect=lambda low, high: high):
+        outbox.put(make_event())
+        outbox._flush()
+        outbox._deliver_due()
+        # Not due again until the backoff has passed
+        outbox._deliver_due()
+
+    assert deliver_func.call_count == 1
+    assert outbox.get_stats()["pending"] == 1
+    assert outbox._connection.execute("SELECT attempts, next_attempt_at FROM outbox").fetchone() == (1, 1005.0)
+
+    with patch('sibyl.notifications.notification_outbox.time.time', return_value=1005.0):
+        outbox._deliver_due()
+
+    assert deliver_func.call_count == 2
+    assert outbox.get_stats() == {"delivered": 1, "failed_attempts": 1, "dropped": 0, "pending": 0}
+
+def test_retry_resumes_from_recorded_progress(outbox_path, make_event):
+    def post_then_fail_upload(event, logs, restart_count, progress):
+        if progress.ts is None:
+            progress.channel, progress.ts, progress.logs_pending = "C123", "1234.5678", True
+        raise Exception("upload failed")
+
+    outbox = NotificationOutbox(outbox_path, deliver_func=Mock(side_effect=post_then_fail_upload), retry_base_seconds=0)
+
+    outbox.put(make_event(), logs=[("app", "logs")])
+    outbox._flush()
+    outbox._deliver_due()
+
+    outbox.deliver_func = Mock()
+    outbox._deliver_due()
+
+    outbox.deliver_func.assert_called_once()
+    assert outbox.deliver_func.call_args.args[3] == NotificationProgress(channel="C123", ts="1234.5678", logs_pending=True)
+
+def test_delivered_notification_is_removed_before_the_next_is_delivered(outbox_path, make_event):
+    def deliver_func(event, logs, restart_count, progress):
+        remaining.append(sqlite3.connect(outbox_path).execute("SELECT COUNT(*) FROM outbox").fetchone()[0])
+
+    remaining = []
+    outbox = NotificationOutbox(outbox_path, deliver_func=deliver_func)
+    outbox.put(make_event(name="pod-1"))
+    outbox.put(make_event(name="pod-2"))
+    outbox._flush()
+    outbox._deliver_due()
+
+    assert remaining == [2, 1]
+
+def test_notification_dropped_after_max_attempts(outbox_path, make_event):
+    deliver_func = Mock(side_effect=Exception("slack down"))
+    outbox = NotificationOutbox(outbox_path, deliver_func=deliver_func, max_attempts=2, retry_base_seconds=0)
+
+    outbox.put(make_event())
+    outbox._flush()
+    outbox._deliver_due()
+    outbox._deliver_due()
+
+    assert deliver_func.call_count == 2
+    assert outbox.get_stats() == {"delivered": 0, "failed_attempts": 2, "dropped": 1, "pending": 0}
+
+def test_undelivered_notifications_survive_restart(outbox_path, make_event):
+    outbox = NotificationOutbox(outbox_path, deliver_func=Mock())
+    outbox.put(make_event(name="pod-1"))
+    outbox.put(make_event(name="pod-2"))
+    outbox._flush()
+    outbox._connection.close()
+
+    deliver_func = Mock()
+    restarted_outbox = NotificationOutbox(outbox_path, deliver_func=deliver_func)
+    restarted_outbox._deliver_due()
+
+    assert [call.args[0].involved_object.name for call in deliver_func.call_args_list] == ["pod-1", "pod-2"]
+
+def test_run_delivers_and_flushes_on_stop(outbox_path, make_event):
+    delivered = []
+    outbox = NotificationOutbox(outbox_path, deliver_func=lambda event, logs, restart_count, progress: delivered.append(event), flush_interval_seconds=0.01)
+    outbox.start()
+
+    outbox.put(make_event())
+    for _ in range(500):
+        if delivered:
+            break
+        outbox._stop_event.wait(0.01)
+
+    outbox.stop()
+    outbox.join(timeout=5)
+
+    assert len(delivered) == 1
+    assert not outbox.is_alive()
@@ -0,0 +1,57 @@
+from sibyl.notifications.slack_block_templates import SlackBlockTemplates
+
+
+def text_cell(text, bold=False):
+    element = {"type": "text", "text": text}
+    if bold:
+        element["style"] = {"bold": True}
+    return {"type": "rich_text", "elements": [{"type": "rich_text_section", "elements": [element]}]}
+
+def test_render_blocks(make_event):
+    templates = SlackBlockTemplates(cluster_name="prod")
+
+    assert templates.render_blocks(make_event()) == [
+        {"type": "section", "text": {"type": "mrkdwn", "text": "*[prod] Warning:* Pod `default/test-pod` -> BackOff "}},
+        {"type": "section", "fields": [
+            {"type": "mrkdwn", "text": "*Cluster:*\nprod"},
+            {"type": "mrkdwn", "text": "*Namespace:*\ndefault"},
+            {"type": "mrkdwn", "text": "*Involved Object:*\nPod / `test-pod`"},
+            {"type": "mrkdwn", "text": "*Alert Type:*\nWarning"},
+            {"type": "mrkdwn", "text": "*Reason:*\nBackOff"},
+        ]},
+        {"type": "divider"},
+        {"type": "rich_text", "elements": [{"type": "rich_text_preformatted", "elements": [{"type": "text", "text": "Back-off restarting failed container"}]}]},
+        {"type": "table", "rows": [
+            [text_cell("Type", bold=True), text_cell("Timestamp", bold=True)],
+            [text_cell("Event Timestamp"), text_cell("2025-11-30T12:00:00+00:00")],
+            [text_cell("Involved Object Creation Timestamp"), text_cell("2025-11-30T11:00:00+00:00")],
+            [text_cell("Involved Object Deletion Timestamp"), text_cell("N/A")],
+        ]},
+    ]
+
+def test_render_blocks_without_cluster_name(make_event):
+    blocks = SlackBlockTemplates().render_blocks(make_event())
+
+    assert blocks[0]["text"]["text"] == "*Warning:* Pod `default/test-pod` -> BackOff "
+    assert not any("Cluster" in field["text"] for field in blocks[1]["fields"])
+
+def test_render_fields_occurrences(make_event):
+    templates = SlackBlockTemplates()
+    event = make_event()
+
+    assert {"type": "mrkdwn", "text": "*Occurrences:*\n7, last seen 2025-11-30T12:00:00+00:00"} in templates.render_fields(event, occurrences=7, last_seen=event.timestamp)
+
+def test_static_parts_are_shared_between_renders(make_event):
+    templates = SlackBlockTemplates(cluster_name="prod")
+
+    first = templates.render_blocks(make_event(name="pod-1"))
+    second = templates.render_blocks(make_event(name="pod-2", message="other"))
+
+    assert first[2] is second[2]
+    assert first[4]["rows"][0] is second[4]["rows"][0]
+    assert first[4]["rows"][1][0] is second[4]["rows"][1][0]
+    assert first[1]["fields"][0] is second[1]["fields"][0]
+    # Per event slots are not shared
+    assert first[0]["text"]["text"] != second[0]["text"]["text"]
+    assert first[3]["elements"][0]["elements"][0]["text"] == "Back-off restarting failed container"
+    assert second[3]["elements"][0]["elements"][0]["text"] == "other"
@@ -0,0 +1,65 @@
+import pytest
+
+from sibyl.notifications.slack_message_index import SlackMessageIndex
+
+
+pytestmark = pytest.mark.parametrize("mock_monotonic", ["sibyl.notifications.slack_message_index.time.monotonic"], indirect=True)
+
+def test_set_and_get(mock_monotonic, make_event):
+    index = SlackMessageIndex(ttl_seconds=60)
+
+    assert index.get(make_event()) is None
+    index.set(make_event(count=2), channel="C123", ts="12345", restart_count=1)
+
+    message = index.get(make_event())
+    assert (message.channel, message.ts, message.count, message.restart_count) == ("C123", "12345", 2, 1)
+    assert index.get(make_event(reason="Unhealthy")) is None
+    assert index.get(make_event(field_path="spec.containers{sidecar}")) is None
+    assert index.get_stats() == {"hits": 1, "misses": 3, "evictions": 0, "size": 1}
+
+def test_entries_expire_after_ttl_from_first_post(mock_monotonic, make_event):
+    index = SlackMessageIndex(ttl_seconds=60)
+    index.set(make_event(), channel="C123", ts="12345")
+
+    mock_monotonic.return_value = 1059.0
+    assert index.get(make_event()) is not None
+    mock_monotonic.return_value = 1060.0
+    assert index.get(make_event()) is None
+    assert index.get_stats()["size"] == 0
+
+def test_evicts_least_recently_used(mock_monotonic, make_event):
+    index = SlackMessageIndex(max_size=2)
+    index.set(make_event(name="pod-1"), channel="C123", ts="1")
+    index.set(make_event(name="pod-2"), channel="C123", ts="2")
+    index.get(make_event(name="pod-1"))
+    index.set(make_event(name="pod-3"), channel="C123", ts="3")
+
+    assert index.get(make_event(name="pod-2")) is None
+    assert index.get(make_event(name="pod-1")).ts == "1"
+    assert index.get_stats()["evictions"] == 1
+
+def test_delete(mock_monotonic, make_event):
+    index = SlackMessageIndex()
+    index.set(make_event(), channel="C123", ts="12345")
+
+    index.delete(make_event())
+    index.delete(make_event())
+
+    assert index.get(make_event()) is None
+
+def test_peek_does_not_count_or_refresh(mock_monotonic, make_event):
+    index = SlackMessageIndex(ttl_seconds=60, max_size=2)
+    index.set(make_event(name="pod-a"), channel="C123", ts="1")
+    index.set(make_event(name="pod-b"), channel="C123", ts="2")
+
+    assert index.peek(make_event(name="pod-a")).ts == "1"
+    assert index.peek(make_event(name="pod-c")) is None
+    assert index.get_stats()["hits"] == 0
+    assert index.get_stats()["misses"] == 0
+
+    # pod-a is still the least recently used entry
+    index.set(make_event(name="pod-c"), channel="C123", ts="3")
+    assert index.peek(make_event(name="pod-a")) is None
+
+    mock_monotonic.return_value = 1060.0
+    assert index.peek(make_event(name="pod-b")) is None
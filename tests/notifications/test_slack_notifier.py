@@ -1,14 +1,21 @@
 
 import pytest
-from unittest.mock import Mock, patch
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from threading import Barrier
+from unittest.mock import ANY, Mock
+from slack_sdk.errors import SlackApiError
 from slack_sdk.web import WebClient
 import requests
+from prometheus_client import REGISTRY
 
+from sibyl.notifications.slack_message_index import SlackMessageIndex
 from sibyl.notifications.slack_notifier import SlackNotifier
 from sibyl.models.events.k8_event import K8Event
 from sibyl.models.events.k8_event_involved_object import K8EventInvolvedObject
 from sibyl.models.events.k8_event_metadata import K8EventMetadata
 from sibyl.models.events.k8_event_source import K8EventSource
+from sibyl.models.notifications.notification_progress import NotificationProgress
 
 @pytest.fixture
 def k8_event_data():
@@ -57,9 +64,9 @@ def test_notify_without_logs(slack_notifier, k8_event_data):
 
 def test_notify_with_logs(slack_notifier, k8_event_data, mocker):
     slack_notifier.client.chat_postMessage.return_value = {"ok": True, "ts": "12345", "channel": "C123"}
-    slack_notifier.client.files_getUploadURLExternal.return_value = {"ok": True, "upload_url": "http://upload.url", "file_id": "F123"}
-    mocker.patch("requests.post")
-    requests.post.return_value.raise_for_status.return_value = None
+    slack_notifier.client.files_getUploadURLExternal.side_effect = lambda filename, **kwargs: {"ok": True, "upload_url": f"http://upload.url/{filename}", "file_id": f"F_{filename}"}
+    mocker.patch.object(slack_notifier, "_session")
+    slack_notifier._session.post.return_value.raise_for_status.return_value = None
     slack_notifier.client.files_completeUploadExternal.return_value = {"ok": True}
 
     logs_data = [("container1", "logs for container1"), ("container2", "logs for container2")]
@@ -73,50 +80,65 @@ def test_notify_with_logs(slack_notifier, k8_event_data, mocker):
     )
     # Assert log uploads for each container
     assert slack_notifier.client.files_getUploadURLExternal.call_count == 2
-    assert requests.post.call_count == 2
-    assert slack_notifier.client.files_completeUploadExternal.call_count == 2
-
-    # Assert specific calls for container1
-    slack_notifier.client.files_getUploadURLExternal.assert_any_call(
-        filename=f"logs_pod_default_test_pod_container1.txt",
-        length=len("logs for container1"),
-        snippet_type="text"
-    )
-    requests.post.assert_any_call(
-        "http://upload.url",
-        headers={'Content-Type': 'application/octet-stream'},
-        data="logs for container1".encode('utf-8')
-    )
-    slack_notifier.client.files_completeUploadExternal.assert_any_call(
-        upload_url=mocker.ANY,
-        channels=[mocker.ANY],
-        thread_ts="12345",
-        initial_comment=mocker.ANY,
-        files=mocker.ANY
-    )
-    slack_notifier.client.files_getUploadURLExternal.assert_any_call(
-        filename=f"logs_pod_default_test_pod_container2.txt",
-        length=len("logs for container2"),
-        snippet_type="text"
-    )
-    requests.post.assert_any_call(
-        "http://upload.url",
-        headers={'Content-Type': 'application/octet-stream'},
-        data="logs for container2".encode('utf-8')
-    )
-    slack_notifier.client.files_completeUploadExternal.assert_any_call(
-        upload_url=mocker.ANY,
-        channels=[mocker.ANY],
+    assert slack_notifier._session.post.call_count == 2
+
+    for container_name in ["container1", "container2"]:
+        file_name = f"logs_pod_default_test_pod_{container_name}.txt"
+        slack_notifier.client.files_getUploadURLExternal.assert_any_call(
+            filename=file_name,
+            length=len(f"logs for {container_name}"),
+            snippet_type="text"
+        )
+        slack_notifier._session.post.assert_any_call(
+            f"http://upload.url/{file_name}",
+            headers={'Content-Type': 'application/octet-stream'},
+            data=f"logs for {container_name}".encode('utf-8')
+        )
+
+    # Every file is completed in a single call, threaded on the original message
+    slack_notifier.client.files_completeUploadExternal.assert_called_once_with(
+        channels=["C123"],
         thread_ts="12345",
-        initial_comment=mocker.ANY,
-        files=mocker.ANY
+        initial_comment="Logs for Containers: container1, container2 in Pod: default/test-pod",
+        files=[
+            {"id": "F_logs_pod_default_test_pod_container1.txt", "title": "logs_pod_default_test_pod_container1.txt"},
+            {"id": "F_logs_pod_default_test_pod_container2.txt", "title": "logs_pod_default_test_pod_container2.txt"},
+        ]
     )
-    # The threaded messages are part of files_completeUploadExternal, so no separate chat_postMessage call to assert
-    # slack_notifier.client.chat_postMessage.assert_any_call(
-    #     channel="C123",
-    #     thread_ts="12345",
-    #     text=mocker.ANY
-    # )
+
+def test_notify_uploads_logs_concurrently(slack_notifier, k8_event_data, mocker):
+    slack_notifier.client.chat_postMessage.return_value = {"ok": True, "ts": "12345", "channel": "C123"}
+    slack_notifier.client.files_getUploadURLExternal.return_value = {"ok": True, "upload_url": "http://upload.url", "file_id": "F123"}
+    slack_notifier.client.files_completeUploadExternal.return_value = {"ok": True}
+
+    # Every upload waits for all of the others to start, which only completes if they run at the same time
+    barrier = Barrier(3, timeout=5)
+    def post(*args, **kwargs):
+        barrier.wait()
+        return Mock()
+    mocker.patch.object(slack_notifier, "_session")
+    slack_notifier._session.post.side_effect = post
+
+    slack_notifier.notify(k8_event_data, logs=[(f"container{i}", "logs") for i in range(3)])
+
+    assert len(slack_notifier.client.files_completeUploadExternal.call_args.kwargs["files"]) == 3
+
+def test_notify_length_is_bytes(slack_notifier, k8_event_data, mocker):
+    slack_notifier.client.chat_postMessage.return_value = {"ok": True, "ts": "12345", "channel": "C123"}
+    slack_notifier.client.files_getUploadURLExternal.return_value = {"ok": True, "upload_url": "http://upload.url", "file_id": "F123"}
+    slack_notifier.client.files_completeUploadExternal.return_value = {"ok": True}
+    mocker.patch.object(slack_notifier, "_session")
+
+    slack_notifier.notify(k8_event_data, logs=[("container1", "é")])
+
+    assert slack_notifier.client.files_getUploadURLExternal.call_args.kwargs["length"] == 2
+
+def test_create_fields_includes_occurrences(slack_notifier, k8_event_data):
+    assert not any("Occurrences" in field["text"] for field in slack_notifier.templates.render_fields(k8_event_data))
+
+    k8_event_data.count = 5
+    fields = slack_notifier.templates.render_fields(k8_event_data)
+    assert {"type": "mrkdwn", "text": "*Occurrences:*\n5 since last alert"} in fields
 
 def test_notify_post_message_fails(slack_notifier, k8_event_data, caplog):
     slack_notifier.client.chat_postMessage.return_value = {"ok": False, "error": "test_error"}
@@ -132,23 +154,38 @@ def test_notify_get_upload_url_fails(slack_notifier, k8_event_data, caplog):
     
     assert "Slack files.getUploadURLExternal Failed for event default/test-pod -> container1 to Slack" in caplog.text
 
-@patch("requests.post")
-def test_notify_upload_fails(mock_post, slack_notifier, k8_event_data, caplog):
+def test_notify_upload_fails(slack_notifier, k8_event_data, caplog, mocker):
     slack_notifier.client.chat_postMessage.return_value = {"ok": True, "ts": "12345", "channel": "C123"}
     slack_notifier.client.files_getUploadURLExternal.return_value = {"ok": True, "upload_url": "http://upload.url", "file_id": "F123"}
-    mock_post.side_effect = requests.exceptions.RequestException("test error")
+    mocker.patch.object(slack_notifier, "_session")
+    slack_notifier._session.post.side_effect = requests.exceptions.RequestException("test error")
     
     logs_data = [("container1", "some logs")]
     slack_notifier.notify(k8_event_data, logs=logs_data)
     
     assert "Failed to upload logs for event default/test-pod -> container1 to Slack" in caplog.text
+    slack_notifier.client.files_completeUploadExternal.assert_not_called()
+
+def test_notify_completes_successful_uploads_when_one_fails(slack_notifier, k8_event_data, mocker):
+    slack_notifier.client.chat_postMessage.return_value = {"ok": True, "ts": "12345", "channel": "C123"}
+    slack_notifier.client.files_getUploadURLExternal.side_effect = lambda filename, **kwargs: (
+        {"ok": False, "error": "test_error"} if "container1" in filename else {"ok": True, "upload_url": "http://upload.url", "file_id": "F2"}
+    )
+    mocker.patch.object(slack_notifier, "_session")
+    slack_notifier.client.files_completeUploadExternal.return_value = {"ok": True}
+
+    slack_notifier.notify(k8_event_data, logs=[("container1", "some logs"), ("container2", "more logs")])
+
+    slack_notifier.client.files_completeUploadExternal.assert_called_once()
+    assert slack_notifier.client.files_completeUploadExternal.call_args.kwargs["files"] == [
+        {"id": "F2", "title": "logs_pod_default_test_pod_container2.txt"}
+    ]
 
 
 def test_notify_complete_upload_fails(slack_notifier, k8_event_data, caplog, mocker):
     slack_notifier.client.chat_postMessage.return_value = {"ok": True, "ts": "12345", "channel": "C123"}
     slack_notifier.client.files_getUploadURLExternal.return_value = {"ok": True, "upload_url": "http://upload.url", "file_id": "F123"}
-    mocker.patch("requests.post")
-    requests.post.return_value.raise_for_status.return_value = None
+    mocker.patch.object(slack_notifier, "_session")
     slack_notifier.client.files_completeUploadExternal.return_value = {"ok": False, "error": "test_error"}
     
     logs_data = [("container1", "some logs")]
@@ -156,3 +193,162 @@ def test_notify_complete_upload_fails(slack_notifier, k8_event_data, caplog, moc
     
     assert "Slack files.completeUploadExternal Failed for event default/test-pod -> container1" in caplog.text
 
+def test_notify_calls_go_through_rate_limiter(slack_notifier, k8_event_data):
+    slack_notifier.rate_limiter = Mock()
+    slack_notifier.rate_limiter.call.return_value = {"ok": True, "ts": "12345"}
+
+    slack_notifier.notify(k8_event_data)
+
+    slack_notifier.rate_limiter.call.assert_called_once_with("chat.postMessage", slack_notifier.client.chat_postMessage, channel="test_channel", text="", blocks=ANY)
+
+def test_notify_marks_posted_and_uploaded(slack_notifier, k8_event_data, mocker):
+    slack_notifier.client.chat_postMessage.return_value = {"ok": True, "ts": "12345", "channel": "C123"}
+    mocker.patch.object(slack_notifier, "_upload_logs")
+
+    slack_notifier.notify(k8_event_data, logs=[("app", "logs")])
+
+    assert list(k8_event_data.timings.marks) == ["posted", "uploaded"]
+
+def test_notify_does_not_mark_uploaded_when_every_upload_fails(slack_notifier, k8_event_data, caplog):
+    slack_notifier.client.chat_postMessage.return_value = {"ok": True, "ts": "12345", "channel": "C123"}
+    slack_notifier.client.files_getUploadURLExternal.return_value = {"ok": False, "error": "test_error"}
+    progress = NotificationProgress()
+
+    slack_notifier.notify(k8_event_data, logs=[("container1", "logs"), ("container2", "logs")], progress=progress)
+
+    assert list(k8_event_data.timings.marks) == ["posted"]
+    assert progress.logs_pending is True
+    slack_notifier.client.files_completeUploadExternal.assert_not_called()
+    assert "No logs were uploaded for event default/test-pod" in caplog.text
+
+def test_notify_records_notification_lag(slack_notifier, k8_event_data):
+    slack_notifier.client.chat_postMessage.return_value = {"ok": True, "ts": "12345"}
+    count_before = REGISTRY.get_sample_value("sibyl_notification_lag_seconds_count") or 0
+    sum_before = REGISTRY.get_sample_value("sibyl_notification_lag_seconds_sum") or 0
+
+    slack_notifier.notify(replace(k8_event_data, timestamp=(datetime.now(timezone.utc) - timedelta(seconds=30)).isoformat()))
+    # Events without a last timestamp are not measured
+    slack_notifier.notify(replace(k8_event_data, timestamp="N/A"))
+
+    assert REGISTRY.get_sample_value("sibyl_notification_lag_seconds_count") == count_before + 1
+    assert REGISTRY.get_sample_value("sibyl_notification_lag_seconds_sum") - sum_before == pytest.approx(30, abs=5)
+
+def test_notify_digest(slack_notifier, k8_event_data):
+    slack_notifier.client.chat_postMessage.return_value = {"ok": True, "ts": "12345", "channel": "C123"}
+    k8_event_data.count = 2
+
+    slack_notifier.notify_digest("node", "node-1", [k8_event_data, k8_event_data])
+
+    assert slack_notifier.client.chat_postMessage.call_count == 2
+    summary = slack_notifier.client.chat_postMessage.call_args_list[0].kwargs
+    assert summary["text"] == "[test_cluster] 2 Events on node `node-1`"
+    assert summary["blocks"][1]["fields"][0]["text"] == "*Reasons:*\nPodCreated: 4"
+    assert summary["blocks"][1]["fields"][1]["text"] == "*Namespaces:*\ndefault: 4"
+
+    details = slack_notifier.client.chat_postMessage.call_args_list[1].kwargs
+    assert details["channel"] == "C123"
+    assert details["thread_ts"] == "12345"
+    assert details["text"].count("Pod `default/test-pod` -> *PodCreated* (x2): Pod test-pod created") == 2
+
+def test_notify_digest_splits_long_details(slack_notifier, k8_event_data):
+    slack_notifier.client.chat_postMessage.return_value = {"ok": True, "ts": "12345", "channel": "C123"}
+    k8_event_data.message = "x" * 2000
+
+    slack_notifier.notify_digest("node", "node-1", [k8_event_data] * 3)
+
+    # The summary then one thread reply per event, as two events do not fit in one message
+    assert slack_notifier.client.chat_postMessage.call_count == 4
+    for call in slack_notifier.client.chat_postMessage.call_args_list[1:]:
+        assert len(call.kwargs["text"]) <= SlackNotifier.DIGEST_MESSAGE_MAX_CHARS
+
+def test_notify_digest_post_fails(slack_notifier, k8_event_data, caplog):
+    slack_notifier.client.chat_postMessage.return_value = {"ok": False, "error": "test_error"}
+
+    slack_notifier.notify_digest("node", "node-1", [k8_event_data])
+
+    slack_notifier.client.chat_postMessage.assert_called_once()
+    assert "Failed to post slack digest notification for node node-1 to Slack: test_error" in caplog.text
+
+@pytest.fixture
+def indexed_slack_notifier(slack_notifier, mocker):
+    slack_notifier.message_index = SlackMessageIndex()
+    slack_notifier.client.chat_postMessage.return_value = {"ok": True, "ts": "12345", "channel": "C123"}
+    slack_notifier.client.chat_update.return_value = {"ok": True}
+    slack_notifier.client.files_getUploadURLExternal.return_value = {"ok": True, "upload_url": "http://upload.url", "file_id": "F123"}
+    slack_notifier.client.files_completeUploadExternal.return_value = {"ok": True}
+    mocker.patch.object(slack_notifier, "_session")
+    return slack_notifier
+
+def test_notify_recurring_event_updates_message(indexed_slack_notifier, k8_event_data):
+    indexed_slack_notifier.notify(k8_event_data, logs=[("container1", "logs")], restart_count=1)
+    k8_event_data.count = 3
+    k8_event_data.timestamp = "2025-11-30T12:05:00Z"
+    indexed_slack_notifier.notify(k8_event_data, logs=[("container1", "logs")], restart_count=1)
+
+    indexed_slack_notifier.client.chat_postMessage.assert_called_once()
+    update = indexed_slack_notifier.client.chat_update.call_args.kwargs
+    assert update["channel"] == "C123"
+    assert update["ts"] == "12345"
+    assert {"type": "mrkdwn", "text": "*Occurrences:*\n4, last seen 2025-11-30T12:05:00Z"} in update["blocks"][1]["fields"]
+    # Same restart count, so the logs already in the thread are not uploaded again
+    indexed_slack_notifier.client.files_completeUploadExternal.assert_called_once()
+
+def test_notify_recurring_event_uploads_logs_after_restart(indexed_slack_notifier, k8_event_data):
+    indexed_slack_notifier.notify(k8_event_data, logs=[("container1", "logs")], restart_count=1)
+    indexed_slack_notifier.notify(k8_event_data, logs=[("container1", "logs")], restart_count=2)
+
+    indexed_slack_notifier.client.chat_update.assert_called_once()
+    assert indexed_slack_notifier.client.files_completeUploadExternal.call_count == 2
+    assert indexed_slack_notifier.client.files_completeUploadExternal.call_args.kwargs["thread_ts"] == "12345"
+
+def test_notify_posts_new_message_when_update_fails(indexed_slack_notifier, k8_event_data, caplog):
+    indexed_slack_notifier.notify(k8_event_data)
+    indexed_slack_notifier.client.chat_update.side_effect = SlackApiError("message_not_found", {"ok": False, "error": "message_not_found"})
+    indexed_slack_notifier.notify(k8_event_data)
+
+    assert indexed_slack_notifier.client.chat_postMessage.call_count == 2
+    # The index now points at the new message, with the occurrence count starting over
+    assert indexed_slack_notifier.message_index.get(k8_event_data).count == k8_event_data.count
+    assert "Failed to update slack notification for event default/test-pod: message_not_found" in caplog.text
+
+def test_notify_records_progress(indexed_slack_notifier, k8_event_data):
+    progress = NotificationProgress()
+    indexed_slack_notifier.notify(k8_event_data, logs=[("container1", "logs")], restart_count=1, progress=progress)
+
+    assert progress == NotificationProgress(channel="C123", ts="12345", logs_pending=False)
+
+def test_notify_retry_after_upload_failure_only_uploads(indexed_slack_notifier, k8_event_data):
+    progress = NotificationProgress()
+    indexed_slack_notifier.client.files_completeUploadExternal.side_effect = [SlackApiError("internal_error", {"ok": False, "error": "internal_error"}), {"ok": True}]
+    with pytest.raises(SlackApiError):
+        indexed_slack_notifier.notify(k8_event_data, logs=[("container1", "logs")], restart_count=1, progress=progress)
+    assert progress == NotificationProgress(channel="C123", ts="12345", logs_pending=True)
+
+    indexed_slack_notifier.notify(k8_event_data, logs=[("container1", "logs")], restart_count=1, progress=progress)
+
+    # The message was posted by the failed attempt, so it is neither posted again nor counted twice
+    indexed_slack_notifier.client.chat_postMessage.assert_called_once()
+    indexed_slack_notifier.client.chat_update.assert_not_called()
+    assert indexed_slack_notifier.message_index.get(k8_event_data).count == k8_event_data.count
+    assert indexed_slack_notifier.client.files_completeUploadExternal.call_count == 2
+    assert indexed_slack_notifier.client.files_completeUploadExternal.call_args.kwargs["thread_ts"] == "12345"
+    assert progress.logs_pending is False
+
+def test_needs_logs(indexed_slack_notifier, k8_event_data):
+    assert indexed_slack_notifier.needs_logs(k8_event_data, restart_count=1) is True
+
+    indexed_slack_notifier.notify(k8_event_data, restart_count=1)
+
+    assert indexed_slack_notifier.needs_logs(k8_event_data, restart_count=1) is False
+    assert indexed_slack_notifier.needs_logs(k8_event_data, restart_count=2) is True
+    assert indexed_slack_notifier.needs_logs(k8_event_data, restart_count=None) is True
+
+def test_needs_logs_does_not_count_index_lookups(indexed_slack_notifier, k8_event_data):
+    indexed_slack_notifier.needs_logs(k8_event_data, restart_count=1)
+    indexed_slack_notifier.notify(k8_event_data, restart_count=1)
+
+    assert indexed_slack_notifier.message_index.get_stats()["misses"] == 1
+    assert indexed_slack_notifier.message_index.get_stats()["hits"] == 0
+
+def test_needs_logs_without_index(slack_notifier, k8_event_data):
+    assert slack_notifier.needs_logs(k8_event_data, restart_count=1) is True
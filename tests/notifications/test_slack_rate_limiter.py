@@ -0,0 +1,148 @@
+import pytest
+from unittest.mock import Mock, patch
+
+from prometheus_client import REGISTRY
+from slack_sdk.errors import SlackApiError
+from slack_sdk.web import SlackResponse
+
+from sibyl.notifications.slack_rate_limiter import SlackRateLimiter
+
+
+def make_slack_error(status_code=429, error="ratelimited", headers=None):
+    response = SlackResponse(
+        client=Mock(), http_verb="POST", api_url="https://slack.com/api/chat.postMessage", req_args={},
+        data={"ok": False, "error": error}, headers=headers or {}, status_code=status_code
+    )
+    return SlackApiError(message=error, response=response)
+
+@pytest.fixture
+def mock_time():
+    # A fake clock that only moves forward when something sleeps
+    clock = {"now": 1000.0}
+    def sleep(seconds):
+        clock["now"] += seconds
+    with patch('sibyl.notifications.slack_rate_limiter.time.monotonic', side_effect=lambda: clock["now"]), \
+         patch('sibyl.notifications.slack_rate_limiter.time.sleep', side_effect=sleep) as mock_sleep:
+        yield mock_sleep
+
+def test_call_returns_result(mock_time):
+    rate_limiter = SlackRateLimiter()
+    func = Mock(return_value={"ok": True})
+
+    assert rate_limiter.call("chat.postMessage", func, channel="C123") == {"ok": True}
+    func.assert_called_once_with(channel="C123")
+    mock_time.assert_not_called()
+
+def test_calls_beyond_burst_are_spaced_at_method_rate(mock_time):
+    # chat.postMessage is one per second, so a 2 second burst lets 2 calls straight through
+    rate_limiter = SlackRateLimiter(burst_seconds=2)
+    func = Mock(return_value={"ok": True})
+
+    for _ in range(4):
+        rate_limiter.call("chat.postMessage", func)
+
+    assert [call.args[0] for call in mock_time.call_args_list] == pytest.approx([1.0, 1.0])
+    stats = rate_limiter.get_stats()
+    assert stats["calls"] == 4
+    assert stats["wait_seconds_total"] == pytest.approx(2.0)
+    assert stats["wait_seconds_max"] == pytest.approx(1.0)
+
+def test_methods_have_separate_buckets(mock_time):
+    rate_limiter = SlackRateLimiter(burst_seconds=1)
+    func = Mock(return_value={"ok": True})
+
+    rate_limiter.call("chat.postMessage", func)
+    rate_limiter.call("files.getUploadURLExternal", func)
+
+    mock_time.assert_not_called()
+
+def test_tier_rates():
+    rate_limiter = SlackRateLimiter()
+
+    assert rate_limiter._get_bucket("chat.postMessage").rate_per_second == pytest.approx(1.0)
+    assert rate_limiter._get_bucket("files.getUploadURLExternal").rate_per_second == pytest.approx(100 / 60)
+    assert rate_limiter._get_bucket("chat.update").rate_per_second == pytest.approx(50 / 60)
+    assert rate_limiter._get_bucket("some.unknownMethod").rate_per_second == pytest.approx(50 / 60)
+
+@patch('sibyl.notifications.slack_rate_limiter.random.uniform', return_value=0.5)
+def test_rate_limited_call_honours_retry_after(mock_uniform, mock_time):
+    rate_limiter = SlackRateLimiter()
+    func = Mock(side_effect=[make_slack_error(headers={"Retry-After": "7"}), {"ok": True}])
+
+    assert rate_limiter.call("chat.postMessage", func) == {"ok": True}
+
+    assert func.call_count == 2
+    # Retry-After plus jitter
+    mock_time.assert_any_call(7.5)
+    stats = rate_limiter.get_stats()
+    assert stats["throttled"] == 1
+    assert stats["retries"] == 1
+    assert stats["failures"] == 0
+
+def test_retry_after_pauses_the_method(mock_time):
+    rate_limiter = SlackRateLimiter()
+    bucket = rate_limiter._get_bucket("chat.postMessage")
+
+    bucket.block(5)
+
+    assert bucket.reserve() == pytest.approx(5.0)
+
+@patch('sibyl.notifications.slack_rate_limiter.random.uniform', side_effect=lambda low, high: high)
+def test_rate_limited_without_retry_after_backs_off_exponentially(mock_uniform, mock_time):
+    rate_limiter = SlackRateLimiter(max_retries=3, backoff_base_seconds=1, backoff_max_seconds=3)
+    func = Mock(side_effect=[make_slack_error(), make_slack_error(), make_slack_error(), {"ok": True}])
+
+    assert rate_limiter.call("files.completeUploadExternal", func) == {"ok": True}
+    assert [call.args[0] for call in mock_time.call_args_list] == [1, 2, 3]
+
+def test_rate_limited_gives_up_after_max_retries(mock_time):
+    rate_limiter = SlackRateLimiter(max_retries=2)
+    func = Mock(side_effect=make_slack_error(headers={"retry-after": "1"}))
+
+    with pytest.raises(SlackApiError):
+        rate_limiter.call("chat.postMessage", func)
+
+    assert func.call_count == 3
+    stats = rate_limiter.get_stats()
+    assert stats["throttled"] == 3
+    assert stats["retries"] == 2
+    assert stats["failures"] == 1
+
+def test_other_slack_errors_are_not_retried(mock_time):
+    rate_limiter = SlackRateLimiter()
+    func = Mock(side_effect=make_slack_error(status_code=200, error="channel_not_found"))
+
+    with pytest.raises(SlackApiError):
+        rate_limiter.call("chat.postMessage", func)
+
+    func.assert_called_once()
+    assert rate_limiter.get_stats()["throttled"] == 0
+
+def test_calls_record_latency_and_errors(mock_time):
+    rate_limiter = SlackRateLimiter()
+    labels = {"method": "chat.update"}
+    error_labels = {"method": "chat.update", "error": "channel_not_found"}
+    count_before = REGISTRY.get_sample_value("sibyl_slack_request_duration_seconds_count", labels) or 0
+    errors_before = REGISTRY.get_sample_value("sibyl_slack_request_errors_total", error_labels) or 0
+
+    rate_limiter.call("chat.update", Mock(return_value={"ok": True}))
+    with pytest.raises(SlackApiError):
+        rate_limiter.call("chat.update", Mock(side_effect=make_slack_error(status_code=200, error="channel_not_found")))
+
+    assert REGISTRY.get_sample_value("sibyl_slack_request_duration_seconds_count", labels) == count_before + 2
+    assert REGISTRY.get_sample_value("sibyl_slack_request_errors_total", error_labels) == errors_before + 1
+
+@patch('sibyl.notifications.slack_rate_limiter.random.uniform', return_value=0.0)
+def test_calls_record_rate_limit_waits_and_throttling(mock_uniform, mock_time):
+    rate_limiter = SlackRateLimiter(burst_seconds=1)
+    labels = {"method": "chat.postMessage"}
+    waits_before = REGISTRY.get_sample_value("sibyl_slack_rate_limit_wait_seconds_count", labels) or 0
+    waited_before = REGISTRY.get_sample_value("sibyl_slack_rate_limit_wait_seconds_sum", labels) or 0
+    throttled_before = REGISTRY.get_sample_value("sibyl_slack_throttled_total", labels) or 0
+
+    rate_limiter.call("chat.postMessage", Mock(side_effect=[make_slack_error(headers={"Retry-After": "3"}), {"ok": True}]))
+
+    # The first attempt goes straight out. The retry sleeps out the Retry-After, then waits for the bucket to refill from empty
+    assert REGISTRY.get_sample_value("sibyl_slack_rate_limit_wait_seconds_count", labels) == waits_before + 2
+    assert REGISTRY.get_sample_value("sibyl_slack_rate_limit_wait_seconds_sum", labels) == pytest.approx(waited_before + 1.0)
+    assert REGISTRY.get_sample_value("sibyl_slack_throttled_total", labels) == throttled_before + 1
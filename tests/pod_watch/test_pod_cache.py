@@ -0,0 +1,69 @@
+from kubernetes import client
+
+from sibyl.models.pods.k8_pod import K8Pod
+from sibyl.models.pods.k8_pod_container_status import K8PodContainerStatus
+from sibyl.pod_watch.pod_cache import PodCache
+
+
+def test_get_set_delete():
+    pod_cache = PodCache()
+    pod = K8Pod(namespace="default", name="test-pod", containers=["app"])
+
+    assert pod_cache.get("default", "test-pod") is None
+    pod_cache.set(pod)
+    assert pod_cache.get("default", "test-pod") == pod
+    pod_cache.delete("default", "test-pod")
+    assert pod_cache.get("default", "test-pod") is None
+    # Deleting a pod that is not cached is a no-op
+    pod_cache.delete("default", "test-pod")
+
+    assert pod_cache.get_stats() == {"hits": 1, "misses": 2, "size": 0}
+
+def test_replace():
+    pod_cache = PodCache()
+    pod_cache.set(K8Pod(namespace="default", name="old-pod", containers=["app"]))
+    assert not pod_cache.has_synced()
+
+    pod_cache.replace([K8Pod(namespace="default", name="new-pod", containers=["app"])])
+
+    assert pod_cache.has_synced()
+    assert pod_cache.get("default", "old-pod") is None
+    assert pod_cache.get("default", "new-pod") is not None
+
+def test_format_pod():
+    pod = client.V1Pod(
+        metadata=client.V1ObjectMeta(name="test-pod", namespace="default"),
+        spec=client.V1PodSpec(containers=[client.V1Container(name="app"), client.V1Container(name="sidecar")]),
+        status=client.V1PodStatus(container_statuses=[
+            client.V1ContainerStatus(
+                name="app", image="app", image_id="", ready=False, restart_count=3,
+                state=client.V1ContainerState(waiting=client.V1ContainerStateWaiting(reason="CrashLoopBackOff")),
+                last_state=client.V1ContainerState(terminated=client.V1ContainerStateTerminated(reason="OOMKilled", exit_code=137))
+            ),
+            client.V1ContainerStatus(
+                name="sidecar", image="sidecar", image_id="", ready=True, restart_count=0,
+                state=client.V1ContainerState(running=client.V1ContainerStateRunning())
+            ),
+        ])
+    )
+
+    k8_pod = PodCache.format_pod(pod)
+
+    assert k8_pod.namespace == "default"
+    assert k8_pod.name == "test-pod"
+    assert k8_pod.containers == ["app", "sidecar"]
+    assert k8_pod.container_statuses == [
+        K8PodContainerStatus(name="app", restart_count=3, waiting_reason="CrashLoopBackOff", terminated_reason=None, last_terminated_reason="OOMKilled", last_terminated_exit_code=137),
+        K8PodContainerStatus(name="sidecar", restart_count=0, waiting_reason=None, terminated_reason=None, last_terminated_reason=None, last_terminated_exit_code=None),
+    ]
+
+def test_format_pod_without_status():
+    pod = client.V1Pod(
+        metadata=client.V1ObjectMeta(name="test-pod", namespace="default"),
+        spec=client.V1PodSpec(containers=[client.V1Container(name="app")])
+    )
+
+    k8_pod = PodCache.format_pod(pod)
+
+    assert k8_pod.containers == ["app"]
+    assert k8_pod.container_statuses == []
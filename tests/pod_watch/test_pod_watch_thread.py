@@ -0,0 +1,131 @@
+
+import pytest
+from unittest.mock import Mock, patch
+
+from kubernetes import client
+
+from sibyl.pod_watch.pod_cache import PodCache
+from sibyl.pod_watch.pod_watch_thread import PodWatchThread
+
+
+def make_pod(name, resource_version="1"):
+    return client.V1Pod(
+        metadata=client.V1ObjectMeta(name=name, namespace="default", resource_version=resource_version),
+        spec=client.V1PodSpec(containers=[client.V1Container(name="app")])
+    )
+
+def make_pod_list(pods, resource_version, continue_token=None):
+    pod_list = Mock()
+    pod_list.items = pods
+    pod_list.metadata.resource_version = resource_version
+    pod_list.metadata._continue = continue_token
+    return pod_list
+
+@pytest.fixture
+def pod_cache():
+    return PodCache()
+
+@pytest.fixture
+@patch('sibyl.k8_client_factory.config.load_incluster_config')
+@patch('sibyl.k8_client_factory.client.CoreV1Api')
+def pod_watch_thread(mock_core_v1_api, mock_load_config, pod_cache):
+    return PodWatchThread(pod_cache=pod_cache)
+
+@patch('sibyl.k8_client_factory.config.load_incluster_config', side_effect=Exception("Test error"))
+def test_init_fails(mock_load_config, pod_cache):
+    with pytest.raises(Exception, match="Test error"):
+        PodWatchThread(pod_cache=pod_cache)
+
+@patch('sibyl.pod_watch.pod_watch_thread.watch.Watch')
+def test_run_lists_then_applies_watch_deltas(mock_watch, pod_watch_thread, pod_cache):
+    pod_watch_thread.core_v1_client.list_pod_for_all_namespaces.side_effect = [
+        make_pod_list([make_pod("pod-a")], "100", continue_token="next-page"),
+        make_pod_list([make_pod("pod-b")], "100"),
+    ]
+
+    def stream(**kwargs):
+        assert kwargs['resource_version'] == "100"
+        yield {'type': 'ADDED', 'object': make_pod("pod-c", "101")}
+        yield {'type': 'DELETED', 'object': make_pod("pod-a", "102")}
+        yield {'type': 'BOOKMARK', 'object': {}, 'raw_object': {'metadata': {'resourceVersion': "103"}}}
+        pod_watch_thread.stop()
+    mock_watch.return_value.stream.side_effect = stream
+
+    pod_watch_thread.run()
+
+    assert pod_cache.has_synced()
+    assert pod_cache.get("default", "pod-a") is None
+    assert pod_cache.get("default", "pod-b").containers == ["app"]
+    assert pod_cache.get("default", "pod-c") is not None
+    assert pod_watch_thread.resource_version == "103"
+
+@patch('sibyl.pod_watch.pod_watch_thread.watch.Watch')
+def test_run_watches_configured_namespace(mock_watch, pod_watch_thread, pod_cache):
+    pod_watch_thread.namespace = "team-a"
+    pod_watch_thread.core_v1_client.list_namespaced_pod.return_value = make_pod_list([make_pod("pod-a")], "100")
+
+    def stream(**kwargs):
+        assert kwargs['func'] == pod_watch_thread.core_v1_client.list_namespaced_pod
+        assert kwargs['namespace'] == "team-a"
+        pod_watch_thread.stop()
+        return iter([])
+    mock_watch.return_value.stream.side_effect = stream
+
+    pod_watch_thread.run()
+
+    pod_watch_thread.core_v1_client.list_namespaced_pod.assert_called_once_with(namespace="team-a", limit=500)
+    pod_watch_thread.core_v1_client.list_pod_for_all_namespaces.assert_not_called()
+    assert pod_cache.get("default", "pod-a") is not None
+
+@patch('sibyl.pod_watch.pod_watch_thread.watch.Watch')
+def test_run_records_heartbeats(mock_watch, pod_watch_thread):
+    pod_watch_thread.health_status = Mock()
+    pod_watch_thread.core_v1_client.list_pod_for_all_namespaces.return_value = make_pod_list([], "100")
+
+    def stream(**kwargs):
+        yield {'type': 'BOOKMARK', 'object': {}, 'raw_object': {'metadata': {'resourceVersion': "101"}}}
+        pod_watch_thread.stop()
+    mock_watch.return_value.stream.side_effect = stream
+
+    pod_watch_thread.run()
+
+    # Started, listed, bookmark and the stream ending
+    assert pod_watch_thread.health_status.heartbeat.call_count == 4
+    pod_watch_thread.health_status.heartbeat.assert_called_with(PodWatchThread.HEARTBEAT_NAME)
+
+@patch('sibyl.pod_watch.pod_watch_thread.watch.Watch')
+def test_run_relists_after_gone(mock_watch, pod_watch_thread, pod_cache):
+    pod_watch_thread.resource_version = "50"
+    pod_watch_thread.core_v1_client.list_pod_for_all_namespaces.return_value = make_pod_list([make_pod("pod-a")], "100")
+
+    calls = []
+    def stream(**kwargs):
+        calls.append(kwargs['resource_version'])
+        if len(calls) == 1:
+            raise client.ApiException(status=410)
+        pod_watch_thread.stop()
+        return iter([])
+    mock_watch.return_value.stream.side_effect = stream
+
+    pod_watch_thread.run()
+
+    assert calls == ["50", "100"]
+    pod_watch_thread.core_v1_client.list_pod_for_all_namespaces.assert_called_once()
+    assert pod_cache.get("default", "pod-a") is not None
+
+@patch('time.sleep')
+@patch('sibyl.pod_watch.pod_watch_thread.watch.Watch')
+def test_run_handles_api_exception(mock_watch, mock_sleep, pod_watch_thread):
+    pod_watch_thread.resource_version = "50"
+    side_effects = [client.ApiException(status=500)]
+
+    def stream(**kwargs):
+        if side_effects:
+            raise side_effects.pop(0)
+        pod_watch_thread.stop()
+        return iter([])
+    mock_watch.return_value.stream.side_effect = stream
+
+    pod_watch_thread.run()
+
+    mock_sleep.assert_called_once_with(10)
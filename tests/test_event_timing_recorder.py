@@ -0,0 +1,68 @@
+import logging
+from datetime import datetime, timezone
+
+import pytest
+from prometheus_client import REGISTRY
+
+from sibyl.event_timing_recorder import EventTimingRecorder
+from sibyl.models.events.k8_event_timings import K8EventTimings
+
+EVENT_TIME = datetime(2025, 11, 30, 12, 0, 0, tzinfo=timezone.utc).timestamp()
+
+def test_get_stage_durations(make_event):
+    event = make_event(marks={
+        K8EventTimings.RECEIVED: EVENT_TIME + 2.0,
+        K8EventTimings.QUEUED: EVENT_TIME + 2.25,
+        K8EventTimings.DEQUEUED: EVENT_TIME + 7.0,
+        K8EventTimings.LOGS_FETCHED: EVENT_TIME + 7.5,
+        K8EventTimings.POSTED: EVENT_TIME + 8.0,
+        K8EventTimings.UPLOADED: EVENT_TIME + 9.0,
+    })
+
+    assert EventTimingRecorder().get_stage_durations(event) == pytest.approx({
+        "received": 2.0,
+        "queued": 0.25,
+        "dequeued": 4.75,
+        "logs_fetched": 0.5,
+        "posted": 0.5,
+        "uploaded": 1.0,
+    })
+
+def test_get_stage_durations_folds_skipped_stages(make_event):
+    # No logs were fetched, so posting is timed from when the event was dequeued
+    event = make_event(marks={
+        K8EventTimings.RECEIVED: EVENT_TIME + 1.0,
+        K8EventTimings.DEQUEUED: EVENT_TIME + 3.0,
+        K8EventTimings.POSTED: EVENT_TIME + 4.0,
+    })
+
+    assert EventTimingRecorder().get_stage_durations(event) == pytest.approx({"received": 1.0, "dequeued": 2.0, "posted": 1.0})
+
+def test_get_stage_durations_without_event_timestamp(make_event):
+    event = make_event(timestamp="N/A", marks={
+        K8EventTimings.RECEIVED: EVENT_TIME,
+        K8EventTimings.POSTED: EVENT_TIME + 1.0,
+    })
+
+    assert EventTimingRecorder().get_stage_durations(event) == pytest.approx({"posted": 1.0})
+
+def test_get_stage_durations_never_negative(make_event):
+    event = make_event(marks={K8EventTimings.RECEIVED: EVENT_TIME - 5.0})
+
+    assert EventTimingRecorder().get_stage_durations(event) == {"received": 0.0}
+
+def test_record_observes_histogram_and_logs(caplog, make_event):
+    event = make_event(marks={
+        K8EventTimings.RECEIVED: EVENT_TIME + 2.0,
+        K8EventTimings.POSTED: EVENT_TIME + 3.0,
+    })
+    count_before = REGISTRY.get_sample_value("sibyl_event_stage_duration_seconds_count", {"stage": "posted"}) or 0
+
+    with caplog.at_level(logging.INFO):
+        EventTimingRecorder().record(event)
+
+    assert REGISTRY.get_sample_value("sibyl_event_stage_duration_seconds_count", {"stage": "posted"}) == count_before + 1
+    record = caplog.records[-1]
+    assert record.stage_seconds == {"received": 2.0, "posted": 1.0}
+    assert record.total_seconds == 3.0
+    assert record.involved_object == "Pod/default/test-pod"
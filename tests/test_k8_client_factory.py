@@ -0,0 +1,67 @@
+import socket
+import pytest
+from unittest.mock import patch
+
+from kubernetes import client
+
+from sibyl.k8_client_factory import K8ClientFactory, _PooledApiClient
+
+
+@pytest.fixture
+def mock_load_incluster_config():
+    with patch('sibyl.k8_client_factory.config.load_incluster_config') as mock_load:
+        yield mock_load
+
+def test_clients_share_one_api_client(mock_load_incluster_config):
+    factory = K8ClientFactory()
+
+    first = factory.get_core_v1_client()
+    second = factory.get_core_v1_client()
+
+    assert first.api_client is second.api_client
+    mock_load_incluster_config.assert_called_once()
+
+def test_api_client_pool_settings(mock_load_incluster_config):
+    factory = K8ClientFactory(pool_size=16, connect_timeout=2.0, read_timeout=10.0)
+
+    api_client = factory.get_api_client()
+
+    assert isinstance(api_client, _PooledApiClient)
+    assert api_client.configuration.connection_pool_maxsize == 16
+    assert api_client.rest_client.pool_manager.connection_pool_kw["maxsize"] == 16
+    assert api_client.connect_timeout == 2.0
+    assert api_client.read_timeout == 10.0
+
+def test_api_client_tcp_keepalive(mock_load_incluster_config):
+    api_client = K8ClientFactory(tcp_keepalive=True).get_api_client()
+    assert (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1) in api_client.rest_client.pool_manager.connection_pool_kw["socket_options"]
+
+    api_client = K8ClientFactory(tcp_keepalive=False).get_api_client()
+    assert "socket_options" not in api_client.rest_client.pool_manager.connection_pool_kw
+
+def test_load_incluster_config_error_is_raised(mock_load_incluster_config):
+    mock_load_incluster_config.side_effect = Exception("Test error")
+
+    with pytest.raises(Exception, match="Test error"):
+        K8ClientFactory().get_core_v1_client()
+
+@pytest.mark.parametrize("query_params, expected", [
+    ([("limit", 500)], (5.0, 30.0)),
+    (None, (5.0, 30.0)),
+    ([("watch", True), ("timeoutSeconds", 300)], (5.0, 330.0)),
+])
+def test_default_request_timeout(mock_load_incluster_config, query_params, expected):
+    api_client = K8ClientFactory(connect_timeout=5.0, read_timeout=30.0).get_api_client()
+
+    with patch.object(client.ApiClient, 'call_api') as mock_call_api:
+        api_client.call_api('/api/v1/events', 'GET', {}, query_params)
+
+    assert mock_call_api.call_args.kwargs["_request_timeout"] == expected
+
+def test_explicit_request_timeout_is_kept(mock_load_incluster_config):
+    api_client = K8ClientFactory().get_api_client()
+
+    with patch.object(client.ApiClient, 'call_api') as mock_call_api:
+        api_client.call_api('/api/v1/events', 'GET', {}, [], _request_timeout=1)
+
+    assert mock_call_api.call_args.kwargs["_request_timeout"] == 1
@@ -0,0 +1,77 @@
+import pytest
+
+from sibyl.log_cache import LogCache
+
+
+pytestmark = pytest.mark.parametrize("mock_monotonic", ["sibyl.log_cache.time.monotonic"], indirect=True)
+
+def make_key(container="app", restart_count=1, previous=True):
+    return ("default", "test-pod", container, restart_count, previous)
+
+def test_get_miss_then_hit(mock_monotonic):
+    cache = LogCache()
+
+    assert cache.get(make_key()) is None
+    cache.set(make_key(), "previous logs")
+    assert cache.get(make_key()) == "previous logs"
+    assert cache.get_stats() == {"hits": 1, "misses": 1, "evictions": 0, "size": 1, "bytes": 13}
+
+def test_restart_count_is_part_of_key(mock_monotonic):
+    cache = LogCache()
+    cache.set(make_key(restart_count=1), "first crash")
+
+    assert cache.get(make_key(restart_count=2)) is None
+    assert cache.get(make_key(restart_count=1, previous=False)) is None
+
+def test_previous_logs_do_not_expire(mock_monotonic):
+    cache = LogCache(current_ttl_seconds=30)
+    cache.set(make_key(previous=True), "previous logs")
+
+    mock_monotonic.return_value = 100000.0
+    assert cache.get(make_key(previous=True)) == "previous logs"
+
+def test_current_logs_expire(mock_monotonic):
+    cache = LogCache(current_ttl_seconds=30)
+    cache.set(make_key(previous=False), "current logs")
+
+    mock_monotonic.return_value = 1029.0
+    assert cache.get(make_key(previous=False)) == "current logs"
+    mock_monotonic.return_value = 1030.0
+    assert cache.get(make_key(previous=False)) is None
+    assert cache.get_stats()["bytes"] == 0
+
+def test_evicts_least_recently_used_by_bytes(mock_monotonic):
+    cache = LogCache(max_bytes=20)
+    cache.set(make_key(container="a"), "a" * 8)
+    cache.set(make_key(container="b"), "b" * 8)
+    # Touch a so b is the least recently used
+    cache.get(make_key(container="a"))
+    cache.set(make_key(container="c"), "c" * 8)
+
+    assert cache.get(make_key(container="b")) is None
+    assert cache.get(make_key(container="a")) == "a" * 8
+    assert cache.get(make_key(container="c")) == "c" * 8
+    assert cache.get_stats()["evictions"] == 1
+    assert cache.get_stats()["bytes"] == 16
+
+def test_size_counts_encoded_bytes(mock_monotonic):
+    cache = LogCache()
+    cache.set(make_key(), "é")
+    assert cache.get_stats()["bytes"] == 2
+
+def test_logs_larger_than_cache_are_not_cached(mock_monotonic):
+    cache = LogCache(max_bytes=4)
+    cache.set(make_key(container="a"), "aaa")
+    cache.set(make_key(container="b"), "b" * 10)
+
+    assert cache.get(make_key(container="b")) is None
+    assert cache.get(make_key(container="a")) == "aaa"
+
+def test_set_replaces_existing_entry(mock_monotonic):
+    cache = LogCache()
+    cache.set(make_key(), "old")
+    cache.set(make_key(), "newer")
+
+    assert cache.get(make_key()) == "newer"
+    assert cache.get_stats()["bytes"] == 5
+    assert cache.get_stats()["size"] == 1
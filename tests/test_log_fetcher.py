@@ -1,10 +1,16 @@
 
 import pytest
+from threading import Barrier
 from unittest.mock import Mock, patch, call
-from kubernetes import client, config
+from kubernetes import client
+from prometheus_client import REGISTRY
+from sibyl.log_cache import LogCache
 from sibyl.log_fetcher import LogFetcher
 from sibyl.models.events.k8_event import K8Event
 from sibyl.models.events.k8_event_involved_object import K8EventInvolvedObject
+from sibyl.models.pods.k8_pod import K8Pod
+from sibyl.models.pods.k8_pod_container_status import K8PodContainerStatus
+from sibyl.pod_watch.pod_cache import PodCache
 
 class MockV1Container:
     def __init__(self, name):
@@ -14,9 +20,39 @@ class MockV1PodSpec:
     def __init__(self, containers):
         self.containers = containers
 
+class MockV1ObjectMeta:
+    def __init__(self, name, namespace):
+        self.name = name
+        self.namespace = namespace
+
+class MockV1PodStatus:
+    def __init__(self, container_statuses=None):
+        self.container_statuses = container_statuses
+
+class MockLogResponse:
+    """Stands in for the urllib3 response returned with _preload_content=False."""
+    def __init__(self, text, chunk_size=4):
+        self.data = text.encode("utf-8")
+        self.chunk_size = chunk_size
+        self.chunks_read = 0
+        self.closed = False
+
+    def stream(self, amt=None, decode_content=False):
+        for i in range(0, len(self.data), self.chunk_size):
+            self.chunks_read += 1
+            yield self.data[i:i + self.chunk_size]
+
+    def close(self):
+        self.closed = True
+
+    def release_conn(self):
+        pass
+
 class MockV1Pod:
-    def __init__(self, containers):
+    def __init__(self, containers, container_statuses=None):
+        self.metadata = MockV1ObjectMeta(name="test-pod", namespace="default")
         self.spec = MockV1PodSpec(containers)
+        self.status = MockV1PodStatus(container_statuses)
 
 
 @pytest.fixture
@@ -33,19 +69,20 @@ def mock_k8_event():
 
 @pytest.fixture
 def log_fetcher_fixture():
-    with patch('sibyl.log_fetcher.config.load_incluster_config'), \
-         patch('sibyl.log_fetcher.client.CoreV1Api') as mock_api:
+    with patch('sibyl.k8_client_factory.config.load_incluster_config'), \
+         patch('sibyl.k8_client_factory.client.CoreV1Api') as mock_api:
         fetcher = LogFetcher()
         fetcher.core_v1_client = mock_api.return_value
         yield fetcher
 
 
 def test_fetch_current_pod_logs_from_event_success(log_fetcher_fixture, mock_k8_event):
-    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.return_value = "current logs"
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.return_value = MockLogResponse("current logs")
     logs = log_fetcher_fixture.fetch_current_pod_logs_from_event(mock_k8_event, "test-container")
     assert logs == "current logs"
     log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.assert_called_with(
-        name="test-pod", namespace="default", container="test-container", tail_lines=100, previous=False
+        name="test-pod", namespace="default", container="test-container", tail_lines=100, previous=False,
+        since_seconds=None, _preload_content=False
     )
 
 def test_fetch_current_pod_logs_404(log_fetcher_fixture, mock_k8_event):
@@ -54,11 +91,12 @@ def test_fetch_current_pod_logs_404(log_fetcher_fixture, mock_k8_event):
     assert logs is None
 
 def test_fetch_previous_pod_logs_from_event_success(log_fetcher_fixture, mock_k8_event):
-    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.return_value = "previous logs"
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.return_value = MockLogResponse("previous logs")
     logs = log_fetcher_fixture.fetch_previous_pod_logs_from_event(mock_k8_event, "test-container")
     assert logs == "previous logs"
     log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.assert_called_with(
-        name="test-pod", namespace="default", container="test-container", tail_lines=100, previous=True
+        name="test-pod", namespace="default", container="test-container", tail_lines=100, previous=True,
+        since_seconds=None, _preload_content=False
     )
 
 def test_fetch_previous_pod_logs_404(log_fetcher_fixture, mock_k8_event):
@@ -72,7 +110,7 @@ def test_fetch_pod_logs_from_event_previous(reason, log_fetcher_fixture, mock_k8
     
     mock_pod = MockV1Pod(containers=[MockV1Container(name="test-container")])
     log_fetcher_fixture.core_v1_client.read_namespaced_pod_status.return_value = mock_pod
-    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.return_value = "previous logs"
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.return_value = MockLogResponse("previous logs")
     
     logs = log_fetcher_fixture.fetch_pod_logs_from_event(mock_k8_event)
     
@@ -80,7 +118,8 @@ def test_fetch_pod_logs_from_event_previous(reason, log_fetcher_fixture, mock_k8
         name="test-pod", namespace="default"
     )
     log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.assert_called_once_with(
-        name="test-pod", namespace="default", container="test-container", tail_lines=100, previous=True
+        name="test-pod", namespace="default", container="test-container", tail_lines=100, previous=True,
+        since_seconds=None, _preload_content=False
     )
     assert logs == [("test-container", "previous logs")]
 
@@ -91,7 +130,7 @@ def test_fetch_pod_logs_from_event_unhealthy_liveness(log_fetcher_fixture, mock_
     
     mock_pod = MockV1Pod(containers=[MockV1Container(name="test-container")])
     log_fetcher_fixture.core_v1_client.read_namespaced_pod_status.return_value = mock_pod
-    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.return_value = "previous logs"
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.return_value = MockLogResponse("previous logs")
     
     logs = log_fetcher_fixture.fetch_pod_logs_from_event(mock_k8_event)
     
@@ -99,7 +138,8 @@ def test_fetch_pod_logs_from_event_unhealthy_liveness(log_fetcher_fixture, mock_
         name="test-pod", namespace="default"
     )
     log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.assert_called_once_with(
-        name="test-pod", namespace="default", container="test-container", tail_lines=100, previous=True
+        name="test-pod", namespace="default", container="test-container", tail_lines=100, previous=True,
+        since_seconds=None, _preload_content=False
     )
     assert logs == [("test-container", "previous logs")]
 
@@ -111,15 +151,15 @@ def test_fetch_pod_logs_from_event_fallback(log_fetcher_fixture, mock_k8_event):
     
     log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.side_effect = [
         client.ApiException(status=404), # for previous logs
-        "current logs" # for current logs
+        MockLogResponse("current logs") # for current logs
     ]
     
     logs = log_fetcher_fixture.fetch_pod_logs_from_event(mock_k8_event)
     assert logs == [("test-container", "current logs")]
     assert log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.call_count == 2
     log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.assert_has_calls([
-        call(name='test-pod', namespace='default', container='test-container', tail_lines=100, previous=True),
-        call(name='test-pod', namespace='default', container='test-container', tail_lines=100, previous=False)
+        call(name='test-pod', namespace='default', container='test-container', tail_lines=100, previous=True, since_seconds=None, _preload_content=False),
+        call(name='test-pod', namespace='default', container='test-container', tail_lines=100, previous=False, since_seconds=None, _preload_content=False)
     ])
     
 def test_fetch_pod_logs_from_event_current(log_fetcher_fixture, mock_k8_event):
@@ -127,7 +167,7 @@ def test_fetch_pod_logs_from_event_current(log_fetcher_fixture, mock_k8_event):
     
     mock_pod = MockV1Pod(containers=[MockV1Container(name="test-container")])
     log_fetcher_fixture.core_v1_client.read_namespaced_pod_status.return_value = mock_pod
-    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.return_value = "current logs"
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.return_value = MockLogResponse("current logs")
     
     logs = log_fetcher_fixture.fetch_pod_logs_from_event(mock_k8_event)
     
@@ -135,7 +175,8 @@ def test_fetch_pod_logs_from_event_current(log_fetcher_fixture, mock_k8_event):
         name="test-pod", namespace="default"
     )
     log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.assert_called_once_with(
-        name="test-pod", namespace="default", container="test-container", tail_lines=100, previous=False
+        name="test-pod", namespace="default", container="test-container", tail_lines=100, previous=False,
+        since_seconds=None, _preload_content=False
     )
     assert logs == [("test-container", "current logs")]
 
@@ -149,10 +190,8 @@ def test_fetch_pod_logs_from_event_multiple_containers(log_fetcher_fixture, mock
     mock_pod = MockV1Pod(containers=[MockV1Container(name=container1_name), MockV1Container(name=container2_name)])
     log_fetcher_fixture.core_v1_client.read_namespaced_pod_status.return_value = mock_pod
     
-    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.side_effect = [
-        f"logs for {container1_name}",
-        f"logs for {container2_name}"
-    ]
+    # Containers are fetched concurrently, so answer by container rather than by call order
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.side_effect = lambda **kwargs: MockLogResponse(f"logs for {kwargs['container']}")
     
     logs = log_fetcher_fixture.fetch_pod_logs_from_event(mock_k8_event)
     
@@ -162,11 +201,238 @@ def test_fetch_pod_logs_from_event_multiple_containers(log_fetcher_fixture, mock
     
     assert log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.call_count == 2
     log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.assert_has_calls([
-        call(name='test-pod', namespace='default', container=container1_name, tail_lines=100, previous=False),
-        call(name='test-pod', namespace='default', container=container2_name, tail_lines=100, previous=False)
-    ])
+        call(name='test-pod', namespace='default', container=container1_name, tail_lines=100, previous=False, since_seconds=None, _preload_content=False),
+        call(name='test-pod', namespace='default', container=container2_name, tail_lines=100, previous=False, since_seconds=None, _preload_content=False)
+    ], any_order=True)
     
     assert logs == [
         (container1_name, f"logs for {container1_name}"),
         (container2_name, f"logs for {container2_name}")
     ]
+
+
+def test_fetch_pod_logs_from_event_fetches_containers_concurrently(log_fetcher_fixture, mock_k8_event):
+    mock_k8_event.reason = "Started"
+
+    container_names = [f"container-{i}" for i in range(4)]
+    mock_pod = MockV1Pod(containers=[MockV1Container(name=name) for name in container_names])
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_status.return_value = mock_pod
+
+    # Every read waits for all of the others to start, which only completes if they run at the same time
+    barrier = Barrier(len(container_names), timeout=5)
+    def read_log(**kwargs):
+        barrier.wait()
+        return MockLogResponse(f"logs for {kwargs['container']}")
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.side_effect = read_log
+
+    logs = log_fetcher_fixture.fetch_pod_logs_from_event(mock_k8_event)
+
+    assert logs == [(name, f"logs for {name}") for name in container_names]
+
+def test_fetch_pod_logs_from_event_api_error(log_fetcher_fixture, mock_k8_event):
+    mock_k8_event.reason = "Started"
+
+    mock_pod = MockV1Pod(containers=[MockV1Container(name="test-container")])
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_status.return_value = mock_pod
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.side_effect = client.ApiException(status=500)
+
+    with pytest.raises(client.ApiException):
+        log_fetcher_fixture.fetch_pod_logs_from_event(mock_k8_event)
+
+def test_fetch_pod_logs_from_event_uses_pod_cache(log_fetcher_fixture, mock_k8_event):
+    mock_k8_event.reason = "Started"
+    pod_cache = PodCache()
+    pod_cache.replace([K8Pod(namespace="default", name="test-pod", containers=["cached-container"])])
+    log_fetcher_fixture.pod_cache = pod_cache
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.return_value = MockLogResponse("current logs")
+
+    logs = log_fetcher_fixture.fetch_pod_logs_from_event(mock_k8_event)
+
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_status.assert_not_called()
+    assert logs == [("cached-container", "current logs")]
+
+def test_fetch_pod_logs_from_event_reads_pod_until_pod_cache_synced(log_fetcher_fixture, mock_k8_event):
+    mock_k8_event.reason = "Started"
+    log_fetcher_fixture.pod_cache = PodCache()
+    log_fetcher_fixture.pod_cache.set(K8Pod(namespace="default", name="test-pod", containers=["cached-container"]))
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_status.return_value = MockV1Pod(containers=[MockV1Container(name="test-container")])
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.return_value = MockLogResponse("current logs")
+
+    logs = log_fetcher_fixture.fetch_pod_logs_from_event(mock_k8_event)
+
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_status.assert_called_once()
+    assert logs == [("test-container", "current logs")]
+    # The cache is not consulted, so its hit and miss counters are untouched
+    assert log_fetcher_fixture.pod_cache.get_stats()["misses"] == 0
+
+def test_fetch_pod_logs_from_event_pod_cache_miss_reads_pod(log_fetcher_fixture, mock_k8_event):
+    mock_k8_event.reason = "Started"
+    log_fetcher_fixture.pod_cache = PodCache()
+    log_fetcher_fixture.pod_cache.replace([])
+    mock_pod = MockV1Pod(containers=[MockV1Container(name="test-container")])
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_status.return_value = mock_pod
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.return_value = MockLogResponse("current logs")
+
+    logs = log_fetcher_fixture.fetch_pod_logs_from_event(mock_k8_event)
+
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_status.assert_called_once_with(
+        name="test-pod", namespace="default"
+    )
+    assert logs == [("test-container", "current logs")]
+
+def make_container_status(name, restart_count=0, waiting_reason=None, terminated_reason=None, last_terminated_reason=None):
+    return K8PodContainerStatus(
+        name=name, restart_count=restart_count, waiting_reason=waiting_reason, terminated_reason=terminated_reason,
+        last_terminated_reason=last_terminated_reason, last_terminated_exit_code=None
+    )
+
+@pytest.fixture
+def mesh_pod():
+    return K8Pod(
+        namespace="default",
+        name="test-pod",
+        containers=["istio-proxy", "app", "log-shipper"],
+        container_statuses=[
+            make_container_status("istio-proxy"),
+            make_container_status("app", restart_count=3, waiting_reason="CrashLoopBackOff", last_terminated_reason="Error"),
+            make_container_status("log-shipper"),
+        ]
+    )
+
+def test_fetch_pod_logs_from_event_only_failing_containers(log_fetcher_fixture, mock_k8_event, mesh_pod):
+    mock_k8_event.reason = "Started"
+    log_fetcher_fixture.pod_cache = PodCache()
+    log_fetcher_fixture.pod_cache.replace([mesh_pod])
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.return_value = MockLogResponse("current logs")
+
+    logs = log_fetcher_fixture.fetch_pod_logs_from_event(mock_k8_event)
+
+    assert logs == [("app", "current logs")]
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.assert_called_once_with(
+        name="test-pod", namespace="default", container="app", tail_lines=100, previous=False,
+        since_seconds=None, _preload_content=False
+    )
+
+def test_fetch_pod_logs_from_event_all_containers_option(log_fetcher_fixture, mock_k8_event, mesh_pod):
+    mock_k8_event.reason = "Started"
+    log_fetcher_fixture.all_containers = True
+    log_fetcher_fixture.pod_cache = PodCache()
+    log_fetcher_fixture.pod_cache.replace([mesh_pod])
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.return_value = MockLogResponse("current logs")
+
+    logs = log_fetcher_fixture.fetch_pod_logs_from_event(mock_k8_event)
+
+    assert [container_name for container_name, _ in logs] == ["istio-proxy", "app", "log-shipper"]
+
+@pytest.mark.parametrize("field_path, expected", [
+    ("spec.containers{log-shipper}", ["log-shipper"]),
+    ("spec.initContainers{init-db}", ["init-db"]),
+    ("spec.nodeName", ["app"]),
+    (None, ["app"]),
+])
+def test_get_failing_containers_field_path(log_fetcher_fixture, mock_k8_event, mesh_pod, field_path, expected):
+    mock_k8_event.involved_object.field_path = field_path
+    assert log_fetcher_fixture._get_failing_containers(mock_k8_event, mesh_pod) == expected
+
+def test_get_failing_containers_falls_back_to_all(log_fetcher_fixture, mock_k8_event):
+    pod = K8Pod(
+        namespace="default",
+        name="test-pod",
+        containers=["app", "sidecar"],
+        container_statuses=[make_container_status("app", terminated_reason="Completed"), make_container_status("sidecar")]
+    )
+    assert log_fetcher_fixture._get_failing_containers(mock_k8_event, pod) == ["app", "sidecar"]
+
+def test_read_pod_log_keeps_last_bytes(log_fetcher_fixture):
+    log_fetcher_fixture.max_log_bytes = 10
+    response = MockLogResponse("".join(f"{i:04d}\n" for i in range(100)))
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.return_value = response
+
+    logs = log_fetcher_fixture._read_pod_log("test-pod", "default", "test-container", 100, previous=False)
+
+    # The end of the log is kept, that is where the crash is
+    assert logs == "0098\n0099\n"
+    assert response.closed
+
+def test_read_pod_log_passes_limits_to_api(log_fetcher_fixture):
+    log_fetcher_fixture.max_log_bytes = 1024
+    log_fetcher_fixture.since_seconds = 600
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.return_value = MockLogResponse("logs")
+
+    assert log_fetcher_fixture._read_pod_log("test-pod", "default", "test-container", 50, previous=True) == "logs"
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.assert_called_once_with(
+        name="test-pod", namespace="default", container="test-container", tail_lines=50, previous=True,
+        since_seconds=600, _preload_content=False
+    )
+
+def test_read_pod_log_split_multibyte_character(log_fetcher_fixture):
+    log_fetcher_fixture.max_log_bytes = 2
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.return_value = MockLogResponse("a\u00e9b")
+
+    assert log_fetcher_fixture._read_pod_log("test-pod", "default", "test-container", 100, previous=False) == "\ufffdb"
+
+def test_read_pod_log_records_latency(log_fetcher_fixture):
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.return_value = MockLogResponse("logs")
+    count_before = REGISTRY.get_sample_value("sibyl_log_fetch_duration_seconds_count", {"previous": "true"}) or 0
+
+    log_fetcher_fixture._read_pod_log("test-pod", "default", "test-container", 100, previous=True)
+
+    assert REGISTRY.get_sample_value("sibyl_log_fetch_duration_seconds_count", {"previous": "true"}) == count_before + 1
+
+def test_fetch_pod_logs_from_event_reuses_cached_logs(log_fetcher_fixture, mock_k8_event, mesh_pod):
+    mock_k8_event.reason = "BackOff"
+    log_fetcher_fixture.pod_cache = PodCache()
+    log_fetcher_fixture.pod_cache.replace([mesh_pod])
+    log_fetcher_fixture.log_cache = LogCache()
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.side_effect = lambda **kwargs: MockLogResponse("previous logs")
+
+    assert log_fetcher_fixture.fetch_pod_logs_from_event(mock_k8_event) == [("app", "previous logs")]
+    assert log_fetcher_fixture.fetch_pod_logs_from_event(mock_k8_event) == [("app", "previous logs")]
+
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.assert_called_once()
+    assert log_fetcher_fixture.log_cache.get(("default", "test-pod", "app", 3, True)) == "previous logs"
+
+def test_fetch_pod_logs_from_event_refetches_after_restart(log_fetcher_fixture, mock_k8_event, mesh_pod):
+    mock_k8_event.reason = "BackOff"
+    log_fetcher_fixture.pod_cache = PodCache()
+    log_fetcher_fixture.pod_cache.replace([mesh_pod])
+    log_fetcher_fixture.log_cache = LogCache()
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.side_effect = lambda **kwargs: MockLogResponse("previous logs")
+
+    log_fetcher_fixture.fetch_pod_logs_from_event(mock_k8_event)
+    mesh_pod.container_statuses[1].restart_count = 4
+    log_fetcher_fixture.fetch_pod_logs_from_event(mock_k8_event)
+
+    assert log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.call_count == 2
+
+def test_fetch_pod_logs_from_event_without_restart_count_skips_cache(log_fetcher_fixture, mock_k8_event):
+    mock_k8_event.reason = "Started"
+    mock_pod = MockV1Pod(containers=[MockV1Container(name="test-container")])
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_status.return_value = mock_pod
+    log_fetcher_fixture.log_cache = LogCache()
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.side_effect = lambda **kwargs: MockLogResponse("current logs")
+
+    log_fetcher_fixture.fetch_pod_logs_from_event(mock_k8_event)
+    log_fetcher_fixture.fetch_pod_logs_from_event(mock_k8_event)
+
+    assert log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.call_count == 2
+    assert log_fetcher_fixture.log_cache.get_stats()["size"] == 0
+
+def test_get_pod_and_restart_count(log_fetcher_fixture, mock_k8_event, mesh_pod):
+    log_fetcher_fixture.pod_cache = PodCache()
+    log_fetcher_fixture.pod_cache.replace([mesh_pod])
+
+    assert log_fetcher_fixture.get_pod(mock_k8_event) is mesh_pod
+    assert log_fetcher_fixture.get_restart_count(mesh_pod) == 3
+
+def test_get_pod_not_found(log_fetcher_fixture, mock_k8_event):
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_status.side_effect = client.ApiException(status=404)
+
+    assert log_fetcher_fixture.get_pod(mock_k8_event) is None
+
+def test_fetch_pod_logs_uses_given_pod(log_fetcher_fixture, mock_k8_event, mesh_pod):
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_log.side_effect = lambda **kwargs: MockLogResponse("logs")
+
+    log_fetcher_fixture.fetch_pod_logs_from_event(mock_k8_event, pod=mesh_pod)
+
+    log_fetcher_fixture.core_v1_client.read_namespaced_pod_status.assert_not_called()
@@ -1,7 +1,7 @@
 
 import pytest
-from unittest.mock import Mock, patch, MagicMock
-from queue import Queue, Empty
+from unittest.mock import patch, MagicMock
+from queue import Empty
 import signal
 import os
 
@@ -13,6 +13,7 @@ os.environ["SLACK_CHANNEL"] = "dummy"
 with patch('sibyl.main.HealthStatusThread'), \
      patch('sibyl.main.EventWatchThread'), \
      patch('sibyl.main.LogFetcher'), \
+     patch('sibyl.main.PodWatchThread'), \
      patch('sibyl.main.SlackNotifier'), \
      patch('sibyl.main.signal.signal'), \
      patch('builtins.print'):
@@ -20,18 +21,29 @@ with patch('sibyl.main.HealthStatusThread'), \
 
 @pytest.fixture
 def mock_main_dependencies(mocker):
-    mocker.patch('sibyl.main.settings', MagicMock())
+    mock_settings = mocker.patch('sibyl.main.settings', MagicMock())
+    mock_settings.EVENT_STARTUP_LOOKBACK_SECONDS = 0
+    mock_settings.EVENT_DEDUP_WINDOW_SECONDS = 0
+    mock_settings.EVENT_PROCESSING_WORKERS = 2
+    mock_settings.POD_LOG_CACHE_MAX_BYTES = 1024
+    mock_settings.POD_LOG_CACHE_CURRENT_TTL_SECONDS = 30
+    mock_settings.NOTIFICATION_DIGEST_WINDOW_SECONDS = 0
+    mock_settings.SLACK_MESSAGE_UPDATE_TTL_SECONDS = 0
+    mock_settings.NOTIFICATION_OUTBOX_PATH = None
     mocker.patch('sibyl.main.HealthStatusThread')
+    mocker.patch('sibyl.main.K8ClientFactory')
+    mocker.patch('sibyl.main.EventWatch')
     mocker.patch('sibyl.main.EventWatchThread')
     mocker.patch('sibyl.main.LogFetcher')
+    mocker.patch('sibyl.main.PodWatchThread')
     mocker.patch('sibyl.main.SlackNotifier')
-    mocker.patch('sibyl.main.Queue')
+    mocker.patch('sibyl.main.EventQueue')
     # Keep the loop running until we explicitly stop it
     mocker.patch('sibyl.main.CONTINUE_PROCESSING', True)
 
 
 def test_main_loop_pod_event(mock_main_dependencies):
-    mock_queue = main.Queue.return_value
+    mock_queue = main.EventQueue.return_value
     mock_event = MagicMock()
     mock_event.involved_object.kind = "Pod"
     mock_event.source.component = "kubelet"
@@ -46,11 +58,54 @@ def test_main_loop_pod_event(mock_main_dependencies):
     with pytest.raises(SystemExit):
         main.main()
 
-    log_fetcher_instance.fetch_pod_logs_from_event.assert_called_once_with(mock_event, tail_lines=main.settings.POD_LOG_TAIL_LINES)
-    slack_notifier_instance.notify.assert_called_once_with(mock_event, logs=[("test-container", "some logs")])
+    mock_event.timings.mark.assert_any_call("dequeued")
+    log_fetcher_instance.get_pod.assert_called_once_with(mock_event)
+    log_fetcher_instance.fetch_pod_logs_from_event.assert_called_once_with(mock_event, tail_lines=main.settings.POD_LOG_TAIL_LINES, pod=log_fetcher_instance.get_pod.return_value)
+    slack_notifier_instance.notify.assert_called_once_with(mock_event, logs=[("test-container", "some logs")], restart_count=log_fetcher_instance.get_restart_count.return_value, progress=None)
+
+def test_main_loop_pod_event_without_message_index(mock_main_dependencies):
+    mock_queue = main.EventQueue.return_value
+    mock_event = MagicMock()
+    mock_event.involved_object.kind = "Pod"
+    mock_event.source.component = "kubelet"
+
+    mock_queue.get.side_effect = [mock_event, SystemExit]
+
+    log_fetcher_instance = main.LogFetcher.return_value
+    log_fetcher_instance.fetch_pod_logs_from_event.return_value = [("test-container", "some logs")]
+    slack_notifier_instance = main.SlackNotifier.return_value
+    slack_notifier_instance.message_index = None
+
+    with pytest.raises(SystemExit):
+        main.main()
+
+    # Without the message index the restart count is not used, so the pod is only looked up by the log fetch
+    log_fetcher_instance.get_pod.assert_not_called()
+    log_fetcher_instance.fetch_pod_logs_from_event.assert_called_once_with(mock_event, tail_lines=main.settings.POD_LOG_TAIL_LINES, pod=None)
+    slack_notifier_instance.notify.assert_called_once_with(mock_event, logs=[("test-container", "some logs")], restart_count=None, progress=None)
+
+def test_main_loop_recurring_event_skips_log_fetch(mock_main_dependencies):
+    mock_queue = main.EventQueue.return_value
+    mock_event = MagicMock()
+    mock_event.involved_object.kind = "Pod"
+    mock_event.source.component = "kubelet"
+
+    mock_queue.get.side_effect = [mock_event, SystemExit]
+
+    log_fetcher_instance = main.LogFetcher.return_value
+    log_fetcher_instance.get_restart_count.return_value = 3
+    slack_notifier_instance = main.SlackNotifier.return_value
+    slack_notifier_instance.needs_logs.return_value = False
+
+    with pytest.raises(SystemExit):
+        main.main()
+
+    slack_notifier_instance.needs_logs.assert_called_once_with(mock_event, 3)
+    log_fetcher_instance.fetch_pod_logs_from_event.assert_not_called()
+    slack_notifier_instance.notify.assert_called_once_with(mock_event, logs=[], restart_count=3, progress=None)
 
 def test_main_loop_non_pod_event(mock_main_dependencies):
-    mock_queue = main.Queue.return_value
+    mock_queue = main.EventQueue.return_value
     mock_event = MagicMock()
     mock_event.involved_object.kind = "Deployment"
     
@@ -63,11 +118,11 @@ def test_main_loop_non_pod_event(mock_main_dependencies):
         main.main()
 
     log_fetcher_instance.fetch_pod_logs_from_event.assert_not_called()
-    slack_notifier_instance.notify.assert_called_once_with(mock_event, logs=[])
+    slack_notifier_instance.notify.assert_called_once_with(mock_event, logs=[], restart_count=None, progress=None)
 
 
 def test_main_loop_empty_queue(mock_main_dependencies):
-    mock_queue = main.Queue.return_value
+    mock_queue = main.EventQueue.return_value
     mock_queue.get.side_effect = [Empty, SystemExit]
 
     log_fetcher_instance = main.LogFetcher.return_value
@@ -78,7 +133,26 @@ def test_main_loop_empty_queue(mock_main_dependencies):
     
     log_fetcher_instance.fetch_pod_logs_from_event.assert_not_called()
     slack_notifier_instance.notify.assert_not_called()
+    # Each pass of the processing loop beats, including the ones where no event arrived
+    health_status = main.HealthStatusThread.return_value.get_health_status.return_value
+    assert health_status.heartbeat.call_args_list == [(("event_processing",),)] * 2
+
+
+def test_main_loop_digest_hands_events_to_workers(mock_main_dependencies, mocker):
+    main.settings.NOTIFICATION_DIGEST_WINDOW_SECONDS = 10
+    mock_digest = mocker.patch('sibyl.main.EventDigest')
+    mock_event = MagicMock()
+    main.EventQueue.return_value.get.side_effect = [mock_event, SystemExit]
+
+    with pytest.raises(SystemExit):
+        main.main()
 
+    mock_digest.return_value.submit.assert_called_once_with(mock_event)
+    mock_digest.return_value.flush.assert_called_once()
+    # Events the digest does not digest are processed on the worker pool, not the digest's timer threads
+    notify_func = mock_digest.call_args.kwargs["notify_func"]
+    assert isinstance(notify_func.__self__, main.EventProcessorPool)
+    assert notify_func.__name__ == "submit"
 
 def test_signal_handler():
     # To test the signal handler, we can't easily send signals.
@@ -87,6 +161,31 @@ def test_signal_handler():
     main.signal_handler(signal.SIGINT, None)
     assert main.CONTINUE_PROCESSING is False
 
+def test_process_event_puts_notification_in_outbox():
+    mock_event = MagicMock()
+    mock_event.involved_object.kind = "Deployment"
+    slack_notifier = MagicMock()
+    notification_outbox = MagicMock()
+
+    main.process_event(mock_event, MagicMock(), slack_notifier, notification_outbox)
+
+    notification_outbox.put.assert_called_once_with(mock_event, logs=[], restart_count=None)
+    slack_notifier.notify.assert_not_called()
+
+def test_process_event_records_timings():
+    mock_event = MagicMock()
+    mock_event.involved_object.kind = "Pod"
+    mock_event.source.component = "kubelet"
+    slack_notifier = MagicMock()
+    event_timing_recorder = MagicMock()
+
+    with patch('sibyl.main.settings'):
+        main.process_event(mock_event, MagicMock(), slack_notifier, event_timing_recorder=event_timing_recorder)
+
+    mock_event.timings.mark.assert_called_once_with("logs_fetched")
+    slack_notifier.notify.assert_called_once()
+    event_timing_recorder.record.assert_called_once_with(mock_event)
+
 # Clean up environment variables
 del os.environ["SLACK_BOT_TOKEN"]
 del os.environ["SLACK_CHANNEL"]
@@ -0,0 +1,43 @@
+from prometheus_client import CollectorRegistry
+
+from sibyl.metrics import StatsCollector
+
+
+def make_collector(registry):
+    return StatsCollector(
+        "test_component",
+        counters={"hits": "Test hits", "misses": "Test misses"},
+        gauges={"size": "Test size"},
+        registry=registry
+    )
+
+def test_stats_collector_exports_nothing_until_set():
+    registry = CollectorRegistry()
+    make_collector(registry)
+
+    assert registry.get_sample_value("test_component_hits_total") is None
+    assert list(registry.collect()) == []
+
+def test_stats_collector_reads_stats_on_scrape():
+    registry = CollectorRegistry()
+    collector = make_collector(registry)
+    stats = {"hits": 1, "misses": 2, "size": 3, "unexported": 4}
+    collector.set_function(lambda: stats)
+
+    assert registry.get_sample_value("test_component_hits_total") == 1
+    assert registry.get_sample_value("test_component_misses_total") == 2
+    assert registry.get_sample_value("test_component_size") == 3
+    assert registry.get_sample_value("test_component_unexported") is None
+
+    stats["hits"] = 5
+    assert registry.get_sample_value("test_component_hits_total") == 5
+
+def test_stats_collector_types():
+    registry = CollectorRegistry()
+    make_collector(registry).set_function(lambda: {"hits": 1, "misses": 2, "size": 3})
+
+    assert {metric.name: metric.type for metric in registry.collect()} == {
+        "test_component_hits": "counter",
+        "test_component_misses": "counter",
+        "test_component_size": "gauge",
+    }
@@ -10,9 +10,49 @@ def test_settings_default_values():
     """
     settings = Settings(SLACK_BOT_TOKEN="dummy", SLACK_CHANNEL="dummy")
     assert settings.HEALTH_CHECK_PORT == 8080
+    assert settings.HEALTH_CHECK_SERVER == "flask"
+    assert settings.HEALTH_CHECK_HEARTBEAT_TIMEOUT_SECONDS == 900
+    assert settings.HEALTH_CHECK_DEBUG_ENDPOINTS is False
     assert settings.LOG_LEVEL == "INFO"
     assert settings.CLUSTER_NAME is None
+    assert settings.SLACK_UPLOAD_WORKERS == 4
+    assert settings.NOTIFICATION_OUTBOX_PATH is None
+    assert settings.NOTIFICATION_OUTBOX_FLUSH_INTERVAL_SECONDS == 0.5
+    assert settings.NOTIFICATION_OUTBOX_MAX_ATTEMPTS == 10
+    assert settings.NOTIFICATION_DIGEST_WINDOW_SECONDS == 0
+    assert settings.NOTIFICATION_DIGEST_MIN_EVENTS == 3
+    assert settings.NOTIFICATION_DIGEST_GROUP_BY == "node"
+    assert settings.NOTIFICATION_DIGEST_MAX_EVENTS == 50
+    assert settings.SLACK_MAX_RETRIES == 3
+    assert settings.SLACK_MESSAGE_UPDATE_TTL_SECONDS == 3600
+    assert settings.SLACK_MESSAGE_INDEX_MAX_ENTRIES == 1024
+    assert settings.SLACK_RATE_LIMIT_BURST_SECONDS == 10.0
+    assert settings.K8S_CLIENT_POOL_SIZE == 10
+    assert settings.K8S_CLIENT_CONNECT_TIMEOUT_SECONDS == 5.0
+    assert settings.K8S_CLIENT_READ_TIMEOUT_SECONDS == 30.0
+    assert settings.K8S_CLIENT_TCP_KEEPALIVE is True
     assert settings.POD_LOG_TAIL_LINES == 100
+    assert settings.POD_LOG_FETCH_WORKERS == 4
+    assert settings.POD_LOG_MAX_BYTES == 262144
+    assert settings.POD_LOG_SINCE_SECONDS is None
+    assert settings.POD_LOG_CACHE_MAX_BYTES == 16777216
+    assert settings.POD_LOG_CACHE_CURRENT_TTL_SECONDS == 30
+    assert settings.POD_LOG_ALL_CONTAINERS is False
+    assert settings.POD_CACHE_ENABLED is True
+    assert settings.EVENT_FIELD_SELECTOR == "type!=Normal"
+    assert settings.EVENT_NAMESPACE is None
+    assert settings.EVENT_INVOLVED_OBJECT_KIND is None
+    assert settings.EVENT_WATCH_RAW_JSON is False
+    assert settings.EVENT_STARTUP_LOOKBACK_SECONDS == 0
+    assert settings.EVENT_DEDUP_WINDOW_SECONDS == 300
+    assert settings.EVENT_DEDUP_MAX_ENTRIES == 1024
+    assert settings.EVENT_QUEUE_MAX_SIZE == 1000
+    assert settings.EVENT_QUEUE_OVERFLOW_POLICY == "block"
+    assert settings.EVENT_PRIORITY_REASONS is None
+    assert settings.EVENT_PRIORITY_TYPES == {}
+    assert settings.EVENT_PRIORITY_NAMESPACES == {}
+    assert settings.EVENT_PRIORITY_AGING_PER_SECOND == 1.0
+    assert settings.EVENT_PROCESSING_WORKERS == 4
 
 def test_settings_from_env():
     """
@@ -54,3 +94,6 @@ def test_settings_validation_error():
     
     with pytest.raises(ValidationError):
         Settings(LOG_LEVEL="INVALID", SLACK_BOT_TOKEN="dummy", SLACK_CHANNEL="dummy")
+
+    with pytest.raises(ValidationError):
+        Settings(EVENT_QUEUE_OVERFLOW_POLICY="INVALID", SLACK_BOT_TOKEN="dummy", SLACK_CHANNEL="dummy")